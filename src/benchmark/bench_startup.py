@@ -0,0 +1,66 @@
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RUNS = 15
+
+# Time spent building the parser, after the modules are imported.
+BUILD = """
+import time
+from parser import Parser
+started = time.perf_counter()
+Parser(optimize={optimize})
+print(time.perf_counter() - started)
+"""
+
+
+def is_table(name):
+    return name.startswith(("cql_lextab_", "cql_parsetab_", "parsetab")) or name == "parser.out"
+
+
+def start(workdir, optimize):
+    """
+    Build a parser in a fresh Python process.
+    Returns:
+        float: Time spent constructing the parser, in seconds.
+    """
+    result = subprocess.run([sys.executable, "-c", BUILD.format(optimize=optimize)], cwd=workdir,
+                            check=True, capture_output=True, text=True)
+    return float(result.stdout.split()[-1])
+
+
+def measure(optimize):
+    """
+    Build parsers in a clean copy of the sources, once with the generated
+    table files removed before every run (cold) and once reusing them (warm).
+    Returns:
+        tuple: Median cold and warm construction times, in seconds.
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in os.listdir(SRC):
+            if name.endswith(".py") and not is_table(name):
+                shutil.copy(os.path.join(SRC, name), workdir)
+        start(workdir, optimize)
+        cold = []
+        for _ in range(RUNS):
+            for name in os.listdir(workdir):
+                if is_table(name):
+                    os.remove(os.path.join(workdir, name))
+            cold.append(start(workdir, optimize))
+        warm = [start(workdir, optimize) for _ in range(RUNS)]
+    return statistics.median(cold), statistics.median(warm)
+
+
+legacyCold, legacyWarm = measure(False)
+optimizedCold, optimizedWarm = measure(True)
+
+print(f"{'':22}{'tables built':>14}{'tables cached':>15}")
+print(f"{'Legacy':22}{legacyCold * 1000:12.1f}ms{legacyWarm * 1000:13.1f}ms")
+print(f"{'Optimized':22}{optimizedCold * 1000:12.1f}ms{optimizedWarm * 1000:13.1f}ms")
+print(f"Cached versioned tables vs building them: {optimizedCold / optimizedWarm:.2f}x")
+print(f"Cached versioned tables vs legacy cached parsetab.py: {legacyWarm / optimizedWarm:.2f}x")
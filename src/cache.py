@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Bounded mapping that evicts the least recently used entries when it
+    holds more than capacity entries or, with a budget, more than budget bytes.
+    It can be shared by threads.
+    Attributes:
+        capacity (int): Maximum number of entries. 0 disables the cache.
+        budget (int): Maximum total size of the entries in bytes, or None for no limit.
+        nbytes (int): Total size of the entries in bytes.
+        hits (int): Lookups that found an entry.
+        misses (int): Lookups that found nothing.
+    """
+    def __init__(self, capacity, budget=None):
+        self.capacity = capacity
+        self.budget = budget
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, valid=None):
+        """
+        Return the value cached for key and mark it as recently used.
+        Args:
+            key: Cache key.
+            valid (callable, optional): Check of the cached value; a value
+                failing it is dropped and counted as a miss.
+        Returns:
+            The cached value, or None if key is not cached.
+        """
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None and valid is not None and not valid(value):
+                self.pop(key)
+                value = None
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, size=0):
+        """
+        Cache a value, evicting the least recently used entries if needed.
+        Args:
+            key: Cache key.
+            value: Value to cache.
+            size (int): Size of the value in bytes, counted against the budget.
+        """
+        if self.capacity <= 0 or (self.budget is not None and size > self.budget):
+            return
+        with self.lock:
+            self.pop(key)
+            self.entries[key] = value
+            self.sizes[key] = size
+            self.nbytes += size
+            while len(self.entries) > self.capacity or (self.budget is not None and self.nbytes > self.budget):
+                oldest, _ = self.entries.popitem(last=False)
+                self.nbytes -= self.sizes.pop(oldest)
+
+    def pop(self, key):
+        with self.lock:
+            self.nbytes -= self.sizes.pop(key, 0)
+            return self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.nbytes = 0
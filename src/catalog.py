@@ -0,0 +1,348 @@
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from filesCQLC import FilesCQLC
+from table import LazyColumn, LazyTable, TableView, ViewColumn
+
+MEMORY_BUDGET = 1024 * 1024 * 1024
+
+
+class Catalog(dict):
+    """
+    Tables keyed by name, with the memory they hold counted against a budget
+    along with the memory of the registered caches. Reading a table marks it
+    as recently used. When the tables in memory and the caches add up to more
+    than budget bytes, the caches drop their least recently used entries
+    first; if that is not enough, the least recently used tables are spilled:
+    written to a CQLC file in a temporary directory, and their buffers are
+    replaced by a memory map of that file. A spilled table keeps working as
+    before; its pages are read back from disk when a query touches them, and
+    the OS can drop them again under memory pressure. Views still reading
+    their base table and lazy tables with no column decoded are not spilled,
+    as they hold little memory of their own. It can be shared by threads.
+    Attributes:
+        budget (int): Maximum bytes held by the tables in memory, or None for no limit.
+        filesCQLC (FilesCQLC): Writer and reader of the spill files.
+        used (OrderedDict): Table names, least recently used first.
+        sizes (dict): Bytes held by each table, keyed by name. A table is
+            measured when it is stored; only lazy tables and views are
+            measured again, when they load a column.
+        total (int): Sum of sizes.
+        growing (dict): Number of loaded columns of each lazy table and view
+            still reading its base, keyed by name.
+        refs (dict): Number of names each table is stored under, keyed by id.
+        spilled (dict): Spilled tables keyed by name.
+        spills (int): Number of tables spilled.
+        directory (TemporaryDirectory): Where spill files are written, created by the first spill.
+        caches (list): (LRUCache, function) pairs for the caches counted
+            against the budget; the function returns the table held by an
+            entry, for caches that may hold tables of the catalog.
+        detached (list): Tables no longer stored under any name but still
+            held by a cache, whose views keep reading them.
+    """
+    def __init__(self, budget=MEMORY_BUDGET, filesCQLC=None):
+        dict.__init__(self)
+        self.budget = budget
+        self.filesCQLC = filesCQLC if filesCQLC is not None else FilesCQLC()
+        self.used = OrderedDict()
+        self.sizes = {}
+        self.total = 0
+        self.growing = {}
+        self.refs = {}
+        self.spilled = {}
+        self.spills = 0
+        self.directory = None
+        self.caches = []
+        self.detached = []
+        self.lock = threading.RLock()
+
+    def __getitem__(self, name):
+        with self.lock:
+            data = dict.__getitem__(self, name)
+            self.used.move_to_end(name)
+            return data
+
+    def get(self, name, default=None):
+        with self.lock:
+            if name not in self:
+                return default
+            return self[name]
+
+    def __setitem__(self, name, data):
+        with self.lock:
+            previous = self.remove(name)
+            dict.__setitem__(self, name, data)
+            self.used[name] = None
+            self.refs[id(data)] = self.refs.get(id(data), 0) + 1
+            self.resize(name, data.nbytes())
+            if not settled(data):
+                self.growing[name] = loaded(data)
+            self.release(previous)
+            self.enforce(name)
+
+    def pop(self, name, *default):
+        with self.lock:
+            if name not in self:
+                return dict.pop(self, name, *default)
+            data = self.remove(name)
+            self.release(data)
+            return data
+
+    def remove(self, name):
+        """
+        Take the table stored under a name out of the catalog, without
+        releasing its views.
+        Returns:
+            Table: The table, or None if no table has that name.
+        """
+        if name not in self:
+            return None
+        data = dict.pop(self, name)
+        self.used.pop(name, None)
+        self.total -= self.sizes.pop(name, 0)
+        self.growing.pop(name, None)
+        self.spilled.pop(name, None)
+        count = self.refs.pop(id(data)) - 1
+        if count:
+            self.refs[id(data)] = count
+        return data
+
+    def rename(self, name, new_name):
+        """
+        Store a table under a new name, keeping the views that read from it.
+        """
+        with self.lock:
+            spilled = self.spilled.get(name)
+            data = self.remove(name)
+            self[new_name] = data
+            if spilled is not None:
+                self.spilled[new_name] = spilled
+
+    def resize(self, name, size):
+        self.total += size - self.sizes.get(name, 0)
+        self.sizes[name] = size
+
+    def stored(self, data):
+        """
+        Return True if the table is stored under some name.
+        """
+        return id(data) in self.refs
+
+    def bases(self, name):
+        """
+        Return the names the base table of a view is stored under, or an
+        empty set if name is not a view still reading its base.
+        """
+        with self.lock:
+            data = dict.get(self, name)
+            base = data.base if isinstance(data, TableView) else None
+            if base is None:
+                return set()
+            return {n for n, t in self.items() if t is base}
+
+    def add_cache(self, cache, table=None):
+        """
+        Count the entries of a cache against the budget. Caches are emptied,
+        in the order they were registered, before any table is spilled.
+        Args:
+            cache (LRUCache): The cache.
+            table (callable, optional): Returns the table held by an entry,
+                for a cache that may hold tables of the catalog. The views of
+                a discarded table keep reading it while the cache holds it.
+        """
+        self.caches.append((cache, table))
+
+    def cached(self, data):
+        """
+        Return True if a registered cache holds the table.
+        """
+        for cache, table in self.caches:
+            if table is None:
+                continue
+            with cache.lock:
+                if any(table(entry) is data for entry in cache.entries.values()):
+                    return True
+        return False
+
+    def cache_bytes(self):
+        """
+        Bytes held by the registered caches, leaving out the tables that are
+        also stored in the catalog.
+        """
+        total = 0
+        for cache, table in self.caches:
+            with cache.lock:
+                total += cache.nbytes
+                if table is not None:
+                    total -= sum(cache.sizes[key] for key, entry in cache.entries.items() if self.stored(table(entry)))
+        return total
+
+    def evict(self, excess):
+        """
+        Drop the least recently used cache entries until excess bytes are
+        freed. Entries holding a table stored in the catalog free nothing
+        and are kept.
+        Returns:
+            int: Bytes freed.
+        """
+        freed = 0
+        for cache, table in self.caches:
+            with cache.lock:
+                for key, entry in list(cache.entries.items()):
+                    if freed >= excess:
+                        return freed
+                    if table is not None and self.stored(table(entry)):
+                        continue
+                    freed += cache.sizes.get(key, 0)
+                    cache.pop(key)
+        return freed
+
+    def release(self, data):
+        """
+        Copy the rows of the views reading from a table that is no longer
+        stored under any name, so the table can be freed. A table still held
+        by a cache is not freed, so its views keep reading it until the
+        cache drops it.
+        """
+        if data is None or self.stored(data):
+            return
+        if self.cached(data):
+            self.detached.append(data)
+            return
+        for name, table in self.items():
+            if isinstance(table, TableView) and table.base is data:
+                table.materialize()
+                self.growing.pop(name, None)
+                self.resize(name, table.nbytes())
+
+    def collect(self):
+        """
+        Release the detached tables the caches have dropped since.
+        """
+        detached = self.detached
+        self.detached = []
+        for data in detached:
+            self.release(data)
+
+    def nbytes(self):
+        """
+        Bytes held by the tables in memory.
+        """
+        return self.total
+
+    def measure(self):
+        """
+        Count again the bytes held by the lazy tables and views that loaded
+        columns since they were last measured. Other tables do not grow.
+        """
+        with self.lock:
+            for name, count in list(self.growing.items()):
+                data = dict.__getitem__(self, name)
+                current = loaded(data)
+                if current == count:
+                    continue
+                self.resize(name, data.nbytes())
+                if settled(data):
+                    del self.growing[name]
+                else:
+                    self.growing[name] = current
+
+    def state(self, name):
+        """
+        Return where the data of a table is: 'memory', 'spilled', 'mapped'
+        (imported from a CQLC file), 'lazy' (imported with IMPORT LAZY) or
+        'view' (read from another table).
+        """
+        data = dict.__getitem__(self, name)
+        if self.spilled.get(name) is data:
+            return "spilled"
+        if isinstance(data, LazyTable):
+            return "lazy"
+        if isinstance(data, TableView) and data.base is not None:
+            return "view"
+        if self.sizes[name] == 0 and len(data):
+            return "mapped"
+        return "memory"
+
+    def enforce(self, keep=None):
+        """
+        Empty the caches, then spill least recently used tables, until the
+        tables in memory and the caches fit the budget.
+        Args:
+            keep (str): Table not to spill, such as the one just stored.
+        """
+        if self.budget is None:
+            return
+        self.collect()
+        self.measure()
+        total = self.total + self.cache_bytes()
+        if total > self.budget:
+            self.evict(total - self.budget)
+            self.collect()
+            total = self.total + self.cache_bytes()
+        for name in list(self.used):
+            if total <= self.budget:
+                return
+            data = dict.__getitem__(self, name)
+            if name == keep or self.sizes[name] == 0 or not spillable(data):
+                continue
+            if self.spill(name, data):
+                self.growing.pop(name, None)
+                total -= self.sizes[name]
+                self.resize(name, data.nbytes())
+                total += self.sizes[name]
+
+    def spill(self, name, data):
+        """
+        Write a table to a spill file and map its buffers from that file.
+        Args:
+            name (str): Name of the table.
+            data (Table): The table.
+        Returns:
+            bool: True if the table was spilled.
+        """
+        if self.directory is None:
+            self.directory = tempfile.TemporaryDirectory(prefix="cql-spill-", ignore_cleanup_errors=True)
+        path = os.path.join(self.directory.name, f"{self.spills}.cqlc")
+        if not self.filesCQLC.write_cqlc(path, data):
+            return False
+        mapped = self.filesCQLC.read_cqlc(path)
+        if mapped is None:
+            return False
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        data.columns = mapped.columns
+        data.zones = mapped.zones
+        self.spilled[name] = data
+        self.spills += 1
+        return True
+
+
+def spillable(data):
+    """
+    Return False for a view still reading its base table and for a lazy
+    table with no column decoded, whose memory is not their own.
+    """
+    if isinstance(data, TableView):
+        return data.base is None
+    if isinstance(data, LazyTable):
+        return any(not isinstance(c, LazyColumn) for c in data.columns)
+    return True
+
+
+def loaded(data):
+    """
+    Number of columns a table holds in memory rather than reading them
+    from its file or base table.
+    """
+    return sum(1 for c in data.columns if not isinstance(c, (LazyColumn, ViewColumn)))
+
+
+def settled(data):
+    """
+    Return True if a table can no longer grow by loading columns.
+    """
+    return not isinstance(data, (LazyTable, TableView)) or loaded(data) == len(data.columns)
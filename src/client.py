@@ -0,0 +1,143 @@
+import asyncio
+import json
+import sys
+import time
+from server import parse_address
+
+
+class CQLClient:
+    """
+    Session with a CQL server.
+    Attributes:
+        reader (StreamReader): Stream the server answers on.
+        writer (StreamWriter): Stream requests are sent on.
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, address=None):
+        """
+        Open a session with the server at address ('host:port', a port, or a
+        Unix socket path; the default port on localhost if None).
+        """
+        host, port, path = parse_address(address)
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path, limit=2 ** 24)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=2 ** 24)
+        return cls(reader, writer)
+
+    async def query(self, text, output=None):
+        """
+        Send a block of CQL commands and read their output.
+        Args:
+            text (str): CQL commands.
+            output (callable, optional): Called with each batch of output as
+                it arrives; without it the output is collected and returned.
+        Returns:
+            tuple: The output (None when streamed to output) and the seconds
+                the server took.
+        Raises:
+            RuntimeError: If the server could not run the request.
+        """
+        self.writer.write(json.dumps({"query": text}).encode() + b"\n")
+        await self.writer.drain()
+        parts = []
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("The server closed the connection.")
+            message = json.loads(line)
+            if "output" in message:
+                if output is not None:
+                    output(message["output"])
+                else:
+                    parts.append(message["output"])
+                continue
+            if "error" in message:
+                raise RuntimeError(message["error"])
+            return (None if output is not None else "".join(parts)), message["seconds"]
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def load_test(address, query, sessions, requests):
+    """
+    Send a query from many sessions at once and report the latency and
+    throughput seen by the clients.
+    Args:
+        address (str): Server address.
+        query (str): CQL commands each request sends.
+        sessions (int): Number of concurrent sessions.
+        requests (int): Requests sent by each session, one after another.
+    Returns:
+        str: Report of the run.
+    """
+    latencies = []
+
+    async def session():
+        client = await CQLClient.connect(address)
+        try:
+            for _ in range(requests):
+                start = time.perf_counter()
+                await client.query(query)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session() for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)]
+    return (f"{len(latencies)} requests from {sessions} sessions in {elapsed:.2f}s: "
+            f"{len(latencies) / elapsed:.1f} req/s, p50 {p50 * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms")
+
+
+async def interactive(address):
+    """
+    Read commands from the terminal and print their output as it arrives.
+    """
+    client = await CQLClient.connect(address)
+    print("Connected to CQL server (type 'EXIT' to quit)")
+    try:
+        while True:
+            expr = await asyncio.to_thread(input, ">> ")
+            if expr == "" or expr.strip().upper() == "EXIT":
+                break
+            try:
+                await client.query(expr, lambda text: print(text, end=""))
+            except RuntimeError as e:
+                print(e)
+    except EOFError:
+        pass
+    finally:
+        await client.close()
+
+
+def main(argv):
+    """
+    python client.py [address]
+        Interactive session.
+    python client.py [address] --bench SESSIONS REQUESTS "QUERY"
+        Load test: SESSIONS sessions each send QUERY REQUESTS times.
+    """
+    address = None
+    if argv and argv[0] != "--bench":
+        address = argv.pop(0)
+    if argv and argv[0] == "--bench":
+        if len(argv) != 4:
+            print(main.__doc__)
+            return
+        print(asyncio.run(load_test(address, argv[3], int(argv[1]), int(argv[2]))))
+        return
+    asyncio.run(interactive(address))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,4 +1,5 @@
 from interpreter import Interpreter
+from server import serve
 import sys
 
 class Main:
@@ -8,7 +9,9 @@ class Main:
                     contents = file.read()
                     interpreter.run(contents, False)
     
-    if len(sys.argv) == 2:
+    if len(sys.argv) >= 2 and sys.argv[1] == "--serve":
+        serve(interpreter, sys.argv[2] if len(sys.argv) > 2 else None)
+    elif len(sys.argv) == 2:
         try:
             with open(sys.argv[1], "r") as file:
                 contents = file.read()
@@ -17,6 +20,7 @@ class Main:
             print(e)    
     else:
         print("CQL Interpreter (type 'EXIT' to quit)")
+        interpreter.renderer.interactive = sys.stdin.isatty() and sys.stdout.isatty()
         for expr in iter(lambda: input(">> "), ""):
             try:
                 if(expr.strip().upper() == "EXIT"):
@@ -0,0 +1,227 @@
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+from array import array
+from table import FloatColumn, IntColumn, StringColumn, Table, TimestampColumn, ZoneMap
+
+MAGIC = b"CQLC\x00\x01\x00\x00"
+ROW_GROUP_SIZE = 65536
+ALIGNMENT = 8
+
+
+def is_cqlc(filename):
+    """
+    Return True if a file name has the columnar table extension.
+    """
+    return filename.lower().endswith(".cqlc")
+
+
+class MappedStringColumn(StringColumn):
+    """
+    String column whose codes are read from a mapped file. The string pool
+    is decoded from the file the first time it is needed.
+    """
+    def __init__(self, codes, offsets, blob):
+        self.codes = codes
+        self.offsets = offsets
+        self.blob = blob
+        self._pool = None
+        self._lookup = None
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            text = str(self.blob, "utf-8")
+            offsets = self.offsets
+            self._pool = [text[a:b] for a, b in zip(offsets, offsets[1:])]
+        return self._pool
+
+    @property
+    def lookup(self):
+        if self._lookup is None:
+            self._lookup = {s: i for i, s in enumerate(self.pool)}
+        return self._lookup
+
+    def nbytes(self):
+        if self._pool is None:
+            return 0
+        return StringColumn.nbytes(self)
+
+
+class FilesCQLC:
+    """
+    Reads and writes tables in the CQLC binary columnar format.
+    A file holds the raw buffer of every column, 8-byte aligned, followed by
+    a JSON footer describing the columns and the min/max of each column in
+    every row group, then the footer length and the magic number. Reading
+    maps the file into memory: no cell is parsed or copied, and pages are
+    only loaded when a query touches them.
+    Attributes:
+        rowGroupSize (int): Number of rows per zone map entry when writing.
+        lastReadStats (dict): Rows, seconds, rows per second and workers of the last read_cqlc
+            of the calling thread.
+    """
+    def __init__(self, rowGroupSize=ROW_GROUP_SIZE):
+        self.rowGroupSize = rowGroupSize
+        self.local = threading.local()
+
+    @property
+    def lastReadStats(self):
+        return getattr(self.local, "lastReadStats", None)
+
+    @lastReadStats.setter
+    def lastReadStats(self, stats):
+        self.local.lastReadStats = stats
+
+    def read_cqlc(self, filename):
+        """
+        Open a CQLC file as a table backed by a memory map.
+        Args:
+            filename (str): Path of the file.
+        Returns:
+            Table: The table, or None if the file is not a valid CQLC file.
+        """
+        if filename == "":
+            print("Filename is empty")
+            return None
+
+        try:
+            started = time.perf_counter()
+            with open(filename, "rb") as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            size = len(mapped)
+            if size < 2 * len(MAGIC) + 8 or mapped[:len(MAGIC)] != MAGIC or mapped[-len(MAGIC):] != MAGIC:
+                print(f"Error reading CQLC file: {filename} is not a CQLC file")
+                return None
+            end = size - len(MAGIC) - 8
+            footerSize = int.from_bytes(mapped[end:end + 8], "little")
+            footer = json.loads(mapped[end - footerSize:end].decode("utf-8"))
+            view = memoryview(mapped)
+            swap = footer["byteorder"] != sys.byteorder
+            columns = [self.open_column(view, meta, swap) for meta in footer["columns"]]
+            zones = ZoneMap(footer["rowGroupSize"], [meta["zones"] for meta in footer["columns"]])
+
+            seconds = time.perf_counter() - started
+            self.lastReadStats = {
+                "rows": footer["rows"],
+                "seconds": seconds,
+                "rowsPerSecond": footer["rows"] / seconds if seconds else 0.0,
+                "workers": 1,
+            }
+            return Table(footer["header"], columns, zones)
+        except Exception as e:
+            print(f"Error reading CQLC file: {str(e)}")
+            return None
+
+    def open_column(self, view, meta, swap):
+        """
+        Build a column over the buffers of the mapped file.
+        Args:
+            view (memoryview): The whole mapped file.
+            meta (dict): Column description from the footer.
+            swap (bool): True if the file was written with the other byte order.
+        Returns:
+            Column: The column.
+        """
+        def buffer(name, typecode):
+            offset, nbytes = meta[name]
+            data = view[offset:offset + nbytes]
+            if typecode == "B":
+                return data
+            if swap:
+                values = array(typecode)
+                values.frombytes(data)
+                values.byteswap()
+                return values
+            return data.cast(typecode)
+
+        kind = meta["kind"]
+        if kind == "int":
+            return IntColumn(buffer("values", "q"))
+        if kind == "float":
+            mask = buffer("intMask", "B") if meta["intMask"] is not None else None
+            return FloatColumn(buffer("values", "d"), mask)
+        if kind == "timestamp":
+            return TimestampColumn(meta["fmt"], buffer("values", "q"))
+        return MappedStringColumn(buffer("codes", "I"), buffer("offsets", "q"), buffer("pool", "B"))
+
+    def write_cqlc(self, filename, data):
+        """
+        Write a table to a CQLC file. The file is written under a temporary
+        name and then renamed, so tables mapped from an older version of the
+        file keep reading the old contents.
+        Args:
+            filename (str): Path of the file.
+            data (Table): The table to write.
+        Returns:
+            bool: True, or None if the file could not be written.
+        """
+        if filename == "":
+            print("Filename is empty")
+            return None
+
+        temporary = filename + ".tmp"
+        try:
+            zones = data.zones
+            if zones is None or zones.rowGroupSize != self.rowGroupSize:
+                zones = ZoneMap.build(data, self.rowGroupSize)
+            with open(temporary, "wb") as file:
+                file.write(MAGIC)
+                columns = []
+                for column, columnZones in zip(data.columns, zones.columns):
+                    meta = {"kind": column.kind, "zones": columnZones}
+                    if column.kind == "string":
+                        pool = column.pool
+                        offsets = array("q", [0])
+                        total = 0
+                        for s in pool:
+                            total += len(s)
+                            offsets.append(total)
+                        meta["codes"] = self.write_buffer(file, column.codes)
+                        meta["offsets"] = self.write_buffer(file, offsets)
+                        meta["pool"] = self.write_buffer(file, "".join(pool).encode("utf-8"))
+                    else:
+                        meta["values"] = self.write_buffer(file, column.values)
+                    if column.kind == "float":
+                        mask = column.intMask
+                        meta["intMask"] = self.write_buffer(file, bytes(mask)) if mask is not None else None
+                    if column.kind == "timestamp":
+                        meta["fmt"] = column.fmt
+                    columns.append(meta)
+
+                footer = json.dumps({
+                    "version": 1,
+                    "byteorder": sys.byteorder,
+                    "rows": len(data),
+                    "rowGroupSize": zones.rowGroupSize,
+                    "header": data.header,
+                    "columns": columns,
+                }).encode("utf-8")
+                file.write(footer)
+                file.write(len(footer).to_bytes(8, "little"))
+                file.write(MAGIC)
+            os.replace(temporary, filename)
+            return True
+        except Exception as e:
+            print(f"Error writing CQLC file: {str(e)}")
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return None
+
+    def write_buffer(self, file, data):
+        """
+        Append a buffer to the file at the next aligned offset.
+        Returns:
+            list: Offset and size of the buffer in bytes.
+        """
+        offset = file.tell()
+        padding = -offset % ALIGNMENT
+        if padding:
+            file.write(bytes(padding))
+            offset += padding
+        view = memoryview(data).cast("B")
+        file.write(view)
+        return [offset, len(view)]
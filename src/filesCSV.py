@@ -1,54 +1,624 @@
+import bz2
 import csv
-import re
+import gzip
+import io
+import lzma
+import mmap
+import os
+import threading
+import time
+from array import array
+from itertools import accumulate, islice
+from table import ColumnBuilder, LazyTable, Table, concat_columns
+
+CHUNK_SIZE = 4 * 1024 * 1024
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+WRITE_BATCH_ROWS = 4096
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+
+def split_brackets(line):
+    """
+    Split a record on commas, keeping bracketed fields such as the
+    '[lon,lat]' coordinates together.
+    """
+    fields = []
+    pending = None
+    for part in line.split(","):
+        if pending is not None:
+            pending += "," + part
+            if part.endswith("]"):
+                fields.append(pending)
+                pending = None
+        elif part.startswith("[") and not part.endswith("]"):
+            pending = part
+        else:
+            fields.append(part)
+    if pending is not None:
+        fields.append(pending)
+    return fields
+
+
+def tokenize(line):
+    """
+    Split a record containing quoted fields. Quotes open only at the start
+    of a field, '""' inside quotes is an escaped quote, and commas inside
+    quotes or brackets do not split.
+    Returns:
+        list: The fields, or None if a quoted field continues on the next line.
+    """
+    fields = []
+    field = []
+    quoted = False
+    depth = 0
+    i = 0
+    n = len(line)
+    while i < n:
+        ch = line[i]
+        if quoted:
+            if ch == '"':
+                if i + 1 < n and line[i + 1] == '"':
+                    field.append('"')
+                    i += 1
+                else:
+                    quoted = False
+            else:
+                field.append(ch)
+        elif ch == '"' and not field:
+            quoted = True
+        elif ch == "," and depth == 0:
+            fields.append("".join(field))
+            field = []
+        else:
+            if ch == "[":
+                depth += 1
+            elif ch == "]" and depth:
+                depth -= 1
+            field.append(ch)
+        i += 1
+    if quoted:
+        return None
+    fields.append("".join(field))
+    return fields
+
+
+def quote_parity(parity, block):
+    """
+    Return the parity of the quote count after a block of whole lines,
+    starting from parity. A '#' comment line outside a quoted field is
+    dropped by the reader, so its quotes are not counted.
+    """
+    if b"#" not in block:
+        return (parity + block.count(b'"')) % 2
+    for line in block.split(b"\n"):
+        if parity == 0 and line.lstrip().startswith(b"#"):
+            continue
+        parity = (parity + line.count(b'"')) % 2
+    return parity
+
+
+def detect_compression(filename, probe=True):
+    """
+    Return how a file is compressed: 'gzip', 'bz2', 'xz', or None for plain
+    text. The extension decides; without a known one, the first bytes of an
+    existing file are checked for the magic number of each format.
+    Args:
+        filename (str): Path of the file.
+        probe (bool): Look at the contents of the file too.
+    """
+    compression = COMPRESSION_SUFFIXES.get(os.path.splitext(filename)[1].lower())
+    if compression is not None or not probe:
+        return compression
+    try:
+        with open(filename, "rb") as file:
+            start = file.read(6)
+    except OSError:
+        return None
+    if start.startswith(b"\x1f\x8b"):
+        return "gzip"
+    if start.startswith(b"BZh") and start[3:4].isdigit():
+        return "bz2"
+    if start.startswith(b"\xfd7zXZ\x00"):
+        return "xz"
+    return None
+
+
+def open_compressed(filename, mode, compression, level=None):
+    """
+    Open a compressed file as a binary stream through its stdlib codec.
+    Args:
+        filename (str): Path of the file.
+        mode (str): 'rb' or 'wb'.
+        compression (str): 'gzip', 'bz2' or 'xz'.
+        level (int, optional): Compression level (0-9) when writing, or
+            None for 6 with gzip and xz and 9 with bz2. bz2 has no level 0,
+            so 0 writes level 1.
+    """
+    if compression == "gzip":
+        return gzip.open(filename, mode, compresslevel=6 if level is None else level)
+    if compression == "bz2":
+        return bz2.open(filename, mode, compresslevel=9 if level is None else max(level, 1))
+    return lzma.open(filename, mode, preset=level if "w" in mode else None)
+
+
+def can_fork():
+    """
+    Return True if worker processes can be started with fork, so they share
+    the interpreter state without re-importing the main script.
+    """
+    import multiprocessing
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def parse_range(filename, start, end, width, chunkSize, encoding):
+    """
+    Parse the data records in a byte range of a CSV file into typed columns.
+    Runs in worker processes for parallel imports.
+    Args:
+        filename (str): Path of the file.
+        start (int): Byte offset of the first record.
+        end (int): Byte offset after the last record, or None for end of file.
+        width (int): Number of columns of the header.
+        chunkSize (int): Number of bytes read per block.
+        encoding (str): Text encoding of the file.
+    Returns:
+        tuple: The columns, the row count and an error message or None.
+    """
+    builders = [ColumnBuilder() for _ in range(width)]
+    count = 0
+    for rows in FilesCSV(chunkSize, encoding).read_records(filename, start, end):
+        widths = set(map(len, rows))
+        if(widths != {width}):
+            return None, 0, f"Row length mismatch: {min(widths - {width})} != {width}"
+        for builder, cells in zip(builders, zip(*rows)):
+            builder.extend(cells)
+        count += len(rows)
+    return [b.build() for b in builders], count, None
+
 
 class FilesCSV:
-    def read_csv(self, filename):
+    """
+    Reads CSV files into columnar tables and writes tables back to CSV.
+    Files are read in large binary blocks; each block is split into records
+    and fed to the column builders a column at a time. Files compressed with
+    gzip, bz2 or xz are decompressed as they are read, and written
+    compressed when the name ends in '.gz', '.bz2' or '.xz'.
+    Attributes:
+        chunkSize (int): Number of bytes read from or written to disk per block.
+        encoding (str): Text encoding of the files.
+        parallelMinBytes (int): Smallest file read with more than one worker.
+        compressLevel (int): Compression level (0-9) of the files written,
+            or None for the default of each codec.
+        compressBlock (int): Number of bytes of text handed to the compressor at once.
+        lastReadStats (dict): Rows, seconds, rows per second and workers of the last read_csv
+            of the calling thread.
+    """
+    def __init__(self, chunkSize=CHUNK_SIZE, encoding="utf-8"):
+        self.chunkSize = chunkSize
+        self.encoding = encoding
+        self.parallelMinBytes = PARALLEL_MIN_BYTES
+        self.compressLevel = None
+        self.compressBlock = chunkSize
+        self.local = threading.local()
+
+    @property
+    def lastReadStats(self):
+        return getattr(self.local, "lastReadStats", None)
+
+    @lastReadStats.setter
+    def lastReadStats(self, stats):
+        self.local.lastReadStats = stats
+
+    def open_input(self, filename):
+        """
+        Open a file for reading as bytes, decompressing it if needed.
+        """
+        compression = detect_compression(filename)
+        if compression is None:
+            return open(filename, "rb")
+        return open_compressed(filename, "rb", compression)
+
+    def open_output(self, filename):
+        """
+        Open a file for writing CSV text, compressed if its name ends in
+        '.gz', '.bz2' or '.xz'.
+        """
+        compression = detect_compression(filename, probe=False)
+        if compression is None:
+            return open(filename, mode='w', newline='', buffering=self.chunkSize, encoding=self.encoding)
+        stream = open_compressed(filename, "wb", compression, self.compressLevel)
+        return io.TextIOWrapper(io.BufferedWriter(stream, self.compressBlock), encoding=self.encoding, newline='')
+
+    def read_csv(self, filename, workers=1):
                 if(filename == ""):
                     print("Filename is empty")
                     return None
 
                 try:
-                    data = []
-                    header = None
-                    WRAP_RX = re.compile(r'(\[.*?\])')
-
-                    with open(filename, "r", newline="") as csvfile:
-                        lines = (
-                            WRAP_RX.sub(r'"\1"', raw)
-                            for raw in csvfile
-                            if raw.strip() and not raw.lstrip().startswith("#")
-                        )
-                        reader = csv.reader(lines)
-                        for row in reader:
-                            if row and row[0].startswith("#"):
-                                continue
-
-                            if header is None:
-                                header = row
-                            else:
-                                if(len(row) != len(header)):
-                                    print(f"Row length mismatch: {len(row)} != {len(header)}")
-                                    return None
-                                data.append(row)
-
-                    return {"header": header, "data": data}
+                    started = time.perf_counter()
+                    header, offset = self.read_header(filename)
+                    if header is None:
+                        self.record_stats(0, started, workers)
+                        return Table([], [])
+
+                    # A compressed stream can only be decompressed from its start.
+                    size = os.path.getsize(filename) if detect_compression(filename) is None else 0
+                    if workers > 1 and size - offset >= self.parallelMinBytes and can_fork():
+                        columns, count, error = self.read_parallel(filename, offset, size, len(header), workers)
+                    else:
+                        columns, count, error = parse_range(filename, offset, None, len(header), self.chunkSize, self.encoding)
+                    if error:
+                        print(error)
+                        return None
+
+                    self.record_stats(count, started, workers)
+                    return Table(header, columns)
                 except Exception as e:
                     print(f"Error reading CSV file: {str(e)}")
                     return None
-                
+
+    def record_stats(self, count, started, workers):
+        """
+        Store the statistics of a read in lastReadStats.
+        Args:
+            count (int): Number of rows read.
+            started (float): perf_counter value when the read started.
+            workers (int): Number of processes that parsed the file.
+        """
+        seconds = time.perf_counter() - started
+        self.lastReadStats = {
+            "rows": count,
+            "seconds": seconds,
+            "rowsPerSecond": count / seconds if seconds else 0.0,
+            "workers": workers,
+        }
+
+    def read_lazy(self, filename):
+        """
+        Open a CSV file as a LazyTable: the file is memory-mapped and only
+        scanned for the byte offset of every record. A compressed file
+        cannot be mapped, so it is read whole with read_csv.
+        Args:
+            filename (str): Path of the file.
+        Returns:
+            LazyTable: The table, or None if the file could not be read.
+        """
+        if(filename == ""):
+            print("Filename is empty")
+            return None
+        if detect_compression(filename) is not None:
+            return self.read_csv(filename)
+
+        try:
+            started = time.perf_counter()
+            header, offset = self.read_header(filename)
+            if header is None:
+                self.record_stats(0, started, 1)
+                return Table([], [])
+            with open(filename, "rb") as csvfile:
+                mapped = mmap.mmap(csvfile.fileno(), 0, access=mmap.ACCESS_READ)
+            offsets = self.scan_offsets(mapped, offset)
+            self.record_stats(len(offsets) - 1, started, 1)
+            return LazyTable(header, filename, mapped, offsets, self)
+        except Exception as e:
+            print(f"Error reading CSV file: {str(e)}")
+            return None
+
+    def scan_offsets(self, data, start):
+        """
+        Find where each record of a CSV buffer starts, skipping blank lines
+        and '#' comments (including records whose first quoted field starts
+        with '#', as split_block does). A newline inside a quoted field does
+        not start a record.
+        Args:
+            data (bytes-like): The file contents.
+            start (int): Offset of the first data record.
+        Returns:
+            array: The offset of every record, followed by the size of data.
+        """
+        offsets = array("q")
+        size = len(data)
+        quoted = data.find(b'"', start) >= 0
+        parity = 0
+        position = start
+        while position < size:
+            end = data.rfind(b"\n", position, min(position + self.chunkSize, size)) + 1
+            if end <= position:
+                end = data.find(b"\n", position) + 1 or size
+            block = data[position:end]
+            lines = block.split(b"\n")
+            if lines[-1] == b"":
+                lines.pop()
+            starts = accumulate([len(line) + 1 for line in lines[:-1]], initial=position)
+            if quoted:
+                for lineStart, line in zip(starts, lines):
+                    if parity == 0:
+                        # The quotes of a comment are not counted, as the reader drops it.
+                        if not line.strip() or line.lstrip().startswith(b"#"):
+                            continue
+                        if not line.startswith(b'"#'):
+                            offsets.append(lineStart)
+                    parity = (parity + line.count(b'"')) % 2
+            elif b"#" in block or not all(map(bytes.strip, lines)):
+                offsets.extend(s for s, line in zip(starts, lines) if line.strip() and not line.lstrip().startswith(b"#"))
+            else:
+                offsets.extend(starts)
+            position = end
+        offsets.append(size)
+        return offsets
+
+    def read_tail(self, filename, start, width):
+        """
+        Parse the complete records written to a CSV file after an offset.
+        A last line still being written (no newline yet, or inside an open
+        quoted field) is left for the next read.
+        Args:
+            filename (str): Path of the file.
+            start (int): Byte offset of the first record not read yet.
+            width (int): Number of columns of the header.
+        Returns:
+            tuple: The columns, the row count, the offset after the last
+                record read and an error message or None.
+        """
+        started = time.perf_counter()
+        end = self.complete_end(filename, start)
+        columns, count, error = parse_range(filename, start, end, width, self.chunkSize, self.encoding)
+        self.record_stats(count, started, 1)
+        return columns, count, end, error
+
+    def complete_end(self, filename, start):
+        """
+        Return the offset after the last newline following start that is
+        not inside a quoted field. Quotes in '#' comment lines are not
+        counted, as the reader drops those lines.
+        """
+        end = start
+        with self.open_input(filename) as csvfile:
+            csvfile.seek(start)
+            offset = start
+            parity = 0
+            carry = b""
+            while True:
+                block = csvfile.read(self.chunkSize)
+                if not block:
+                    break
+                # Only whole lines are scanned, so comment lines can be told apart.
+                block = carry + block
+                cut = block.rfind(b"\n") + 1
+                carry = block[cut:]
+                if cut == 0:
+                    continue
+                if parity == 0 and b'"' not in block[:cut]:
+                    end = offset + cut
+                else:
+                    position = offset
+                    for line in block[:cut - 1].split(b"\n"):
+                        position += len(line) + 1
+                        if parity == 0 and line.lstrip().startswith(b"#"):
+                            end = position
+                            continue
+                        parity = (parity + line.count(b'"')) % 2
+                        if parity == 0:
+                            end = position
+                offset += cut
+        return end
+
+    def read_header(self, filename):
+        """
+        Find the header record of a CSV file.
+        Args:
+            filename (str): Path of the file.
+        Returns:
+            tuple: The column names (None for an empty file) and the byte
+                offset where the data records start.
+        """
+        offset = 0
+        with self.open_input(filename) as csvfile:
+            for raw in csvfile:
+                offset += len(raw)
+                line = raw.decode(self.encoding).rstrip("\r\n")
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                row = tokenize(line)
+                if row is None:
+                    row = split_brackets(line)
+                if row[0].startswith("#"):
+                    continue
+                return row, offset
+        return None, offset
+
+    def read_parallel(self, filename, start, end, width, workers):
+        """
+        Parse the data records of a file in a process pool. The file is cut
+        at newlines outside quoted fields, each worker parses one byte range
+        into typed columns, and the columns are concatenated in file order.
+        Args:
+            filename (str): Path of the file.
+            start (int): Byte offset of the first data record.
+            end (int): Size of the file.
+            width (int): Number of columns.
+            workers (int): Number of worker processes.
+        Returns:
+            tuple: The columns, the row count and an error message or None.
+        """
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        points = [start] + self.split_points(filename, start, end, workers) + [end]
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [
+                pool.submit(parse_range, filename, a, b, width, self.chunkSize, self.encoding)
+                for a, b in zip(points, points[1:]) if b > a
+            ]
+            parts = [f.result() for f in futures]
+
+        for _, _, error in parts:
+            if error:
+                return None, 0, error
+        columns = [concat_columns([p[0][c] for p in parts]) for c in range(width)]
+        return columns, sum(p[1] for p in parts), None
+
+    def split_points(self, filename, start, end, parts):
+        """
+        Choose byte offsets splitting [start, end) into about parts ranges of
+        whole records. A cut is only made after a newline preceded by an even
+        number of quote characters outside comment lines, so quoted fields
+        are never split; bracketed fields never contain newlines.
+        Returns:
+            list: Increasing cut offsets, excluding start and end.
+        """
+        targets = [start + (end - start) * k // parts for k in range(1, parts)]
+        points = []
+        with open(filename, "rb") as csvfile:
+            csvfile.seek(start)
+            offset = start
+            parity = 0
+            t = 0
+            carry = b""
+            while t < len(targets):
+                block = csvfile.read(self.chunkSize)
+                if not block:
+                    break
+                # Only whole lines are scanned, so comment lines can be told apart.
+                block = carry + block
+                cut = block.rfind(b"\n") + 1
+                carry = block[cut:]
+                block = block[:cut]
+                pos = max(targets[t] - offset, 0)
+                while t < len(targets) and pos < len(block):
+                    newline = block.find(b"\n", pos)
+                    if newline < 0:
+                        break
+                    if quote_parity(parity, block[:newline]) == 0:
+                        point = offset + newline + 1
+                        if not points or point > points[-1]:
+                            points.append(point)
+                        while t < len(targets) and targets[t] < point:
+                            t += 1
+                        pos = max(targets[t] - offset, newline + 1) if t < len(targets) else len(block)
+                    else:
+                        pos = newline + 1
+                parity = quote_parity(parity, block)
+                offset += len(block)
+        return [p for p in points if p < end]
+
+    def read_records(self, filename, start=0, end=None):
+        """
+        Read a CSV file, or a byte range of it, block by block.
+        Args:
+            filename (str): Path of the file.
+            start (int): Byte offset to start reading at.
+            end (int, optional): Byte offset to stop reading at.
+        Returns:
+            generator: One list of records (lists of fields) per block read,
+                with blank lines and '#' comments removed.
+        """
+        carry = b""
+        with self.open_input(filename) as csvfile:
+            csvfile.seek(start)
+            position = start
+            while end is None or position < end:
+                size = self.chunkSize if end is None else min(self.chunkSize, end - position)
+                block = csvfile.read(size)
+                if not block:
+                    break
+                position += len(block)
+                block = carry + block
+                cut = block.rfind(b"\n") + 1
+                if cut == 0:
+                    carry = block
+                    continue
+                carry = block[cut:]
+                rows, leftover = self.split_block(block[:cut].decode(self.encoding))
+                carry = leftover.encode(self.encoding) + carry
+                if rows:
+                    yield rows
+        if carry:
+            rows, leftover = self.split_block(carry.decode(self.encoding) + "\n")
+            if leftover:
+                rows += [tokenize(leftover + '"')]
+            if rows:
+                yield rows
+
+    def split_block(self, text):
+        """
+        Split a block of complete lines into records.
+        Args:
+            text (str): Decoded block ending with a newline.
+        Returns:
+            tuple: The records, and the text of a trailing record whose quoted
+                field continues past the end of the block.
+        """
+        if "\r" in text:
+            text = text.replace("\r\n", "\n")
+        lines = text.split("\n")
+        lines.pop()
+        if '"' not in text and "[" not in text:
+            return [line.split(",") for line in lines if line.strip() and not line.lstrip().startswith("#")], ""
+
+        rows = []
+        pending = None
+        for line in lines:
+            if pending is not None:
+                line = pending + "\n" + line
+                pending = None
+            elif not line.strip() or line.lstrip().startswith("#"):
+                continue
+            if '"' in line:
+                row = tokenize(line)
+                if row is None:
+                    pending = line
+                    continue
+                if row[0].startswith("#"):
+                    continue
+            elif "[" in line:
+                row = split_brackets(line)
+            else:
+                row = line.split(",")
+            rows.append(row)
+        return rows, pending + "\n" if pending is not None else ""
+
     def write_csv(self, filename, data):
-         if filename == "":
+        """
+        Write a table to a CSV file.
+        Args:
+            filename (str): Destination path.
+            data (Table): The table.
+        Returns:
+            bool: True if the file was written, or None on error.
+        """
+        rows = data.text_rows()
+        batches = iter(lambda: list(islice(rows, WRITE_BATCH_ROWS)), [])
+        if self.write_rows(filename, data.header, batches) is None:
+            return None
+        return True
+
+    def write_rows(self, filename, header, batches):
+        """
+        Write a header and batches of rows to a CSV file through a buffer of
+        chunkSize bytes. Only one batch is held at a time, so the memory
+        used does not grow with the number of rows.
+        Args:
+            filename (str): Destination path.
+            header (list): Column names.
+            batches (iterable of list): Lists of rows of text cells.
+        Returns:
+            int: Number of rows written, or None on error.
+        """
+        if filename == "":
             print("Filename is empty")
             return None
-         
-         try:
-            with open(filename, mode= 'w', newline='') as csvfile:
+
+        count = 0
+        try:
+            with self.open_output(filename) as csvfile:
                 writer = csv.writer(csvfile)
-                writer.writerow(data["header"])
-                for row in data["data"]:
-                    writer.writerow(row)
-                return True
-         except Exception as e:
+                writer.writerow(header)
+                for batch in batches:
+                    writer.writerows(batch)
+                    count += len(batch)
+            return count
+        except Exception as e:
             print(f"Error writing CSV file: {str(e)}")
             return None
-
@@ -0,0 +1,138 @@
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+
+INDEX_KINDS = ("HASH", "SORTED")
+
+
+def index_keys(column):
+    """
+    Return the keys an index is built on: the raw buffer for numbers and
+    timestamps, the decoded strings for string columns. These are the same
+    values a compiled WHERE term compares against.
+    """
+    if column.kind == "string":
+        return column
+    return column.values
+
+
+class Index(ABC):
+    """
+    Base class of secondary indexes on one column of a table.
+    Attributes:
+        name (str): Index name.
+        table (str): Name of the indexed table.
+        column (str): Name of the indexed column.
+        source (Table): Table object the index was built from.
+        uses (int): Number of queries answered with the index.
+    """
+    kind = None
+    symbols = ()
+
+    def __init__(self, name, table, column):
+        self.name = name
+        self.table = table
+        self.column = column
+        self.source = None
+        self.uses = 0
+
+    def supports(self, symbol):
+        return symbol in self.symbols
+
+    @abstractmethod
+    def build(self, data):
+        """
+        (Re)build the index from a table.
+        Args:
+            data (Table): The table to index.
+        """
+
+    @abstractmethod
+    def lookup(self, symbol, literal):
+        """
+        Return the positions of the rows whose key compares true against literal.
+        Args:
+            symbol (str): Comparison operator.
+            literal: Value in the column's domain.
+        Returns:
+            array: Matching row positions in ascending order.
+        """
+
+
+class HashIndex(Index):
+    """
+    Hash index mapping each key to the positions of the rows holding it.
+    Answers equality lookups and can serve as a prebuilt join hash table.
+    """
+    kind = "HASH"
+    symbols = ("=",)
+
+    def build(self, data):
+        column = data.column(self.column)
+        buckets = {}
+        keys = column.codes if column.kind == "string" else column.values
+        for i, key in enumerate(keys):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = array("q", (i,))
+            else:
+                bucket.append(i)
+        if column.kind == "string":
+            pool = column.pool
+            buckets = {pool[code]: bucket for code, bucket in buckets.items()}
+        self.buckets = buckets
+        self.source = data
+
+    def lookup(self, symbol, literal):
+        return self.buckets.get(literal, array("q"))
+
+
+class SortedIndex(Index):
+    """
+    Sorted index holding the row positions ordered by key. Answers equality
+    and range lookups by binary search.
+    """
+    kind = "SORTED"
+    symbols = ("=", "<", "<=", ">", ">=")
+
+    def build(self, data):
+        keys = index_keys(data.column(self.column))
+        if not isinstance(keys, array):
+            keys = list(keys)
+        self.order = array("q", sorted(range(len(keys)), key=keys.__getitem__))
+        self.keys = [keys[i] for i in self.order]
+        self.source = data
+
+    def lookup(self, symbol, literal):
+        keys = self.keys
+        if symbol == "=":
+            lo, hi = bisect_left(keys, literal), bisect_right(keys, literal)
+        elif symbol == "<":
+            lo, hi = 0, bisect_left(keys, literal)
+        elif symbol == "<=":
+            lo, hi = 0, bisect_right(keys, literal)
+        elif symbol == ">":
+            lo, hi = bisect_right(keys, literal), len(keys)
+        else:
+            lo, hi = bisect_left(keys, literal), len(keys)
+        return array("q", sorted(self.order[lo:hi]))
+
+
+def create_index(name, table, column, kind, data):
+    """
+    Build a new index. String columns default to a hash index and other
+    columns to a sorted index.
+    Args:
+        name (str): Index name.
+        table (str): Name of the table to index.
+        column (str): Column to index.
+        kind (str): 'HASH', 'SORTED' or None for the default.
+        data (Table): The table to index.
+    Returns:
+        Index: The built index.
+    """
+    if kind is None:
+        kind = "HASH" if data.column(column).kind == "string" else "SORTED"
+    index = HashIndex(name, table, column) if kind == "HASH" else SortedIndex(name, table, column)
+    index.build(data)
+    return index
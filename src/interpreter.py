@@ -1,6 +1,67 @@
 import csv
-from parser import Parser
-from filesCSV import FilesCSV
+import os
+import threading
+import time
+import zlib
+from cache import LRUCache
+from catalog import MEMORY_BUDGET, Catalog
+from parser import Parser, bind_parameters, count_parameters, count_unbound_parameters
+from plan import Plan
+from filesCSV import FilesCSV, can_fork, detect_compression
+from filesCQLC import FilesCQLC, is_cqlc
+from index import INDEX_KINDS, HashIndex, create_index
+from join import HashJoin, join_keys, join_tables
+from pipeline import BATCH_SIZE, PARALLEL_MIN_ROWS, Filter, IndexScan, Limit, ParallelFilter, Project, Scan, collect_positions
+from predicate import ConditionList, compile_conditions
+from render import RENDER_MODES, Renderer
+from result import Result
+from scheduler import PROCEDURE_WORKERS, build_dependencies, captured_output, run_concurrently
+from table import Table, append_column
+from views import MaterializedJoin, MaterializedSelect
+
+IMPORT_CACHE_SIZE = 32
+IMPORT_CACHE_BUDGET = 512 * 1024 * 1024
+FINGERPRINT_BYTES = 64 * 1024
+RESULT_CACHE_SIZE = 128
+RESULT_CACHE_BUDGET = 64 * 1024 * 1024
+ROW_BYTES = 56
+CELL_BYTES = 40
+QUERY_COMMANDS = (
+    "PRINT", "SELECT_NO_LIMIT", "SELECT_LIMIT", "SELECT_SPECIFIC_NO_LIMIT", "SELECT_SPECIFIC_LIMIT",
+    "SELECT_WHERE_NO_LIMIT", "SELECT_WHERE_LIMIT",
+)
+
+def file_fingerprint(path, length):
+    """
+    Checksum of the first bytes of a file (at most FINGERPRINT_BYTES and at
+    most length), used to notice a file rewritten with new contents.
+    """
+    with open(path, "rb") as file:
+        return zlib.crc32(file.read(min(length, FINGERPRINT_BYTES)))
+
+
+def result_bytes(header, rows):
+    """
+    Approximate memory footprint in bytes of query result rows.
+    """
+    return len(rows) * (ROW_BYTES + CELL_BYTES * len(header))
+
+
+def query_parts(query):
+    """
+    Split a parsed SELECT command into its parts.
+    Returns:
+        tuple: Table name, selected columns (None for all), ConditionList
+            (None without WHERE) and limit (0 for none).
+    """
+    kind = query[0]
+    limit = 0 if kind.endswith("NO_LIMIT") else int(query[-1])
+    if kind.startswith("SELECT_SPECIFIC"):
+        return query[2], query[1], None, limit
+    if kind.startswith("SELECT_WHERE"):
+        return query[1], None, ConditionList(query[2]), limit
+    return query[1], None, None, limit
+
 
 class Interpreter:
     """
@@ -8,20 +69,92 @@ class Interpreter:
     Attributes:
         parser (Parser): The YACC parser for interpreting CQL commands.
         filesCSV (FilesCSV): Utility for reading and writing CSV files.
-        tablesData (dict): In-memory storage of tables keyed by table name.
+        filesCQLC (FilesCQLC): Utility for reading and writing CQLC columnar files.
+        hashJoin (HashJoin): Join operator used by CREATE TABLE ... JOIN, with its memory budget.
+        tablesData (Catalog): In-memory columnar tables (Table) keyed by table name. The least
+            recently used tables are spilled to disk when they hold more than its budget.
         filePath (str): Default directory path for CSV files.
+        indexes (dict): Secondary indexes keyed by index name.
+        lastIndexUsed (str): Name of the index used by the last WHERE query of the calling
+            thread, or None.
+        batchSize (int): Number of rows each query operator processes at a time.
+        importStats (dict): Rows, seconds and rows per second of the last import of each table.
+        importWorkers (int): Number of processes used by IMPORT PARALLEL.
+        scanWorkers (int): Number of processes evaluating the WHERE conditions of a query
+            without LIMIT on a table of at least parallelMinRows rows. 1 keeps scans serial.
+        parallelMinRows (int): Smallest table scanned in parallel.
+        importCache (LRUCache): Tables parsed from CSV files, keyed by file path and import mode
+            and stored with the file's size and modification time, so importing an unchanged
+            file again reuses the table.
+        importCacheHash (bool): Also key the import cache on a hash of the file contents.
+        tailState (dict): For tables imported with APPEND, the table object, file, header,
+            consumed byte offset and identity of the file, keyed by table name.
+        procedureWorkers (int): Number of threads running the independent statements of a
+            procedure at the same time. 1 runs procedures one statement after another.
+        confineExports (bool): Refuse to export to a path outside exportPath, such as
+            '../x.csv'. Set while a CQLServer serves the interpreter to its clients.
+        concurrent (bool): True while a procedure runs statements on several threads. Scans
+            and imports are not split between processes then, as forking next to running
+            threads is unsafe.
+        prepared (dict): Prepared statements keyed by name, as (statement, parameter count, plan).
+        commands (dict): Plan builders keyed by command type.
+        views (dict): Definitions of the tables created with CREATE MATERIALIZED TABLE,
+            keyed by name in creation order. They are brought up to date with their
+            sources before each command.
+        tableVersions (dict): Counter of each table name, increased whenever the table
+            under that name is imported, created, appended to, renamed or discarded,
+            or one of its indexes is created or dropped.
+        resultCache (LRUCache): Header, rows and index used of recent SELECT queries, keyed
+            by the normalized query and the version of the table it reads.
     """
-    def __init__(self):
+    def __init__(self, optimize=True, memoryBudget=MEMORY_BUDGET):
         """
         Initialize the Interpreter with a Parser, FilesCSV utility,
         and empty tablesData storage.
+        Args:
+            optimize (bool): Load the cached lexer and parser tables without
+                validating the grammar again.
+            memoryBudget (int): Bytes the tables may hold in memory before
+                some are spilled to disk, or None for no limit.
         """
-        self.parser = Parser()
+        self.parser = Parser(optimize)
         self.filesCSV = FilesCSV()
-        self.tablesData = {}
+        self.filesCQLC = FilesCQLC()
+        self.hashJoin = HashJoin()
+        self.tablesData = Catalog(memoryBudget)
         self.filePath = "data/"
         self.exportPath = "output/"
         self.procedures = {}
+        self.indexes = {}
+        self.local = threading.local()
+        self.lastIndexUsed = None
+        self.batchSize = BATCH_SIZE
+        self.importStats = {}
+        self.importWorkers = os.cpu_count() or 1
+        self.scanWorkers = os.cpu_count() or 1
+        self.parallelMinRows = PARALLEL_MIN_ROWS
+        self.importCache = LRUCache(IMPORT_CACHE_SIZE, IMPORT_CACHE_BUDGET)
+        self.importCacheHash = False
+        self.tailState = {}
+        self.procedureWorkers = PROCEDURE_WORKERS
+        self.concurrent = False
+        self.confineExports = False
+        self.prepared = {}
+        self.views = {}
+        self.tableVersions = {}
+        self.resultCache = LRUCache(RESULT_CACHE_SIZE, RESULT_CACHE_BUDGET)
+        self.tablesData.add_cache(self.resultCache)
+        self.tablesData.add_cache(self.importCache, lambda entry: entry[1])
+        self.renderer = Renderer()
+        self.commands = self.command_table()
+
+    @property
+    def lastIndexUsed(self):
+        return getattr(self.local, "lastIndexUsed", None)
+
+    @lastIndexUsed.setter
+    def lastIndexUsed(self, name):
+        self.local.lastIndexUsed = name
 
     def run(self, data, is_test):
         """
@@ -41,123 +174,408 @@ class Interpreter:
             else:
                 self.execute(cmd, is_test)
 
+    def query(self, data):
+        """
+        Parse and run a block of CQL commands for use from Python code.
+        Nothing is printed: SELECT, PRINT and SHOW commands return their
+        rows in the Result, and other commands their status message.
+        Args:
+            data (str): The raw CQL commands string to run.
+        Returns:
+            list of Result: One result per command. If the parser reported
+                an error, nothing is run and the list holds a single Result
+                whose error is the parser's report.
+        """
+        with captured_output() as output:
+            commands = self.parser.parse(data)
+        report = "".join(output)
+        if commands is None or report:
+            error = report.strip() or "No result from parser"
+            return [Result(error, output=report, error=error)]
+        return [self.evaluate(command) for command in commands]
+
+    def evaluate(self, command):
+        """
+        Run a single parsed command and return its Result.
+        Args:
+            command (tuple): Parsed command in the form (CMD_TYPE, ...).
+        Returns:
+            Result: The rows and status of the command.
+        """
+        if count_unbound_parameters(command):
+            return Result(self.unbound_parameters())
+        if command[0] == "EXECUTE" and command[1] in self.prepared:
+            statement, count, _ = self.prepared[command[1]]
+            if len(command[2]) == count:
+                command = bind_parameters(statement, iter(command[2]))
+        with captured_output() as output:
+            self.lastIndexUsed = None
+            if command[0] in QUERY_COMMANDS:
+                if self.views:
+                    self.refresh_views()
+                table, message = self.query_table(command)
+            elif command[0] == "SHOW":
+                header, rows, message = self.show_data(command[1])
+                table = None if header is None else Table.from_rows(header, ([str(v) for v in row] for row in rows))
+            else:
+                table, message = None, self.execute(command, True)
+        return Result(message, table, self.lastIndexUsed, "".join(output))
+
+    def query_table(self, command):
+        """
+        Run a SELECT or PRINT command, returning its rows instead of printing them.
+        Args:
+            command (tuple): Parsed command in the form (CMD_TYPE, ...).
+        Returns:
+            tuple: The rows, as a view of the table (None if the query is
+                invalid), and a status message.
+        """
+        if command[0] == "PRINT":
+            if command[1] not in self.tablesData:
+                return None, f"Table {command[1]} does not exist."
+            return self.tablesData[command[1]], f"Table {command[1]} was printed."
+        table_name, columns, condition, limit = query_parts(command)
+        if table_name not in self.tablesData:
+            return None, f"Table {table_name} does not exist."
+        if columns is not None:
+            table = self.get_table_data_specific(table_name, columns, limit)
+            if table is None:
+                return None, f"{columns} was not selected from table {table_name}."
+            return table, f"{columns} was selected from table {table_name}."
+        if condition is not None:
+            table = self.get_table_data_where(table_name, condition, limit)
+            if table is None:
+                return None, f"Table {table_name} was not selected with the condition {condition}."
+            if self.lastIndexUsed is not None:
+                return table, f"Table {table_name} was selected with the condition {condition} using index {self.lastIndexUsed}."
+            return table, f"Table {table_name} was selected with the condition {condition}."
+        return self.get_table_data(table_name, limit), f"Table {table_name} was selected."
+
     def execute(self, command, is_test):
         """
-        Dispatch and execute a single parsed command tuple.
+        Run a single parsed command or compiled plan.
+        Args:
+            command (tuple or Plan): Parsed command in the form (CMD_TYPE, ...), or its plan.
+        Returns:
+            str: Result of the command, or None for an unknown command.
+        """
+        plan = command if isinstance(command, Plan) else self.compile(command)
+        if plan is None:
+            return None
+        if self.views:
+            self.refresh_views()
+        x = plan.run()
+        if is_test == False: print(x)
+        return x
+
+    def compile(self, command):
+        """
+        Bind a parsed command to the method that runs it.
         Args:
             command (tuple): Parsed command in the form (CMD_TYPE, ...).
         Returns:
-            None
+            Plan: The compiled command, or None if the command is unknown.
         """
-        cmd = command[0]
-        if cmd == "IMPORT":
-            x = self.import_table(command[1], command[2])
-            if is_test == False: print(x)
-            return x
-        elif cmd == "EXPORT":
-            x = self.export_table(command[1], command[2])
-            if is_test == False: print(x)
-            return x
-        elif cmd == "RENAME":
-            x = self.rename_table(command[1], command[2])
-            if is_test == False: print(x)
-            return x
-        elif cmd == "PRINT":
-            x = self.print_table(command[1])
-            if is_test == False: print(x)
-            return x
-        elif cmd == "DISCARD":
-            x = self.discard_table(command[1])
-            if is_test == False: print(x)
-            return x
-        elif cmd == "SELECT_NO_LIMIT":
-            x = self.select_table(command[1], 0)
-            if is_test == False: print(x)
-            return x
-        elif cmd == "SELECT_LIMIT":
-            x = self.select_table(command[1], command[2])
-            if is_test == False: print(x)
-            return x
-        elif cmd == "SELECT_SPECIFIC_NO_LIMIT":
-            x = self.select_specific(command[2], command[1], 0)
-            if is_test == False: print(x)
-            return x
-        elif cmd == "SELECT_SPECIFIC_LIMIT":
-            x = self.select_specific(command[2], command[1], command[3])
-            if is_test == False: print(x)
-            return x
-        elif cmd == "SELECT_WHERE_NO_LIMIT":
-            x = self.select_where(command[1], command[2], 0)
-            if is_test == False: print(x)
-            return x
-        elif cmd == "SELECT_WHERE_LIMIT":
-            x = self.select_where(command[1], command[2], command[3])
-            if is_test == False: print(x)
-            return x
-        elif cmd == "CREATE_TABLE_SELECT_NO_LIMIT":
-            x = self.create_table_select(command[1], command[2], 0)
-            if is_test == False: print(x)
-            return x
-        elif cmd == "CREATE_TABLE_SELECT_LIMIT":
-            x = self.create_table_select(command[1], command[2], command[3])
-            if is_test == False: print(x)
-            return x
-        elif cmd == "CREATE_TABLE_SELECT_WHERE_NO_LIMIT":
-            x = self.create_table_select_where(command[1],command[2], command[3], 0)
-            if is_test == False: print(x)
-            return x
-        elif cmd == "CREATE_TABLE_SELECT_WHERE_LIMIT":
-            x = self.create_table_select_where(command[1], command[2], command[3], command[4])
-            if is_test == False: print(x)
-            return x
-        elif cmd == "PROCEDURE":
-            x = self.store_procedure(command[1], command[2])
-            if is_test == False: print(x)
-            return x
-        elif cmd == "CREATE_TABLE_FROM_JOIN":
-            x = self.create_table_from_join(command[1], command[2], command[3], command[4])
-            if is_test == False: print(x)
-            return x
-        elif cmd == "CALL":
-            x = self.call_procedure(command[1])
-            if is_test == False: print(x)
-            return x
-
-    def import_table(self, table_name, filename):
-        """
-        Import a CSV file into memory as a table.
+        build = self.commands.get(command[0])
+        if build is None:
+            return None
+        if count_unbound_parameters(command):
+            return Plan(command, self.unbound_parameters, ())
+        handler, *args = build(command)
+        return Plan(command, handler, args)
+
+    def command_table(self):
+        """
+        Return, for each command type, a function taking the parsed command
+        and returning the method that runs it followed by its arguments.
+        """
+        return {
+            "IMPORT": lambda c: (self.import_table, c[1], c[2]),
+            "IMPORT_PARALLEL": lambda c: (self.import_table, c[1], c[2], self.importWorkers),
+            "IMPORT_LAZY": lambda c: (self.import_table, c[1], c[2], 1, True),
+            "IMPORT_APPEND": lambda c: (self.append_table, c[1], c[2]),
+            "EXPORT": lambda c: (self.export_table, c[1], c[2]),
+            "EXPORT_QUERY": lambda c: (self.export_query, c[1], c[2]),
+            "RENAME": lambda c: (self.rename_table, c[1], c[2]),
+            "PRINT": lambda c: (self.print_table, c[1]),
+            "DISCARD": lambda c: (self.discard_table, c[1]),
+            "SELECT_NO_LIMIT": lambda c: (self.select_table, c[1], 0),
+            "SELECT_LIMIT": lambda c: (self.select_table, c[1], c[2]),
+            "SELECT_SPECIFIC_NO_LIMIT": lambda c: (self.select_specific, c[2], c[1], 0),
+            "SELECT_SPECIFIC_LIMIT": lambda c: (self.select_specific, c[2], c[1], c[3]),
+            "SELECT_WHERE_NO_LIMIT": lambda c: (self.select_where, c[1], ConditionList(c[2]), 0),
+            "SELECT_WHERE_LIMIT": lambda c: (self.select_where, c[1], ConditionList(c[2]), c[3]),
+            "CREATE_TABLE_SELECT_NO_LIMIT": lambda c: (self.create_table_select, c[1], c[2], 0),
+            "CREATE_TABLE_SELECT_LIMIT": lambda c: (self.create_table_select, c[1], c[2], c[3]),
+            "CREATE_TABLE_SELECT_WHERE_NO_LIMIT": lambda c: (self.create_table_select_where, c[1], c[2], ConditionList(c[3]), 0),
+            "CREATE_TABLE_SELECT_WHERE_LIMIT": lambda c: (self.create_table_select_where, c[1], c[2], ConditionList(c[3]), c[4]),
+            "PROCEDURE": lambda c: (self.store_procedure, c[1], c[2]),
+            "CREATE_TABLE_FROM_JOIN": lambda c: (self.create_table_from_join, c[1], c[2], c[3], c[4]),
+            "CREATE_MATERIALIZED_SELECT": lambda c: (self.create_materialized, lambda: MaterializedSelect(c[1], c[2], c[3] and ConditionList(c[3]), c[4])),
+            "CREATE_MATERIALIZED_JOIN": lambda c: (self.create_materialized, lambda: MaterializedJoin(c[1], c[2], c[3], c[4], self.hashJoin)),
+            "CALL": lambda c: (self.call_procedure, c[1]),
+            "CREATE_INDEX": lambda c: (self.create_index, c[1], c[2], c[3], c[4]),
+            "DROP_INDEX": lambda c: (self.drop_index, c[1]),
+            "SHOW": lambda c: (self.show, c[1]),
+            "SET": lambda c: (self.set_option, c[1], c[2]),
+            "PREPARE": lambda c: (self.prepare_statement, c[1], c[2]),
+            "EXECUTE": lambda c: (self.execute_statement, c[1], c[2]),
+        }
+
+    def import_table(self, table_name, filename, workers=1, lazy=False):
+        """
+        Import a CSV file into memory as a table. A '.cqlc' file is mapped
+        into memory instead of parsed, and a CSV file that has not changed
+        since it was last imported is served from importCache.
         Args:
             table_name (str): Name to assign to the imported table.
-            filename (str): CSV filename to read (relative to filePath).
+            filename (str): CSV or CQLC filename to read (relative to filePath).
+            workers (int): Number of processes parsing the file.
+            lazy (bool): Only index the record offsets of a CSV file, and
+                decode rows and columns when queries read them.
         Returns:
             str: Result
         """
-        data = self.filesCSV.read_csv(self.filePath + filename)
-        if data:
+        if is_cqlc(filename):
+            data = self.filesCQLC.read_cqlc(self.filePath + filename)
+            stats = self.filesCQLC.lastReadStats
+        else:
+            data, stats = self.read_csv_cached(self.filePath + filename, workers, lazy)
+        if data is not None:
             self.tablesData[table_name] = data
+            self.bump_version(table_name)
+            self.importStats[table_name] = dict(stats, file=filename)
+            self.refresh_indexes(table_name)
             return f"Table '{table_name}' imported successfully"
         else:
             return f"Table {table_name} was not imported"
 
+    def append_table(self, table_name, filename):
+        """
+        Import only the records appended to a CSV file since the last
+        IMPORT ... APPEND of the table. The whole file is read again the
+        first time, and when it was truncated, replaced or its header changed.
+        A compressed file is always read again whole, as it can only be
+        decompressed from its start.
+        Args:
+            table_name (str): Name of the table.
+            filename (str): CSV filename to read (relative to filePath).
+        Returns:
+            str: Result
+        """
+        path = self.filePath + filename
+        state = self.tailState.get(table_name)
+        if state is None or state["path"] != os.path.abspath(path) or self.tablesData.get(table_name) is not state["table"]:
+            return self.reload_tail(table_name, filename)
+        if detect_compression(path) is not None:
+            return self.reload_tail(table_name, filename, "compressed files are read again whole")
+        try:
+            info = os.stat(path)
+            header, _ = self.filesCSV.read_header(path)
+            fingerprint = file_fingerprint(path, state["offset"])
+        except OSError as e:
+            return f"Table {table_name} was not imported: {str(e)}"
+        if (info.st_dev, info.st_ino) != state["identity"] or info.st_size < state["offset"]:
+            return self.reload_tail(table_name, filename, "the file was truncated or replaced")
+        if header != state["header"] or fingerprint != state["fingerprint"]:
+            return self.reload_tail(table_name, filename, "the file was rewritten")
+
+        data = self.tablesData[table_name]
+        columns, count, end, error = self.filesCSV.read_tail(path, state["offset"], len(header))
+        if error:
+            print(error)
+            return f"Table {table_name} was not imported"
+        self.importStats[table_name] = dict(self.filesCSV.lastReadStats, file=filename, cached=False)
+        if count == 0:
+            return f"Table '{table_name}' is up to date"
+        data = Table(header, [append_column(c, n) for c, n in zip(data.columns, columns)], lineage=data.lineage)
+        self.tablesData[table_name] = data
+        self.bump_version(table_name)
+        state["table"] = data
+        state["offset"] = end
+        self.refresh_indexes(table_name)
+        return f"Table '{table_name}' appended {count} rows"
+
+    def reload_tail(self, table_name, filename, reason=None):
+        """
+        Read a whole CSV file for IMPORT ... APPEND, stopping before a last
+        record still being written, and remember where reading stopped.
+        Args:
+            table_name (str): Name of the table.
+            filename (str): CSV filename to read (relative to filePath).
+            reason (str): Why the table is read again, or None for a first import.
+        Returns:
+            str: Result
+        """
+        path = self.filePath + filename
+        self.tailState.pop(table_name, None)
+        try:
+            info = os.stat(path)
+            header, offset = self.filesCSV.read_header(path)
+            if header is None:
+                print(f"Error reading CSV file: {path} has no header")
+                return f"Table {table_name} was not imported"
+            columns, _, end, error = self.filesCSV.read_tail(path, offset, len(header))
+            fingerprint = file_fingerprint(path, end)
+        except OSError as e:
+            print(f"Error reading CSV file: {str(e)}")
+            return f"Table {table_name} was not imported"
+        if error:
+            print(error)
+            return f"Table {table_name} was not imported"
+
+        data = Table(header, columns)
+        self.tablesData[table_name] = data
+        self.bump_version(table_name)
+        self.importStats[table_name] = dict(self.filesCSV.lastReadStats, file=filename, cached=False)
+        self.tailState[table_name] = {
+            "table": data,
+            "path": os.path.abspath(path),
+            "header": header,
+            "offset": end,
+            "identity": (info.st_dev, info.st_ino),
+            "fingerprint": fingerprint,
+        }
+        self.refresh_indexes(table_name)
+        if reason is None:
+            return f"Table '{table_name}' imported successfully"
+        return f"Table '{table_name}' was reloaded: {reason}"
+
+    def read_csv_cached(self, path, workers, lazy):
+        """
+        Read a CSV file, or reuse the table parsed from it earlier if the
+        file has not changed since.
+        Args:
+            path (str): Path of the file.
+            workers (int): Number of processes parsing the file; 1 while
+                concurrent is set.
+            lazy (bool): Open the file as a LazyTable.
+        Returns:
+            tuple: The table (None on error) and the read statistics.
+        """
+        started = time.perf_counter()
+        key = (os.path.abspath(path), lazy)
+        version = self.file_version(path)
+        entry = self.importCache.get(key, lambda e: e[0] == version) if version is not None else None
+        if entry is not None:
+            data = entry[1]
+            seconds = time.perf_counter() - started
+            return data, {
+                "rows": len(data),
+                "seconds": seconds,
+                "rowsPerSecond": len(data) / seconds if seconds else 0.0,
+                "workers": 0,
+                "cached": True,
+            }
+
+        if lazy:
+            data = self.filesCSV.read_lazy(path)
+        else:
+            data = self.filesCSV.read_csv(path, 1 if self.concurrent else workers)
+        if data is None:
+            return None, None
+        if version is not None:
+            self.importCache.put(key, (version, data), data.nbytes())
+        return data, dict(self.filesCSV.lastReadStats, cached=False)
+
+    def file_version(self, path):
+        """
+        Identify the contents of a file by its size and modification time,
+        plus a hash of the contents when importCacheHash is set.
+        Returns:
+            tuple: The version, or None if the file cannot be read.
+        """
+        try:
+            info = os.stat(path)
+            version = (info.st_size, info.st_mtime_ns)
+            if self.importCacheHash:
+                import hashlib
+                digest = hashlib.sha256()
+                with open(path, "rb") as file:
+                    for block in iter(lambda: file.read(self.filesCSV.chunkSize), b""):
+                        digest.update(block)
+                version += (digest.hexdigest(),)
+            return version
+        except OSError:
+            return None
+
     def export_table(self, table_name, filename):
         """
-        Export an in-memory table to a CSV file.
+        Export an in-memory table to a CSV file, or to a CQLC columnar file
+        if the name ends in '.cqlc'.
         Args:
             table_name (str): Name of the table to export.
-            filename (str): Destination CSV filename.
+            filename (str): Destination CSV or CQLC filename.
         Returns:
             str: Result
         """
         if table_name not in self.tablesData:
             return f"Table {table_name} does not exist."
+        path = self.export_path(filename)
+        if path is None:
+            return(f"Cannot export to '{filename}' outside {self.exportPath}.")
         
-        result = self.filesCSV.write_csv(self.exportPath + filename, self.tablesData[table_name])
+        if is_cqlc(filename):
+            result = self.filesCQLC.write_cqlc(path, self.tablesData[table_name])
+        else:
+            result = self.filesCSV.write_csv(path, self.tablesData[table_name])
         if(result):
             return f"Table '{table_name}' exported successfully"
         else:
             return f"Table '{table_name}' was not exported successfully"
 
 
+    def export_path(self, filename):
+        """
+        Return the path an export to filename writes, or None if
+        confineExports is set and the path leads out of exportPath.
+        """
+        path = self.exportPath + filename
+        if self.confineExports:
+            root = os.path.realpath(self.exportPath)
+            if os.path.commonpath([root, os.path.realpath(path)]) != root:
+                return None
+        return path
+
+    def export_query(self, query, filename):
+        """
+        Export the rows of a SELECT to a CSV file as the query pipeline
+        produces them, a batch of positions at a time, without building a
+        table of the results. CQLC files need all the rows at once, so for
+        them the positions of the rows are collected first.
+        Args:
+            query (tuple): Parsed SELECT command.
+            filename (str): Destination CSV or CQLC filename.
+        Returns:
+            str: Result
+        """
+        table_name, columns, condition, limit = query_parts(query)
+        if table_name not in self.tablesData:
+            return(f"Table {table_name} does not exist.")
+        path = self.export_path(filename)
+        if path is None:
+            return(f"Cannot export to '{filename}' outside {self.exportPath}.")
+        data = self.tablesData[table_name]
+        for col in columns or []:
+            if col not in data.header:
+                return(f"Column {col} does not exist in table {table_name}.")
+        positions = self.scan_table(table_name, condition, limit)
+        if positions is None:
+            return(f"Table {table_name} was not exported with the condition {condition}.")
+
+        if is_cqlc(filename):
+            view = data.view(columns=columns, indices=collect_positions(positions))
+            count = len(view) if self.filesCQLC.write_cqlc(path, view) else None
+        else:
+            # By position, as a join result repeats the names of its key columns.
+            mapping = range(len(data.header)) if columns is None else [data.column_index(c) for c in columns]
+            sources = [data.columns[j] for j in mapping]
+            batches = ([[c.text(i) for c in sources] for i in batch] for batch in positions)
+            count = self.filesCSV.write_rows(path, [data.header[j] for j in mapping], batches)
+        if count is None:
+            return(f"Query on table {table_name} was not exported successfully")
+        return(f"{count} rows of table {table_name} exported to '{filename}'")
+
     def rename_table(self, table_name, new_name):
         """
         Rename a table stored in memory.
@@ -168,7 +586,15 @@ class Interpreter:
             str: Result
         """
         if table_name in self.tablesData:
-            self.tablesData[new_name] = self.tablesData.pop(table_name)
+            self.tablesData.rename(table_name, new_name)
+            self.bump_version(table_name, new_name)
+            if table_name in self.tailState:
+                self.tailState[new_name] = self.tailState.pop(table_name)
+            for name, index in list(self.indexes.items()):
+                if index.table == new_name:
+                    self.indexes.pop(name)
+                elif index.table == table_name:
+                    index.table = new_name
             return(f"Table {table_name} renamed to {new_name}.")
         else:
             return(f"Table {table_name} does not exist.")
@@ -185,11 +611,7 @@ class Interpreter:
         if table_name in self.tablesData:
             
             data = self.tablesData[table_name]
-            header = data.get("header")
-            rows = data.get("data")
-            print(header)
-            for row in rows:
-                print(row)
+            self.renderer.render(data.header, data.rows(), len(data))
             return(f"Table {table_name} was printed.")
         else:
             return(f"Table {table_name} was not printed.")
@@ -204,6 +626,11 @@ class Interpreter:
         """
         if table_name in self.tablesData:
             self.tablesData.pop(table_name)
+            self.bump_version(table_name)
+            self.tailState.pop(table_name, None)
+            for name, index in list(self.indexes.items()):
+                if index.table == table_name:
+                    self.indexes.pop(name)
             return(f"Table {table_name} was discarded.")
         else:
             return(f"Table {table_name} not found.")
@@ -225,13 +652,10 @@ class Interpreter:
             print(f"Table {table_name} does not exist.")
             return None
 
-        selectedTable = self.get_table_data(table_name, limit)
-        if selectedTable is None:
-            return(f"Table {table_name} not found.")
-
-        header = selectedTable.get("header")
-        data = selectedTable.get("data")
-        self.print_data(header, data)
+        header, rows, _ = self.cached_query(
+            ("SELECT", table_name, int(limit)), table_name,
+            lambda: Project(self.scan_table(table_name, None, limit), self.tablesData[table_name]))
+        self.print_data(header, rows)
         return(f"Table {table_name} was selected.")
 
 
@@ -257,12 +681,15 @@ class Interpreter:
             print(f"Table {table_name} does not exist.")
             return None
 
-        selectedTable = []
-        selectedTable = self.get_table_data_specific(table_name, columns, limit)
-        if selectedTable is None:
-            return(f"{columns} was not selected from table {table_name}.")
+        data = self.tablesData[table_name]
+        for col in columns:
+            if col not in data.header:
+                return(f"{columns} was not selected from table {table_name}.")
 
-        self.print_data(selectedTable["header"], selectedTable["data"])
+        header, rows, _ = self.cached_query(
+            ("SELECT_SPECIFIC", table_name, tuple(columns), int(limit)), table_name,
+            lambda: Project(self.scan_table(table_name, None, limit), data, [data.column_index(c) for c in columns]))
+        self.print_data(header, rows)
         return(f"{columns} was selected from table {table_name}.")
 
     def select_where(self, table_name, condition, limit):
@@ -270,12 +697,18 @@ class Interpreter:
             return("Table name is empty")
         if table_name not in self.tablesData:
             return(f"Table {table_name} does not exist.")
-        selectedTable = []
-        selectedTable = self.get_table_data_where(table_name, condition, limit)
-        if selectedTable is None:
+        def run():
+            positions = self.scan_table(table_name, condition, limit)
+            return None if positions is None else Project(positions, self.tablesData[table_name])
+
+        key = ("SELECT_WHERE", table_name, tuple(sorted(condition, key=repr)), int(limit))
+        result = self.cached_query(key, table_name, run)
+        if result is None:
             return(f"Table {table_name} was not selected with the condition {condition}.")
-        
-        self.print_data(selectedTable["header"], selectedTable["data"])
+        header, rows, self.lastIndexUsed = result
+        self.print_data(header, rows)
+        if self.lastIndexUsed is not None:
+            return(f"Table {table_name} was selected with the condition {condition} using index {self.lastIndexUsed}.")
         return(f"Table {table_name} was selected with the condition {condition}.")
 
         
@@ -294,6 +727,7 @@ class Interpreter:
         if newTable is None:
             return(f"Failed to retrieve data from table {table_name}.")
         self.tablesData[new_table] = newTable
+        self.bump_version(new_table)
         return(f"Table {new_table} created from {table_name}.")
     
     def create_table_select_where(self, new_table, table_name, condition, limit):
@@ -310,6 +744,7 @@ class Interpreter:
         if newTable is None:
             return(f"Failed to retrieve data from table {table_name}.")
         self.tablesData[new_table] = newTable
+        self.bump_version(new_table)
         return(f"Table {new_table} created from {table_name} with condition {condition}")
 
 
@@ -318,7 +753,7 @@ class Interpreter:
         Create a procedure with the given name and command.
         Args:
             name (str): Name of the procedure.
-            command (str): Command to execute when the procedure is called.
+            command (list): Parsed commands, compiled into plans run when the procedure is called.
         Returns:
             None
         """
@@ -326,7 +761,7 @@ class Interpreter:
             return(f"Procedure {name} already exists.")
         if not command:
             return("Command is empty")
-        self.procedures[name] = command
+        self.procedures[name] = [self.compile(cmd) for cmd in command]
         return(f"Procedure '{name}' stored successfully.")
 
     def call_procedure(self, name):
@@ -339,12 +774,116 @@ class Interpreter:
         """
         if name not in self.procedures:
             return(f"Procedure {name} does not exist.")
-        
-        for cmd in self.procedures[name]:
-            self.execute(cmd, False)
+
+        plans = self.procedures[name]
+        dependencies = build_dependencies([self.statement_access(plan.command) for plan in plans])
+        serial = (
+            self.procedureWorkers <= 1 or self.views
+            or all(j - 1 in depends for j, depends in enumerate(dependencies) if j)
+            or any(plan.command[0].startswith("CREATE_MATERIALIZED") for plan in plans)
+        )
+        if serial:
+            for plan in plans:
+                self.execute(plan, False)
+            return(f"Procedure {name} was called.")
+
+        concurrent = self.concurrent
+        self.concurrent = True
+        try:
+            for text, x in run_concurrently(plans, dependencies, self.procedureWorkers):
+                print(text, end="")
+                print(x)
+        finally:
+            self.concurrent = concurrent
         return(f"Procedure {name} was called.")
 
+    def statement_access(self, command):
+        """
+        Return the tables and files a parsed command reads and writes, used
+        to find the statements of a procedure that can run at the same time.
+        Files are named by ('file', path) pairs; importing a file writes it
+        too, so imports of one file stay in order and share the import cache.
+        Reading a view also reads the tables its base is stored under, as
+        discarding or replacing the base copies the rows of the view.
+        Args:
+            command (tuple): Parsed command in the form (CMD_TYPE, ...).
+        Returns:
+            tuple: Sets of names read and written, or None for a command
+                that must run alone (indexes, procedures, statements, SHOW...).
+        """
+        access = self.named_access(command)
+        if access is None:
+            return None
+        reads, writes = access
+        for name in list(reads):
+            reads |= self.tablesData.bases(name)
+        return reads, writes
+
+    def named_access(self, command):
+        """
+        Return the tables and files a parsed command names, as statement_access.
+        """
+        kind = command[0]
+        if kind in ("IMPORT", "IMPORT_LAZY", "IMPORT_APPEND"):
+            return set(), {command[1], ("file", os.path.abspath(self.filePath + command[2]))}
+        if kind == "EXPORT":
+            return {command[1]}, {("file", os.path.abspath(self.exportPath + command[2]))}
+        if kind == "EXPORT_QUERY":
+            return {query_parts(command[1])[0]}, {("file", os.path.abspath(self.exportPath + command[2]))}
+        if kind == "RENAME":
+            return set(), {command[1], command[2]}
+        if kind == "DISCARD":
+            return set(), {command[1]}
+        if kind in ("PRINT", "SELECT_NO_LIMIT", "SELECT_LIMIT", "SELECT_WHERE_NO_LIMIT", "SELECT_WHERE_LIMIT"):
+            return {command[1]}, set()
+        if kind in ("SELECT_SPECIFIC_NO_LIMIT", "SELECT_SPECIFIC_LIMIT"):
+            return {command[2]}, set()
+        if kind.startswith("CREATE_TABLE_SELECT"):
+            return {command[2]}, {command[1]}
+        if kind == "CREATE_TABLE_FROM_JOIN":
+            return {command[2], command[3]}, {command[1]}
+        return None
+
     
+    def prepare_statement(self, name, statement):
+        """
+        Store a parsed query under a name to be run later with EXECUTE.
+        Args:
+            name (str): Name of the prepared statement.
+            statement (tuple): Parsed query, with '?' parameters.
+        Returns:
+            str: Result
+        """
+        count = count_parameters(statement)
+        plan = self.compile(statement) if count == 0 else None
+        self.prepared[name] = (statement, count, plan)
+        return(f"Statement {name} prepared with {count} parameters.")
+
+    def unbound_parameters(self):
+        """
+        Result of a command with '?' parameters outside a PREPARE statement.
+        """
+        return("Parameters '?' are only allowed in PREPARE statements.")
+
+    def execute_statement(self, name, values):
+        """
+        Run a prepared statement with values for its parameters. The
+        statement is not lexed or parsed again.
+        Args:
+            name (str): Name of the prepared statement.
+            values (list): Parameter values, in order.
+        Returns:
+            str: Result of the query.
+        """
+        if name not in self.prepared:
+            return(f"Statement {name} does not exist.")
+        statement, count, plan = self.prepared[name]
+        if len(values) != count:
+            return(f"Statement {name} expects {count} parameters, got {len(values)}.")
+        if plan is not None:
+            return self.execute(plan, True)
+        return self.execute(bind_parameters(statement, iter(values)), True)
+
     def create_table_from_join(self, new_table, table_name1, table_name2, id):
         if table_name1 == "":
             print("Table name is empty")
@@ -362,42 +901,143 @@ class Interpreter:
             print(f"Table {new_table} already exists.")
             return None
         
-        data1 = self.tablesData[table_name1]
-        data2 = self.tablesData[table_name2]
-        header1 = data1.get("header")
-        header2 = data2.get("header")
+        table1 = self.tablesData[table_name1]
+        table2 = self.tablesData[table_name2]
 
-        if id not in header1 or id not in header2:
+        if id not in table1.header or id not in table2.header:
             print(f"Column {id} does not exist in one of the tables.")
             return None
-        
-        index1 = header1.index(id)
-        index2 = header2.index(id)
-        new_header = header1 + [col for col in header2 if col != id]
-        new_tableData = []
-        for row1 in data1["data"]:
-            join_val = row1[index1]
-            for row2 in data2["data"]:
-                if row2[index2] == join_val:
-                    new_row = row1 + [
-                        row2[i] for i in range(len(row2)) if header2[i] != id
-                    ]
-                    new_tableData.append(new_row)
-                    
-        self.tablesData[new_table] = {"header": new_header, "data": new_tableData}
-        print(f"Table {new_table} created from join of {table_name1} and {table_name2} using the column {id}.")
+
+        column1 = table1.column(id)
+        column2 = table2.column(id)
+        keys1, keys2 = join_keys(column1, column2)
+        if column1.kind == column2.kind or {column1.kind, column2.kind} == {"int", "float"}:
+            index1 = self.find_index(table_name1, id, "=", HashIndex)
+            index2 = self.find_index(table_name2, id, "=", HashIndex)
+        else:
+            index1 = index2 = None
+        if index2 is not None:
+            index2.uses += 1
+            indices1, indices2 = self.hashJoin.join(keys1, keys2, rightIndex=index2.buckets)
+        elif index1 is not None:
+            index1.uses += 1
+            indices1, indices2 = self.hashJoin.join(keys1, keys2, leftIndex=index1.buckets)
+        else:
+            indices1, indices2 = self.hashJoin.join(keys1, keys2)
+
+        self.tablesData[new_table] = join_tables(table1, table2, id, indices1, indices2)
+        self.bump_version(new_table)
+        return(f"Table {new_table} created from join of {table_name1} and {table_name2} using the column {id}.")
+
+    def create_materialized(self, define):
+        """
+        Create a table from a SELECT or JOIN definition that is kept up to
+        date with its source tables: rows appended to a source are filtered
+        or joined on their own and added to the table, and the table is only
+        computed again when a source is replaced.
+        Args:
+            define (callable): Returns a new MaterializedTable defining the
+                table. Each run builds its own, so a procedure called again
+                does not reuse the state of the table its last call created.
+        Returns:
+            str: Result
+        """
+        view = define()
+        for source in view.sources:
+            if source not in self.tablesData:
+                print(f"Table {source} does not exist.")
+                return None
+        if view.name in self.tablesData:
+            print(f"Table {view.name} already exists.")
+            return None
+        data = view.rebuild(self.tablesData)
+        if data is None:
+            return(f"Failed to retrieve data from table {', '.join(view.sources)}.")
+        self.tablesData[view.name] = data
+        self.bump_version(view.name)
+        self.views[view.name] = view
+        return(f"Materialized table {view.name} created from {', '.join(view.sources)}.")
+
+    def refresh_views(self):
+        """
+        Bring every materialized table up to date with its sources, in
+        creation order so tables defined on other materialized tables see
+        their new rows. A materialized table that was discarded, renamed or
+        replaced stops being maintained; one whose source is missing keeps
+        its rows until the source exists again.
+        """
+        for name, view in list(self.views.items()):
+            if self.tablesData.get(name) is not view.table:
+                self.views.pop(name)
+                continue
+            data = view.refresh(self.tablesData)
+            if data is not None:
+                self.tablesData[name] = data
+                self.bump_version(name)
+                self.refresh_indexes(name)
+
+    def bump_version(self, *names):
+        """
+        Mark the tables under the given names as changed, so cached query
+        results that read them (and name the index they used) are no longer used.
+        """
+        for name in names:
+            self.tableVersions[name] = self.tableVersions.get(name, 0) + 1
+
+    def cached_query(self, key, table_name, run):
+        """
+        Return the result of a query from resultCache, or run it. A cached
+        result is only used while the table it reads keeps the version it
+        had when the query ran. The rows of a query that runs are streamed
+        from its pipeline, and cached once they have all been read.
+        Args:
+            key (tuple): Normalized query.
+            table_name (str): Table the query reads.
+            run (callable): Builds the Project operator of the query, or returns None if it is invalid.
+        Returns:
+            tuple: Header, rows (a list, or an iterator for a query that
+                runs) and the name of the index used (or None), or None if
+                the query is invalid.
+        """
+        key = key + (self.tableVersions.get(table_name, 0),)
+        result = self.resultCache.get(key)
+        if result is not None:
+            return result
+        self.lastIndexUsed = None
+        rows = run()
+        if rows is None:
+            return None
+        return rows.header, self.caching_rows(key, rows.header, rows.rows(), self.lastIndexUsed), self.lastIndexUsed
+
+    def caching_rows(self, key, header, rows, indexUsed):
+        """
+        Yield the rows of a query result, collecting them to cache the
+        result once they have all been read. Collecting stops as soon as the
+        rows outgrow the budget of resultCache, so a large result is streamed
+        without being held in memory, and is not cached.
+        """
+        cache = self.resultCache
+        collected = [] if cache.capacity > 0 else None
+        rowBytes = ROW_BYTES + CELL_BYTES * len(header)
+        for row in rows:
+            if collected is not None:
+                collected.append(row)
+                if cache.budget is not None and len(collected) * rowBytes > cache.budget:
+                    collected = None
+            yield row
+        if collected is not None:
+            cache.put(key, (header, collected, indexUsed), result_bytes(header, collected))
 
     def print_data(self, header, data):
         """
         Print the contents of a data object.
         Args:
-            data (dict): Data object to print.
+            header (list): Column names.
+            data (list): Rows to print.
         Returns:
             None
         """
-        print(header)
-        for row in data:
-            print(row)
+        self.renderer.render(header, data, len(data) if isinstance(data, list) else None)
     
     
     def get_table_data(self, table_name, limit):
@@ -409,21 +1049,15 @@ class Interpreter:
             limit (int): Maximum number of rows to return. If 0, return all rows.
 
         Returns:
-            dict: A array with 'header' and 'data' keys, or a message if the table doesn't exist.
+            TableView: The selected rows, read from the table without copying, or None if the table doesn't exist.
         """
         if not table_name:
             return None
         if table_name not in self.tablesData:
             return None
 
-        selectedTable = []
         data = self.tablesData[table_name]
-        dataLimit = int(limit) if limit != 0 else None
-        header = data.get("header")
-        rows = data.get("data")
-        for row in rows[:dataLimit]:
-            selectedTable.append(row)
-        return {"header": header, "data": selectedTable}
+        return data.view(indices=self.leading_rows(data, limit))
 
     def get_table_data_specific(self, table_name, columns, limit):
         """
@@ -436,25 +1070,23 @@ class Interpreter:
             limit (int, optional): Maximum number of rows to scan from the table.
 
         Returns:
-            dict: A dictionary with keys 'header' (list of column names) and
-                'data' (list of rows matching all conditions), or None if invalid.
+            TableView: The projected columns, read from the table without copying, or None if a column does not exist.
         """
         data = self.tablesData[table_name]
-        header = data.get("header")
-        rows = data.get("data")
 
         for col in columns:
-            if col not in header:
+            if col not in data.header:
                 return None
 
-        selectedTable = []
-        column_indices = [header.index(col) for col in columns]
-        dataLimit = int(limit) if limit != 0 else None
-        for row in rows[:dataLimit]:
-            selected_row = [row[i] for i in column_indices]
-            selectedTable.append(selected_row)
+        return data.view(columns=columns, indices=self.leading_rows(data, limit))
 
-        return {"header": columns, "data": selectedTable}
+    def leading_rows(self, data, limit):
+        """
+        Return the positions of the first limit rows of a table (all rows if
+        limit is 0), as a range so views of them can share the table buffers.
+        """
+        self.lastIndexUsed = None
+        return range(min(int(limit), len(data)) if limit else len(data))
 
     def get_table_data_where(self, table_name, condition, limit):
         """
@@ -462,53 +1094,201 @@ class Interpreter:
 
         Parameters:
             table_name (str): Name of the table to query.
-            conditions (list): List of conditions in the form (CONDITION, column, operator, value).
-            limit (int): Max number of rows to consider (0 means no limit).
+            conditions (list): List of conditions in the form (CONDITION, column, operator, value),
+                all of which must hold (AND).
+            limit (int): Max number of matching rows to return (0 means no limit).
+
+        Returns:
+            TableView: The rows matching the conditions, read from the table without copying, or None if a column does not exist.
+        """
+        positions = self.scan_table(table_name, condition, limit)
+        if positions is None:
+            return None
+        return self.tablesData[table_name].view(indices=collect_positions(positions))
+
+    def scan_table(self, table_name, condition, limit):
+        """
+        Build the operator pipeline producing the positions of the rows of a
+        table that match a condition list, stopping after limit matches.
+        An index is used as the source when one can answer a condition;
+        otherwise row groups whose zone map rules out a match are skipped,
+        and a large table scanned without limit is split between scanWorkers
+        processes.
+
+        Parameters:
+            table_name (str): Name of the table to scan.
+            condition (list): Conditions in the form (CONDITION, column, operator, value), or None.
+            limit (int): Max number of rows to produce (0 means no limit).
 
         Returns:
-            dict: A dictionary with 'header' and 'data' keys.
+            Limit: Operator yielding batches of row positions, or None if a column does not exist.
         """
         data = self.tablesData.get(table_name)
-        dataLimit = int(limit) if limit != 0 else None
-        intermediate = {}
-
-        index = 0
-        header = data.get("header")
-        rows = data.get("data")
-        for c in condition: 
-            filtered = []
-            for row in rows[:dataLimit]:
-                cell = row[header.index(c[1])]
-                cond = c[2]
-                value = c[3]
-                if cond == "=" and cell == value:
-                    filtered.append(row)
-                elif cond == "!=" and cell != value:
-                    filtered.append(row)
-                elif cond == "<" and cell < value:
-                    filtered.append(row)
-                elif cond == ">" and cell > value:
-                    filtered.append(row)
-                elif cond == "<=" and cell <= value:
-                    filtered.append(row)
-                elif cond == ">=" and cell >= value:
-                    filtered.append(row)
-            intermediate[index] = filtered
-            index += 1
-  
-        parsed_data = []
-        index = 0
-        dictLenght = len(intermediate)
-        if(dictLenght != 1):
-            for i in intermediate:
-                for j in intermediate[i]:
-                    if(i+1 > dictLenght):
-                        break
-                    for k in intermediate[i+1]:
-                        if(j[0] == k[0]):
-                            parsed_data.append(k)
-                break
-        else:
-            parsed_data = intermediate[0]
+        self.lastIndexUsed = None
+        if not condition:
+            return Limit(Scan(data, self.batchSize), limit)
+
+        predicate = compile_conditions(data, condition)
+        if predicate is None:
+            return None
+        for term in predicate.terms:
+            index = self.find_index(table_name, term.column, term.symbol)
+            if index is not None and term.indexable:
+                index.uses += 1
+                self.lastIndexUsed = index.name
+                source = IndexScan(index.lookup(term.symbol, term.literal), self.batchSize)
+                return Limit(Filter(source, predicate, skip=term), limit)
+        ranges = data.zones.ranges(predicate, len(data)) if data.zones is not None else None
+        if not limit and self.scanWorkers > 1 and len(data) >= self.parallelMinRows and can_fork() and not self.concurrent:
+            return Limit(ParallelFilter(predicate, ranges if ranges is not None else [range(len(data))], self.scanWorkers), 0)
+        return Limit(Filter(Scan(data, self.batchSize, ranges), predicate), limit)
+
+    def create_index(self, index_name, table_name, column, kind):
+        """
+        Build a secondary index on a table column.
+        Args:
+            index_name (str): Name of the new index.
+            table_name (str): Name of the table to index.
+            column (str): Column to index.
+            kind (str): 'HASH', 'SORTED' or None to pick from the column type.
+        Returns:
+            str: Result
+        """
+        if index_name in self.indexes:
+            return(f"Index {index_name} already exists.")
+        if table_name not in self.tablesData:
+            return(f"Table {table_name} does not exist.")
+        if column not in self.tablesData[table_name].header:
+            return(f"Column {column} does not exist in table {table_name}.")
+        if kind is not None and kind not in INDEX_KINDS:
+            return(f"Index type {kind} is not supported.")
+        index = create_index(index_name, table_name, column, kind, self.tablesData[table_name])
+        self.indexes[index_name] = index
+        self.bump_version(table_name)
+        return(f"Index {index_name} created on {table_name}({column}) using {index.kind}.")
+
+    def drop_index(self, index_name):
+        """
+        Remove a secondary index.
+        Args:
+            index_name (str): Name of the index to drop.
+        Returns:
+            str: Result
+        """
+        if index_name not in self.indexes:
+            return(f"Index {index_name} does not exist.")
+        index = self.indexes.pop(index_name)
+        self.bump_version(index.table)
+        return(f"Index {index_name} was dropped.")
+
+    def refresh_indexes(self, table_name):
+        """
+        Rebuild the indexes of a table after its data was replaced. Indexes on
+        columns the new data no longer has are dropped.
+        Args:
+            table_name (str): Name of the table whose data changed.
+        """
+        data = self.tablesData[table_name]
+        for name, index in list(self.indexes.items()):
+            if index.table != table_name:
+                continue
+            if index.column in data.header:
+                index.build(data)
+            else:
+                self.indexes.pop(name)
+                print(f"Index {name} was dropped: column {index.column} no longer exists.")
+
+    def find_index(self, table_name, column, symbol, kind=None):
+        """
+        Return an index on a table column able to answer a comparison, or None.
+        """
+        for index in self.indexes.values():
+            if index.table == table_name and index.column == column and index.supports(symbol):
+                if kind is None or isinstance(index, kind):
+                    return index
+        return None
 
-        return {"header": header, "data": parsed_data}    
\ No newline at end of file
+    def set_option(self, name, value):
+        """
+        Change how results are printed and files are written.
+        Args:
+            name (str): OUTPUT (the output mode: LIST, ALIGNED, CSV or TSV),
+                PAGE (rows per page in interactive mode, 0 to never page),
+                COMPRESS_LEVEL (0-9, for exports to '.gz', '.bz2' and '.xz'
+                files) or COMPRESS_BLOCK (bytes handed to the compressor at once).
+            value (str | float): New value.
+        Returns:
+            str: Result
+        """
+        if name == "OUTPUT":
+            if value not in RENDER_MODES:
+                return(f"Output mode {value} does not exist; use one of {', '.join(RENDER_MODES)}.")
+            self.renderer.mode = value
+            return(f"Output mode set to {value}.")
+        if name == "PAGE":
+            if isinstance(value, str) or value != int(value) or value < 0:
+                return("Page size must be a whole number of rows.")
+            self.renderer.pageRows = int(value)
+            return(f"Page size set to {int(value)} rows.")
+        if name == "COMPRESS_LEVEL":
+            if isinstance(value, str) or value != int(value) or not 0 <= value <= 9:
+                return("Compression level must be a whole number from 0 to 9.")
+            self.filesCSV.compressLevel = int(value)
+            return(f"Compression level set to {int(value)}.")
+        if name == "COMPRESS_BLOCK":
+            if isinstance(value, str) or value < 1:
+                return("Compression block size must be a number of bytes.")
+            self.filesCSV.compressBlock = int(value)
+            return(f"Compression block size set to {int(value)} bytes.")
+        return(f"Cannot set {name}.")
+
+    def show(self, topic):
+        """
+        Print information about the interpreter state.
+        Args:
+            topic (str): What to show. Supported: INDEXES, IMPORTS, CACHE, VIEWS, MEMORY.
+        Returns:
+            str: Result
+        """
+        header, rows, message = self.show_data(topic)
+        if header is not None:
+            self.print_data(header, rows)
+        return message
+
+    def show_data(self, topic):
+        """
+        Collect information about the interpreter state.
+        Args:
+            topic (str): What to show. Supported: INDEXES, IMPORTS, CACHE, VIEWS, MEMORY.
+        Returns:
+            tuple: Header and rows of the information (None if the topic is
+                unknown), and a status message.
+        """
+        if topic == "INDEXES":
+            rows = [[i.name, i.table, i.column, i.kind, i.uses] for i in self.indexes.values()]
+            return ["Index", "Table", "Column", "Type", "Uses"], rows, "Indexes were shown."
+        if topic == "IMPORTS":
+            rows = [
+                [name, s["file"], s["rows"], round(s["seconds"], 3), int(s["rowsPerSecond"]), s["workers"], s.get("cached", False)]
+                for name, s in self.importStats.items()
+            ]
+            return ["Table", "File", "Rows", "Seconds", "Rows/s", "Workers", "Cached"], rows, "Imports were shown."
+        if topic == "CACHE":
+            caches = {"statements": self.parser.cache, "imports": self.importCache, "results": self.resultCache}
+            rows = [
+                [name, len(cache), cache.capacity, cache.nbytes, cache.budget, cache.hits, cache.misses]
+                for name, cache in caches.items()
+            ]
+            return ["Cache", "Entries", "Capacity", "Bytes", "Budget", "Hits", "Misses"], rows, "Caches were shown."
+        if topic == "VIEWS":
+            rows = [
+                [name, ", ".join(v.sources), len(v.table), v.rebuilds, v.increments]
+                for name, v in self.views.items()
+            ]
+            return ["Table", "Sources", "Rows", "Rebuilds", "Increments"], rows, "Materialized tables were shown."
+        if topic == "MEMORY":
+            tables = self.tablesData
+            tables.measure()
+            rows = [[name, len(dict.__getitem__(tables, name)), tables.sizes[name], tables.state(name)] for name in tables.used]
+            return ["Table", "Rows", "Bytes", "State"], rows, f"Tables hold {tables.nbytes()} bytes in memory, caches {tables.cache_bytes()} bytes (budget {tables.budget}, {tables.spills} spills)."
+        return None, None, f"Cannot show {topic}."
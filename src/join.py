@@ -0,0 +1,155 @@
+from array import array
+from table import Table
+
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+BUILD_ENTRY_BYTES = 120
+SPILL_BATCH = 65536
+
+
+class HashJoin:
+    """
+    Equi-join operator producing the matching row positions of two key columns.
+    The hash table is built on the smaller side and probed with the larger one.
+    When the build side would not fit in memoryBudget, both sides are
+    partitioned by key hash into temporary files and joined one partition
+    at a time (Grace hash join).
+    Attributes:
+        memoryBudget (int): Maximum estimated size in bytes of an in-memory hash table.
+        partitions (int): Number of spill partitions used by the out-of-core join.
+        lastStrategy (str): Strategy used by the last join ('hash', 'index' or 'partitioned').
+    """
+    def __init__(self, memoryBudget=DEFAULT_MEMORY_BUDGET, partitions=16):
+        self.memoryBudget = memoryBudget
+        self.partitions = partitions
+        self.lastStrategy = None
+
+    def join(self, left, right, leftIndex=None, rightIndex=None):
+        """
+        Join two key sequences.
+        Args:
+            left (sequence): Join key of every row of the left table.
+            right (sequence): Join key of every row of the right table.
+            leftIndex (dict, optional): Prebuilt key -> positions table of the left side.
+            rightIndex (dict, optional): Prebuilt key -> positions table of the right side.
+        Returns:
+            tuple: Two array('q') of left and right row positions, ordered
+                by left position and then right position.
+        """
+        if rightIndex is not None:
+            self.lastStrategy = "index"
+            return self._probe(left, rightIndex)
+        if leftIndex is not None:
+            self.lastStrategy = "index"
+            indicesRight, indicesLeft = self._probe(right, leftIndex)
+            return self._sort_pairs(indicesLeft, indicesRight, len(right))
+        if min(len(left), len(right)) * BUILD_ENTRY_BYTES > self.memoryBudget:
+            self.lastStrategy = "partitioned"
+            return self._partitioned_join(left, right)
+        self.lastStrategy = "hash"
+        if len(right) <= len(left):
+            return self._hash_join(left, right)
+        indicesRight, indicesLeft = self._hash_join(right, left)
+        return self._sort_pairs(indicesLeft, indicesRight, len(right))
+
+    def _hash_join(self, probe, build):
+        buckets = {}
+        for j, key in enumerate(build):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [j]
+            else:
+                bucket.append(j)
+        return self._probe(probe, buckets)
+
+    def _probe(self, probe, buckets):
+        indicesProbe = array("q")
+        indicesBuild = array("q")
+        get = buckets.get
+        for i, key in enumerate(probe):
+            bucket = get(key)
+            if bucket is not None:
+                for j in bucket:
+                    indicesProbe.append(i)
+                    indicesBuild.append(j)
+        return indicesProbe, indicesBuild
+
+    def _partitioned_join(self, left, right):
+        import tempfile
+
+        count = self.partitions
+        with tempfile.TemporaryDirectory(prefix="cql_join_") as spillDir:
+            leftFiles = self._spill(left, count, spillDir, "left")
+            rightFiles = self._spill(right, count, spillDir, "right")
+            indicesLeft = array("q")
+            indicesRight = array("q")
+            for p in range(count):
+                build = {}
+                for key, j in self._read_spill(rightFiles[p]):
+                    build.setdefault(key, []).append(j)
+                if not build:
+                    leftFiles[p].close()
+                    continue
+                for key, i in self._read_spill(leftFiles[p]):
+                    for j in build.get(key, ()):
+                        indicesLeft.append(i)
+                        indicesRight.append(j)
+        return self._sort_pairs(indicesLeft, indicesRight, len(right))
+
+    def _spill(self, keys, count, spillDir, side):
+        import pickle
+
+        files = [open(f"{spillDir}/{side}_{p}.bin", "w+b") for p in range(count)]
+        batches = [[] for _ in range(count)]
+        for i, key in enumerate(keys):
+            p = hash(key) % count
+            batch = batches[p]
+            batch.append((key, i))
+            if len(batch) >= SPILL_BATCH:
+                pickle.dump(batch, files[p], pickle.HIGHEST_PROTOCOL)
+                batch.clear()
+        for p in range(count):
+            if batches[p]:
+                pickle.dump(batches[p], files[p], pickle.HIGHEST_PROTOCOL)
+            files[p].seek(0)
+        return files
+
+    def _read_spill(self, file):
+        import pickle
+
+        with file:
+            while True:
+                try:
+                    batch = pickle.load(file)
+                except EOFError:
+                    return
+                yield from batch
+
+    def _sort_pairs(self, indicesLeft, indicesRight, width):
+        order = sorted(i * width + j for i, j in zip(indicesLeft, indicesRight))
+        return array("q", (k // width for k in order)), array("q", (k % width for k in order))
+
+
+def join_keys(column1, column2):
+    """
+    Return the key sequences to join two columns on. Columns of the same
+    non-string kind are compared on their raw buffers, strings and an int
+    column against a float one on the decoded values, and columns of any
+    other two kinds on the text of their cells, as read from the CSV file.
+    """
+    kinds = {column1.kind, column2.kind}
+    if len(kinds) == 1 and column1.kind != "string":
+        return column1.values, column2.values
+    if len(kinds) == 1 or kinds == {"int", "float"}:
+        return list(column1), list(column2)
+    return [column1.text(i) for i in range(len(column1))], [column2.text(i) for i in range(len(column2))]
+
+
+def join_tables(table1, table2, column, indices1, indices2):
+    """
+    Build the joined table from the matching row positions: the columns of
+    table1 followed by the columns of table2 other than the join column.
+    """
+    columns2 = [col for col in table2.header if col != column]
+    left = table1.select(indices=indices1)
+    right = table2.select(columns=columns2, indices=indices2)
+    return Table(left.header + right.header, left.columns + right.columns)
@@ -21,6 +21,17 @@ class Lexer:
         'procedure': 'PROCEDURE',
         'end': 'END',
         'do': 'DO',
+        'index': 'INDEX',
+        'on': 'ON',
+        'drop': 'DROP',
+        'show': 'SHOW',
+        'parallel': 'PARALLEL',
+        'prepare': 'PREPARE',
+        'execute': 'EXECUTE',
+        'lazy': 'LAZY',
+        'append': 'APPEND',
+        'materialized': 'MATERIALIZED',
+        'set': 'SET',
     }
     tokens  = [
         'ID',
@@ -39,6 +50,7 @@ class Lexer:
         'COMMENT',
         'COMMENTS',
         'ASTERISK',
+        'PARAM',
         ] + list(reserved.values())
     
     t_COMMA = r'\,'
@@ -52,6 +64,7 @@ class Lexer:
     t_GREATER_THAN = r'>'
     t_GREATER_EQUALS = r'>='
     t_ASTERISK = r'\*'
+    t_PARAM = r'\?'
 
     t_ignore = ' \t\n'
 
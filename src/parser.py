@@ -1,12 +1,86 @@
+import os
+import re
+import threading
+import zlib
 import ply.yacc as yacc
+from cache import LRUCache
 from lexer import Lexer
 
+TABLE_DIR = os.path.dirname(os.path.abspath(__file__))
+LEXTAB_PREFIX = "cql_lextab_"
+PARSETAB_PREFIX = "cql_parsetab_"
+STATEMENT_CACHE_SIZE = 256
+
+# Comments and literals, matched the way the lexer matches them. Digits
+# inside identifiers are not numbers.
+STATEMENT_LITERALS = re.compile(
+    r'(--.*)|(\{-[\s\S]*?-\})|("(?:[^\\"]|\\.)*")|(?<![A-Za-z0-9_])(\d+(?:\.\d+)?)'
+)
+# Characters the lexer rejects once comments and literals are removed; a
+# quote left over starts an unterminated string.
+ILLEGAL_CHARACTERS = re.compile(r'[^A-Za-z0-9_ \t\n,;()*=<>?"]')
+
+
+class Placeholder:
+    """
+    Stands for the n-th literal of a statement in a cached parse tree.
+    """
+    __slots__ = ("index", "value")
+
+    def __init__(self, index, value):
+        self.index = index
+        self.value = value
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+class Parameter:
+    """
+    A '?' parameter of a prepared statement.
+    """
+    def __repr__(self):
+        return "?"
+
+
+PARAMETER = Parameter()
+
 class Parser:
-    def __init__(self):
+    """
+    YACC parser for CQL commands.
+    With optimize (the default) the lexer and parser tables are generated
+    once into TABLE_DIR, in files named after a hash of the grammar, and
+    later loaded without reflecting over or validating the rules again.
+    Editing a token or rule changes the hash, so stale tables are never used.
+    Parse trees are cached by statement text with the literals taken out, so
+    a statement repeated with other values is not lexed or parsed again.
+    The lexer and parser are shared, so threads parse one at a time.
+    Attributes:
+        cache (LRUCache): Parse trees keyed by normalized statement text.
+        lock (Lock): Held while a statement is parsed.
+    """
+    def __init__(self, optimize=True, cacheSize=STATEMENT_CACHE_SIZE):
         self.lexer = Lexer()
-        self.lexer.build()
+        self.cache = LRUCache(cacheSize)
+        self.failed = False
+        self.lock = threading.Lock()
+        if not optimize:
+            self.lexer.build()
+            self.tokens = self.lexer.tokens
+            self.parser = yacc.yacc(module=self)
+            return
+
+        signature = grammar_signature()
+        self.lexer.build(optimize=1, lextab=LEXTAB_PREFIX + signature, outputdir=TABLE_DIR)
         self.tokens = self.lexer.tokens
-        self.parser = yacc.yacc(module=self)
+        self.parser = yacc.yacc(
+            module=self,
+            optimize=1,
+            debug=False,
+            tabmodule=PARSETAB_PREFIX + signature,
+            outputdir=TABLE_DIR,
+        )
+        remove_stale_tables(signature)
 
     def p_program(self, p):
         """program : table_command 
@@ -28,7 +102,13 @@ class Parser:
             | rename_command
             | print_command
             | discard_command
-            | call_command"""
+            | call_command
+            | create_index_command
+            | drop_index_command
+            | show_command
+            | set_command
+            | prepare_command
+            | execute_command"""
         p[0] = p[1]
 
     def p_command(self, p):
@@ -50,7 +130,8 @@ class Parser:
         | create_table_select_where_no_limit
         | create_table_select_limit
         | create_table_select_where_limit
-        | create_table_from_join"""
+        | create_table_from_join
+        | create_materialized_table"""
         p[0] = p[1]
     
     #region Table commands
@@ -58,22 +139,73 @@ class Parser:
         """import_command : IMPORT TABLE ID FROM STRING SEMICOLON"""
         p[0] = ("IMPORT", p[3], p[5])
 
+    def p_import_parallel_command(self, p):
+        """import_command : IMPORT PARALLEL TABLE ID FROM STRING SEMICOLON"""
+        p[0] = ("IMPORT_PARALLEL", p[4], p[6])
+
+    def p_import_lazy_command(self, p):
+        """import_command : IMPORT LAZY TABLE ID FROM STRING SEMICOLON"""
+        p[0] = ("IMPORT_LAZY", p[4], p[6])
+
+    def p_import_append_command(self, p):
+        """import_command : IMPORT TABLE ID FROM STRING APPEND SEMICOLON"""
+        p[0] = ("IMPORT_APPEND", p[3], p[5])
+
     def p_export_command(self, p):
         """export_command : EXPORT TABLE ID AS STRING SEMICOLON"""
         p[0] = ("EXPORT", p[3], p[5])
     
+    def p_export_query_command(self, p):
+        """export_command : EXPORT LPAREN query RPAREN AS STRING SEMICOLON"""
+        p[0] = ("EXPORT_QUERY", p[3], p[6])
+
+    def p_query_all(self, p):
+        """query : SELECT ASTERISK FROM ID
+        | SELECT ASTERISK FROM ID LIMIT NUMBER"""
+        p[0] = ("SELECT_NO_LIMIT", p[4]) if len(p) == 5 else ("SELECT_LIMIT", p[4], p[6])
+
+    def p_query_specific(self, p):
+        """query : SELECT select_list FROM ID
+        | SELECT select_list FROM ID LIMIT NUMBER"""
+        p[0] = ("SELECT_SPECIFIC_NO_LIMIT", p[2], p[4]) if len(p) == 5 else ("SELECT_SPECIFIC_LIMIT", p[2], p[4], p[6])
+
+    def p_query_where(self, p):
+        """query : SELECT ASTERISK FROM ID WHERE condition_list
+        | SELECT ASTERISK FROM ID WHERE condition_list LIMIT NUMBER"""
+        p[0] = ("SELECT_WHERE_NO_LIMIT", p[4], p[6]) if len(p) == 7 else ("SELECT_WHERE_LIMIT", p[4], p[6], p[8])
+
     def p_discard_command(self, p):
         """discard_command : DISCARD TABLE ID SEMICOLON"""
         p[0] = ("DISCARD", p[3])
 
     def p_rename_commmand(self, p):
         """rename_command : RENAME TABLE ID STRING SEMICOLON"""
-        print(f"Renaming {p[3]} to {p[4]}")
         p[0] = ("RENAME", p[3], p[4])
 
     def p_print_command(self, p):
         """print_command : PRINT TABLE ID SEMICOLON"""
         p[0] = ("PRINT", p[3])
+
+    def p_show_command(self, p):
+        """show_command : SHOW ID SEMICOLON"""
+        p[0] = ("SHOW", p[2].upper())
+
+    def p_set_command(self, p):
+        """set_command : SET ID ID SEMICOLON
+            | SET ID NUMBER SEMICOLON"""
+        p[0] = ("SET", p[2].upper(), p[3].upper() if isinstance(p[3], str) else p[3])
+    #endregion
+
+    #region Index commands
+    def p_create_index_command(self, p):
+        """create_index_command : CREATE INDEX ID ON ID LPAREN ID RPAREN SEMICOLON
+        | CREATE INDEX ID ON ID LPAREN ID RPAREN USING ID SEMICOLON"""
+        kind = p[10].upper() if len(p) == 12 else None
+        p[0] = ("CREATE_INDEX", p[3], p[5], p[7], kind)
+
+    def p_drop_index_command(self, p):
+        """drop_index_command : DROP INDEX ID SEMICOLON"""
+        p[0] = ("DROP_INDEX", p[3])
     #endregion
 
     #region Query commands
@@ -142,6 +274,18 @@ class Parser:
         """value : STRING
         | NUMBER"""
         p[0] = p[1]
+
+    def p_value_parameter(self, p):
+        """value : PARAM"""
+        p[0] = PARAMETER
+
+    def p_value_list_single(self, p):
+        "value_list : value"
+        p[0] = [p[1]]
+
+    def p_value_list_multi(self, p):
+        "value_list : value_list COMMA value"
+        p[0] = p[1] + [p[3]]
     
     def p_select_list_multi(self, p):
         "select_list : select_list COMMA ID"
@@ -152,6 +296,17 @@ class Parser:
         p[0] = [p[1]]
     #endregion
 
+    #region Prepared statements
+    def p_prepare_command(self, p):
+        """prepare_command : PREPARE ID AS query_command"""
+        p[0] = ("PREPARE", p[2], p[4])
+
+    def p_execute_command(self, p):
+        """execute_command : EXECUTE ID SEMICOLON
+        | EXECUTE ID LPAREN value_list RPAREN SEMICOLON"""
+        p[0] = ("EXECUTE", p[2], p[4] if len(p) == 7 else [])
+    #endregion
+
     #region Create table commands
     def p_create_table_select_no_limit(self, p):
         """create_table_select_no_limit : CREATE TABLE ID selectAll_command_no_limit"""
@@ -176,6 +331,18 @@ class Parser:
     def p_create_table_from_join(self, p):
         """create_table_from_join : CREATE TABLE ID FROM ID JOIN ID USING LPAREN STRING RPAREN SEMICOLON"""
         p[0] = ("CREATE_TABLE_FROM_JOIN", p[3], p[5], p[7], p[10])
+
+    def p_create_materialized_table_select(self, p):
+        """create_materialized_table : CREATE MATERIALIZED TABLE ID selectAll_command
+        | CREATE MATERIALIZED TABLE ID select_where_command"""
+        select = p[5]
+        condition = select[2] if select[0].startswith("SELECT_WHERE") else None
+        limit = select[-1] if select[0] in ("SELECT_LIMIT", "SELECT_WHERE_LIMIT") else 0
+        p[0] = ("CREATE_MATERIALIZED_SELECT", p[4], select[1], condition, limit)
+
+    def p_create_materialized_table_join(self, p):
+        """create_materialized_table : CREATE MATERIALIZED TABLE ID FROM ID JOIN ID USING LPAREN STRING RPAREN SEMICOLON"""
+        p[0] = ("CREATE_MATERIALIZED_JOIN", p[4], p[6], p[8], p[11])
     #endregion
     
     #region Procedures
@@ -198,10 +365,162 @@ class Parser:
     #endregion
 
     def p_error(self, p):
+        self.failed = True
         if p:
             print(f"Syntax error at {p.value!r}")
         else:
             print("Syntax error at EOF")
 
     def parse(self, data):
-        return self.parser.parse(data, lexer=self.lexer.lexer)
+        """
+        Parse a block of CQL commands, reusing the cached parse tree of an
+        earlier statement that differs only in its literals.
+        Args:
+            data (str): CQL text.
+        Returns:
+            list: The parsed commands, or None.
+        """
+        key, literals = normalize_statement(data)
+        if key is None:
+            with self.lock:
+                return self.parser.parse(data, lexer=self.lexer.lexer)
+        tree = self.cache.get(key)
+        if tree is not None:
+            return bind_literals(tree, literals)
+        with self.lock:
+            tree = self.parse_template(data, key, len(literals))
+        return bind_literals(tree, None)
+
+    def parse_template(self, data, key, literalCount):
+        """
+        Parse a statement with every literal token wrapped in a Placeholder,
+        and cache the tree under key if it parsed without errors.
+        Returns:
+            list: The parse tree with placeholders, or None.
+        """
+        lexer = self.lexer.lexer
+        count = [0]
+
+        def token():
+            tok = lexer.token()
+            if tok is not None and tok.type in ("STRING", "NUMBER"):
+                tok.value = Placeholder(count[0], tok.value)
+                count[0] += 1
+            return tok
+
+        self.failed = False
+        tree = self.parser.parse(data, lexer=lexer, tokenfunc=token)
+        if tree is not None and not self.failed and count[0] == literalCount:
+            self.cache.put(key, tree)
+        return tree
+
+
+
+def normalize_statement(data):
+    """
+    Split a statement into its literals and a cache key: the text with
+    comments and extra whitespace removed and every literal replaced by a
+    marker of its type.
+    Returns:
+        tuple: The key (None if the text has characters the lexer rejects)
+            and the list of literal values, as the lexer would produce them.
+    """
+    literals = []
+
+    def replace(match):
+        kind = match.lastindex
+        if kind == 3:
+            literals.append(match.group()[1:-1])
+            return '""'
+        if kind == 4:
+            literals.append(float(match.group()))
+            return "0"
+        return " "
+
+    key = STATEMENT_LITERALS.sub(replace, data)
+    if ILLEGAL_CHARACTERS.search(key) or key.count('"') != 2 * sum(isinstance(v, str) for v in literals):
+        return None, literals
+    return " ".join(key.split()), literals
+
+
+def bind_literals(node, literals):
+    """
+    Copy a cached parse tree, replacing each Placeholder by its literal.
+    With literals None, the placeholders' own values are used.
+    """
+    if isinstance(node, Placeholder):
+        return node.value if literals is None else literals[node.index]
+    if isinstance(node, tuple):
+        return tuple(bind_literals(n, literals) for n in node)
+    if isinstance(node, list):
+        return [bind_literals(n, literals) for n in node]
+    return node
+
+
+def count_parameters(node):
+    """
+    Return the number of '?' parameters in a parsed statement.
+    """
+    if node is PARAMETER:
+        return 1
+    if isinstance(node, (tuple, list)):
+        return sum(count_parameters(n) for n in node)
+    return 0
+
+
+def count_unbound_parameters(node):
+    """
+    Return the number of '?' parameters outside PREPARE statements, which
+    nothing will bind.
+    """
+    if isinstance(node, tuple) and node and node[0] == "PREPARE":
+        return 0
+    if node is PARAMETER:
+        return 1
+    if isinstance(node, (tuple, list)):
+        return sum(count_unbound_parameters(n) for n in node)
+    return 0
+
+
+def bind_parameters(node, values):
+    """
+    Copy a parsed statement, replacing its '?' parameters in order.
+    Args:
+        node: Parsed statement.
+        values (iterator): Parameter values.
+    """
+    if node is PARAMETER:
+        return next(values)
+    if isinstance(node, tuple):
+        return tuple(bind_parameters(n, values) for n in node)
+    if isinstance(node, list):
+        return [bind_parameters(n, values) for n in node]
+    return node
+
+
+def grammar_signature():
+    """
+    Return a short hash of the PLY version, the tokens and every lexer and
+    grammar rule. It versions the generated table files.
+    """
+    parts = [yacc.__tabversion__, repr(Lexer.tokens), repr(sorted(Lexer.reserved.items()))]
+    for cls in (Lexer, Parser):
+        for name in sorted(vars(cls)):
+            if name.startswith(("t_", "p_")):
+                value = getattr(cls, name)
+                rule = value.__doc__ if callable(value) else repr(value)
+                parts.append(f"{name}:{rule}")
+    return format(zlib.crc32("\n".join(parts).encode()), "08x")
+
+
+def remove_stale_tables(signature):
+    """
+    Delete table files generated for other versions of the grammar.
+    """
+    current = {LEXTAB_PREFIX + signature + ".py", PARSETAB_PREFIX + signature + ".py"}
+    for name in os.listdir(TABLE_DIR):
+        if name.startswith((LEXTAB_PREFIX, PARSETAB_PREFIX)) and name not in current:
+            try:
+                os.remove(os.path.join(TABLE_DIR, name))
+            except OSError:
+                pass
@@ -0,0 +1,192 @@
+from array import array
+from itertools import chain
+
+BATCH_SIZE = 4096
+PARALLEL_MIN_ROWS = 1000000
+PARTITIONS_PER_WORKER = 4
+
+# Predicate evaluated by the worker processes of a ParallelFilter. Workers
+# are forked after it is set, so they read the column buffers it refers to
+# from the memory inherited from the parent instead of receiving them pickled.
+sharedPredicate = None
+
+
+def evaluate_range(start, stop):
+    """
+    Return the positions in [start, stop) matching the shared predicate.
+    Runs in worker processes for parallel scans.
+    """
+    return sharedPredicate.evaluate(start, stop)
+
+
+def partition_ranges(ranges, parts, batchSize=BATCH_SIZE):
+    """
+    Cut row ranges into about parts pieces of similar size, each a whole
+    number of batches, keeping the row order.
+    Returns:
+        list of range: The pieces.
+    """
+    total = sum(len(r) for r in ranges)
+    size = max(batchSize, -(-total // parts // batchSize) * batchSize)
+    return [range(start, min(start + size, r.stop)) for r in ranges for start in range(r.start, r.stop, size)]
+
+
+class Scan:
+    """
+    Source operator yielding the row positions of a table in batches.
+    Attributes:
+        table (Table): Table to scan.
+        batchSize (int): Number of rows per batch.
+        ranges (list of range): Parts of the table to scan, or None for all of it.
+        rowsScanned (int): Rows pulled from the table so far.
+    """
+    def __init__(self, table, batchSize=BATCH_SIZE, ranges=None):
+        self.table = table
+        self.batchSize = batchSize
+        self.ranges = ranges
+        self.rowsScanned = 0
+
+    def __iter__(self):
+        ranges = self.ranges if self.ranges is not None else [range(len(self.table))]
+        for part in ranges:
+            for start in range(part.start, part.stop, self.batchSize):
+                stop = min(start + self.batchSize, part.stop)
+                self.rowsScanned += stop - start
+                yield range(start, stop)
+
+
+class IndexScan:
+    """
+    Source operator yielding row positions returned by an index lookup in batches.
+    """
+    def __init__(self, positions, batchSize=BATCH_SIZE):
+        self.positions = positions
+        self.batchSize = batchSize
+        self.rowsScanned = 0
+
+    def __iter__(self):
+        positions = self.positions
+        for start in range(0, len(positions), self.batchSize):
+            batch = positions[start:start + self.batchSize]
+            self.rowsScanned += len(batch)
+            yield batch
+
+
+class Filter:
+    """
+    Keep the positions of each batch that match a compiled predicate.
+    Attributes:
+        child: Operator producing position batches.
+        predicate (Predicate): Compiled WHERE conditions.
+        skip (Term): Term already satisfied by the child (an index scan), or None.
+    """
+    def __init__(self, child, predicate, skip=None):
+        self.child = child
+        self.predicate = predicate
+        self.skip = skip
+
+    def __iter__(self):
+        predicate = self.predicate
+        for batch in self.child:
+            if isinstance(batch, range) and self.skip is None:
+                matched = predicate.evaluate(batch.start, batch.stop)
+            else:
+                matched = predicate.refine(batch, self.skip)
+            if matched:
+                yield matched
+
+
+class ParallelFilter:
+    """
+    Source operator yielding the positions matching a predicate, evaluated
+    over partitions of the table's row ranges by a pool of forked worker
+    processes. Each worker returns the matching positions of its partition,
+    and partitions are yielded in row order.
+    Attributes:
+        predicate (Predicate): Compiled WHERE conditions.
+        ranges (list of range): Parts of the table to scan.
+        workers (int): Number of worker processes.
+        rowsScanned (int): Rows evaluated so far.
+    """
+    def __init__(self, predicate, ranges, workers):
+        self.predicate = predicate
+        self.ranges = ranges
+        self.workers = workers
+        self.rowsScanned = 0
+
+    def __iter__(self):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        global sharedPredicate
+
+        parts = partition_ranges(self.ranges, self.workers * PARTITIONS_PER_WORKER)
+        context = multiprocessing.get_context("fork")
+        sharedPredicate = self.predicate
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+                results = pool.map(evaluate_range, [p.start for p in parts], [p.stop for p in parts])
+                for part, matched in zip(parts, results):
+                    self.rowsScanned += len(part)
+                    if matched:
+                        yield matched
+        finally:
+            sharedPredicate = None
+
+
+class Limit:
+    """
+    Stop pulling from the child once count positions were produced.
+    A count of 0 means no limit.
+    """
+    def __init__(self, child, count):
+        self.child = child
+        self.count = int(count)
+
+    def __iter__(self):
+        if not self.count:
+            yield from self.child
+            return
+        remaining = self.count
+        for batch in self.child:
+            if len(batch) >= remaining:
+                yield batch[:remaining]
+                return
+            remaining -= len(batch)
+            yield batch
+
+
+class Project:
+    """
+    Turn position batches into batches of rows holding the chosen columns.
+    Columns are chosen by position, as a table may repeat a name (the
+    columns of both sides of a join).
+    Attributes:
+        columns (list of int): Positions of the table columns to output, in order.
+        header (list): Names of the output columns.
+    """
+    def __init__(self, child, table, columns=None):
+        self.child = child
+        self.table = table
+        self.columns = list(range(len(table.header))) if columns is None else list(columns)
+        self.header = [table.header[j] for j in self.columns]
+
+    def __iter__(self):
+        columns = [self.table.columns[j] for j in self.columns]
+        for batch in self.child:
+            yield [[column[i] for column in columns] for i in batch]
+
+    def rows(self):
+        """
+        Iterate over the projected rows one at a time.
+        """
+        return chain.from_iterable(self)
+
+
+def collect_positions(operator):
+    """
+    Drain an operator into a single array of row positions.
+    """
+    positions = array("q")
+    for batch in operator:
+        positions.extend(batch)
+    return positions
@@ -0,0 +1,23 @@
+class Plan:
+    """
+    A parsed command bound to the interpreter method that runs it, with its
+    arguments taken out of the command tuple once.
+    Attributes:
+        command (tuple): The parsed command.
+        handler (callable): Method running the command.
+        args (tuple): Arguments passed to handler.
+    """
+    __slots__ = ("command", "handler", "args")
+
+    def __init__(self, command, handler, args):
+        self.command = command
+        self.handler = handler
+        self.args = args
+
+    def run(self):
+        """
+        Run the command.
+        Returns:
+            str: Result of the handler.
+        """
+        return self.handler(*self.args)
@@ -0,0 +1,197 @@
+import operator
+from array import array
+from itertools import compress, count, repeat
+
+from table import format_number
+
+OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<>": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+}
+
+
+class TextCells:
+    """
+    Read-only view of a column as CSV text, used when a literal cannot be
+    converted to the column type. Cells are rendered only when accessed.
+    """
+    def __init__(self, column):
+        self.column = column
+
+    def __len__(self):
+        return len(self.column)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.column.text(i) for i in range(*key.indices(len(self.column)))]
+        return self.column.text(key)
+
+
+class Term:
+    """
+    One compiled comparison of a WHERE clause.
+    Attributes:
+        column (str): Column name.
+        position (int): Column position in the table.
+        op (callable): Comparison function from the operator module.
+        values (sequence): Buffer the comparison is evaluated on.
+        literal: The literal converted to the domain of values.
+        mask (list): For string columns, the result of the comparison for each
+            pooled string, indexed by string code. None for other columns.
+        indexable (bool): True if the literal is in the column's domain, so an
+            index on the column can answer the comparison.
+    """
+    def __init__(self, table, condition):
+        _, self.column, symbol, literal = condition
+        self.symbol = symbol
+        self.op = OPERATORS[symbol]
+        self.position = table.header.index(self.column)
+        column = table.columns[self.position]
+        self.mask = None
+        self.indexable = True
+
+        encoded = column.encode(literal)
+        if column.kind == "string":
+            self.values = column.codes
+            self.literal = encoded
+            self.mask = [self.op(s, encoded) for s in column.pool]
+        elif encoded is None:
+            self.indexable = False
+            self.values = TextCells(column)
+            self.literal = literal if isinstance(literal, str) else format_number(literal)
+        else:
+            self.values = column.values
+            self.literal = encoded
+
+    def results(self, values):
+        """
+        Evaluate the comparison over an iterable of buffer values.
+        """
+        if self.mask is not None:
+            return map(self.mask.__getitem__, values)
+        return map(self.op, values, repeat(self.literal))
+
+    def scan(self, start, stop):
+        """
+        Return the positions in [start, stop) that satisfy the comparison.
+        """
+        return compress(count(start), self.results(self.values[start:stop]))
+
+    def refine(self, positions):
+        """
+        Keep the positions of an iterable that satisfy the comparison.
+        """
+        positions = list(positions)
+        return compress(positions, self.results(map(self.values.__getitem__, positions)))
+
+    def matches(self, i):
+        if self.mask is not None:
+            return self.mask[self.values[i]]
+        return self.op(self.values[i], self.literal)
+
+
+class Predicate:
+    """
+    A WHERE condition list compiled against a table: column positions are
+    resolved and literals converted once, and all AND terms are evaluated
+    column-at-a-time over row ranges.
+    Attributes:
+        terms (list of Term): Compiled comparisons, equality first.
+        length (int): Number of rows in the table.
+    """
+    def __init__(self, terms, length):
+        self.terms = sorted(terms, key=lambda t: t.symbol != "=")
+        self.length = length
+
+    def columns(self):
+        """
+        Return the names of the columns the predicate reads.
+        """
+        return [t.column for t in self.terms]
+
+    def evaluate(self, start=0, stop=None):
+        """
+        Return the positions in [start, stop) of the rows matching every term.
+        Args:
+            start (int): First row to consider.
+            stop (int, optional): Row after the last one to consider.
+        Returns:
+            array: Matching row positions in ascending order.
+        """
+        if stop is None or stop > self.length:
+            stop = self.length
+        if not self.terms:
+            return array("q", range(start, stop))
+        positions = self.terms[0].scan(start, stop)
+        for term in self.terms[1:]:
+            positions = term.refine(positions)
+        return array("q", positions)
+
+    def refine(self, positions, skip=None):
+        """
+        Keep the candidate positions that match every term except skip, used
+        when skip was already answered by an index.
+        Args:
+            positions (iterable of int): Candidate row positions in ascending order.
+            skip (Term, optional): Term the candidates are known to satisfy.
+        Returns:
+            array: Matching row positions in ascending order.
+        """
+        for term in self.terms:
+            if term is not skip:
+                positions = term.refine(positions)
+        return array("q", positions)
+
+    def matches(self, i):
+        """
+        Return True if row i matches every term.
+        """
+        for term in self.terms:
+            if not term.matches(i):
+                return False
+        return True
+
+
+class ConditionList(list):
+    """
+    Condition list of a compiled plan. It keeps the predicate compiled for
+    the table data it last ran against, so running the plan again on the
+    same data does not resolve columns or convert literals again. The
+    predicate is compiled again when the table's buffers were swapped, as
+    when it is spilled to disk.
+    """
+    table = None
+    columns = None
+    length = None
+    predicate = None
+
+    def compile(self, table):
+        if table is not self.table or table.columns is not self.columns or len(table) != self.length:
+            self.predicate = compile_conditions(table, list(self))
+            self.table = table
+            self.columns = table.columns
+            self.length = len(table)
+        return self.predicate
+
+
+def compile_conditions(table, condition_list):
+    """
+    Compile a parsed condition list against a table. A ConditionList reuses
+    the predicate it compiled for the same table.
+    Args:
+        table (Table): Table the conditions refer to.
+        condition_list (list): Conditions in the form (CONDITION, column, operator, value).
+    Returns:
+        Predicate: The compiled predicate, or None if a column or operator is unknown.
+    """
+    if isinstance(condition_list, ConditionList):
+        return condition_list.compile(table)
+    for c in condition_list:
+        if c[1] not in table.header or c[2] not in OPERATORS:
+            return None
+    return Predicate([Term(table, c) for c in condition_list], len(table))
@@ -0,0 +1,183 @@
+import csv
+import io
+import shutil
+import sys
+import threading
+from itertools import islice
+from scheduler import ThreadOutput
+
+RENDER_MODES = ("LIST", "ALIGNED", "CSV", "TSV")
+RENDER_BATCH_ROWS = 4096
+
+
+class Renderer:
+    """
+    Writes the rows of PRINT, SELECT and SHOW to stdout. Rows are formatted
+    a batch at a time and each batch is written at once, instead of calling
+    print once per row. In interactive mode the output stops after a page of
+    rows and asks whether to go on; answering 'q' skips the remaining rows
+    and says how many there were. Output that is captured, or printed by
+    another thread than the main one, is never paged: nobody is there to
+    answer, and asking would block the thread.
+    Attributes:
+        mode (str): LIST (each row as a Python list), ALIGNED (a table with
+            padded columns), CSV or TSV.
+        interactive (bool): Page the output; set by the REPL on a terminal.
+        pageRows (int): Rows per page in interactive mode, or None for the
+            terminal height. 0 never pages.
+        batchRows (int): Rows formatted per write.
+    """
+    def __init__(self, mode="LIST", interactive=False, pageRows=None, batchRows=RENDER_BATCH_ROWS):
+        self.mode = mode
+        self.interactive = interactive
+        self.pageRows = pageRows
+        self.batchRows = batchRows
+
+    def render(self, header, rows, count=None):
+        """
+        Write a header and rows in the current mode.
+        Args:
+            header (list): Column names.
+            rows (iterable of list): Rows of typed values.
+            count (int, optional): Number of rows, reported when paging stops early.
+        """
+        stream = sys.stdout
+        formatter = FORMATTERS[self.mode](header)
+        page = self.page_size(stream)
+        rows = iter(rows)
+        shown = 0
+        first = True
+        while True:
+            size = self.batchRows if not page else min(self.batchRows, page - shown % page)
+            batch = list(islice(rows, size))
+            if first:
+                stream.write(formatter.header(batch))
+                first = False
+            if not batch:
+                break
+            stream.write(formatter.rows(batch))
+            shown += len(batch)
+            if page and shown % page == 0 and not self.more(stream, shown, count):
+                rest = count - shown if count is not None else sum(1 for _ in rows)
+                if rest:
+                    stream.write(f"({rest} more rows not shown)\n")
+                break
+        stream.flush()
+
+    def page_size(self, stream):
+        if not self.interactive or not on_terminal(stream):
+            return 0
+        if self.pageRows is not None:
+            return self.pageRows
+        return max(shutil.get_terminal_size().lines - 3, 1)
+
+    def more(self, stream, shown, count):
+        """
+        Ask whether to show the next page. Returns False to stop.
+        """
+        if count is not None and shown >= count:
+            return True
+        left = f"{count - shown} more rows" if count is not None else "more rows"
+        stream.flush()
+        try:
+            answer = input(f"-- {left}: Enter to go on, q to stop -- ")
+        except EOFError:
+            return False
+        return answer.strip().lower() != "q"
+
+
+def on_terminal(stream):
+    """
+    Return True if stream writes to a terminal from the main thread, where
+    the user can answer whether to show the next page.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return False
+    if isinstance(stream, ThreadOutput):
+        if getattr(stream.local, "buffer", None) is not None:
+            return False
+        stream = stream.stream
+    isatty = getattr(stream, "isatty", None)
+    return isatty is not None and isatty()
+
+
+class ListFormatter:
+    """
+    Each row as a Python list, as printed by print(row).
+    """
+    def __init__(self, header):
+        self.columns = header
+
+    def header(self, batch):
+        return f"{self.columns}\n"
+
+    def rows(self, batch):
+        return "\n".join(map(str, batch)) + "\n"
+
+
+class DelimitedFormatter:
+    """
+    CSV or TSV text, quoted where a cell holds the delimiter, a quote or a newline.
+    """
+    def __init__(self, header, dialect="excel"):
+        self.columns = header
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, dialect=dialect, lineterminator="\n")
+
+    def drain(self):
+        text = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return text
+
+    def header(self, batch):
+        self.writer.writerow(self.columns)
+        return self.drain()
+
+    def rows(self, batch):
+        self.writer.writerows(batch)
+        return self.drain()
+
+
+class AlignedFormatter:
+    """
+    Columns padded to a common width, numbers aligned right. Widths are
+    taken from the header and the first batch, and only grow for later
+    batches, so a long table is written without reading it twice.
+    """
+    def __init__(self, header):
+        self.columns = [str(c) for c in header]
+        self.widths = [len(c) for c in self.columns]
+
+    def measure(self, batch):
+        widths = self.widths
+        for row in batch:
+            for j, cell in enumerate(row):
+                size = len(str(cell))
+                if size > widths[j]:
+                    widths[j] = size
+
+    def header(self, batch):
+        self.measure(batch)
+        line = " | ".join(c.ljust(w) for c, w in zip(self.columns, self.widths))
+        rule = "-+-".join("-" * w for w in self.widths)
+        return f"{line}\n{rule}\n"
+
+    def rows(self, batch):
+        self.measure(batch)
+        widths = self.widths
+        lines = []
+        for row in batch:
+            lines.append(" | ".join(
+                str(cell).rjust(w) if isinstance(cell, (int, float)) and not isinstance(cell, bool) else str(cell).ljust(w)
+                for cell, w in zip(row, widths)
+            ).rstrip())
+        return "\n".join(lines) + "\n"
+
+
+FORMATTERS = {
+    "LIST": ListFormatter,
+    "ALIGNED": AlignedFormatter,
+    "CSV": DelimitedFormatter,
+    "TSV": lambda header: DelimitedFormatter(header, "excel-tab"),
+}
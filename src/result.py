@@ -0,0 +1,89 @@
+from table import ViewColumn
+
+
+class Result:
+    """
+    Outcome of a command run with Interpreter.query. Nothing is printed: the
+    rows of a query are kept as a table, usually a TableView reading the
+    cells of the queried table without copying them.
+    Attributes:
+        message (str): Status the REPL prints after the command.
+        table (Table): Rows returned by the command, or None if it returns none.
+        indexUsed (str): Name of the index the query used, or None.
+        output (str): Text the command printed besides its rows, such as errors.
+        error (str): Syntax error that kept the block of commands from running, or None.
+    """
+    def __init__(self, message, table=None, indexUsed=None, output="", error=None):
+        self.message = message
+        self.table = table
+        self.indexUsed = indexUsed
+        self.output = output
+        self.error = error
+
+    def __repr__(self):
+        if self.table is None:
+            return f"Result({self.message!r})"
+        return f"Result({self.message!r}, {len(self)} rows, columns={self.columns})"
+
+    def __len__(self):
+        return 0 if self.table is None else len(self.table)
+
+    def __iter__(self):
+        return self.rows()
+
+    @property
+    def columns(self):
+        """
+        Names of the columns, or an empty list if the command returned no rows.
+        """
+        return [] if self.table is None else list(self.table.header)
+
+    @property
+    def types(self):
+        """
+        Type of each column: 'int', 'float', 'timestamp' or 'string'.
+        """
+        return [] if self.table is None else self.table.types()
+
+    def rows(self, limit=0):
+        """
+        Iterate over rows as lists of typed values.
+        Args:
+            limit (int): Maximum number of rows to yield. If 0, yield all rows.
+        """
+        if self.table is None:
+            return iter(())
+        return self.table.rows(limit)
+
+    def column(self, name):
+        """
+        Return all the cells of a column at once. Int and float columns come
+        as a memoryview of their int64 ('q') or float64 ('d') buffer, and
+        timestamp columns as int64 seconds since the epoch, which
+        numpy.frombuffer wraps without copying. String columns come as a
+        list of str. When the rows are a contiguous range of a stored table,
+        the memoryview is a slice of that table's buffer; otherwise the rows
+        are gathered once.
+        Args:
+            name (str): Column name.
+        Returns:
+            memoryview or list: The cells, or None if the column does not exist.
+        """
+        table = self.table
+        position = -1 if table is None else table.column_index(name)
+        if position < 0:
+            return None
+        column = table.columns[position]
+        rows = slice(0, len(table))
+        if isinstance(column, ViewColumn):
+            positions = table.positions
+            if isinstance(positions, range) and positions.step == 1:
+                column = table.source(position)
+                rows = slice(positions.start, positions.stop)
+            else:
+                column = table.load_column(position)
+        if column.kind == "string":
+            pool = column.pool
+            return [pool[code] for code in memoryview(column.codes)[rows]]
+        return memoryview(column.values)[rows]
+
@@ -0,0 +1,112 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+PROCEDURE_WORKERS = 4
+
+
+class ThreadOutput:
+    """
+    Stand-in for sys.stdout that sends what a thread prints to the buffer
+    that thread registered, and everything else to the wrapped stream.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        if buffer is None:
+            return self.stream.write(text)
+        buffer.append(text)
+        return len(text)
+
+    def flush(self):
+        if getattr(self.local, "buffer", None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+@contextmanager
+def captured_output():
+    """
+    Collect what the current thread prints while the block runs instead of
+    writing it out. Yields the list the printed text is appended to.
+    """
+    output = sys.stdout if isinstance(sys.stdout, ThreadOutput) else ThreadOutput(sys.stdout)
+    previous = sys.stdout
+    saved = getattr(output.local, "buffer", None)
+    sys.stdout = output
+    output.local.buffer = buffer = []
+    try:
+        yield buffer
+    finally:
+        output.local.buffer = saved
+        sys.stdout = previous
+
+
+def conflicts(first, second):
+    """
+    Return True if two statements must run in order: one of them is a
+    barrier (access None), or one writes something the other reads or writes.
+    """
+    if first is None or second is None:
+        return True
+    reads1, writes1 = first
+    reads2, writes2 = second
+    return bool(writes1 & (reads2 | writes2) or writes2 & reads1)
+
+
+def build_dependencies(accesses):
+    """
+    Build the dependency DAG of a list of statements.
+    Args:
+        accesses (list): For each statement, its (reads, writes) sets of
+            table names and files, or None if it must run alone.
+    Returns:
+        list of list: For each statement, the earlier statements it waits for.
+    """
+    return [
+        [i for i in range(j) if conflicts(accesses[i], access)]
+        for j, access in enumerate(accesses)
+    ]
+
+
+def run_concurrently(plans, dependencies, workers):
+    """
+    Run plans on a thread pool, each once the plans it depends on finished.
+    What each plan prints is buffered, and the output and result of every
+    plan are yielded in plan order, as if they had run one after another.
+    Args:
+        plans (list of Plan): Plans to run.
+        dependencies (list of list): For each plan, the earlier plans it waits for.
+        workers (int): Number of threads.
+    Yields:
+        tuple: The text printed by a plan and its result.
+    """
+    output = sys.stdout if isinstance(sys.stdout, ThreadOutput) else ThreadOutput(sys.stdout)
+
+    def task(plan, waits):
+        output.local.buffer = []
+        try:
+            for future in waits:
+                future.result()
+            result = plan.run()
+            return "".join(output.local.buffer), result
+        finally:
+            output.local.buffer = None
+
+    previous = sys.stdout
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = []
+            for plan, depends in zip(plans, dependencies):
+                futures.append(pool.submit(task, plan, [futures[i] for i in depends]))
+            for future in futures:
+                yield future.result()
+    finally:
+        sys.stdout = previous
@@ -0,0 +1,351 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from scheduler import ThreadOutput
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 7878
+SERVER_WORKERS = 8
+BATCH_LINES = 256
+PENDING_BATCHES = 8
+
+
+class RWLock:
+    """
+    Lock held by many readers or by one writer. A waiting writer keeps new
+    readers out, so a stream of queries cannot starve an import.
+    """
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.readers = 0
+        self.writer = False
+        self.waitingWriters = 0
+
+    def acquire_read(self):
+        with self.condition:
+            while self.writer or self.waitingWriters:
+                self.condition.wait()
+            self.readers += 1
+
+    def release_read(self):
+        with self.condition:
+            self.readers -= 1
+            if self.readers == 0:
+                self.condition.notify_all()
+
+    def acquire_write(self):
+        with self.condition:
+            self.waitingWriters += 1
+            while self.writer or self.readers:
+                self.condition.wait()
+            self.waitingWriters -= 1
+            self.writer = True
+
+    def release_write(self):
+        with self.condition:
+            self.writer = False
+            self.condition.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class TableLocks:
+    """
+    Reader/writer locks on the tables and files of a shared interpreter.
+    Every statement holds the catalog lock for reading, and the locks of what
+    it reads and writes; a statement that must run alone holds the catalog
+    lock for writing. Locks are always taken in the same order, so sessions
+    cannot deadlock.
+    Attributes:
+        catalog (RWLock): Lock on the interpreter as a whole.
+        locks (dict): Lock of each table name or ('file', path) pair.
+    """
+    def __init__(self):
+        self.catalog = RWLock()
+        self.locks = {}
+        self.mutex = threading.Lock()
+
+    def lock(self, name):
+        with self.mutex:
+            if name not in self.locks:
+                self.locks[name] = RWLock()
+            return self.locks[name]
+
+    @contextmanager
+    def hold(self, access):
+        """
+        Hold the locks a statement needs while it runs.
+        Args:
+            access (tuple): Sets of names read and written, or None to run alone.
+        """
+        if access is None:
+            with self.catalog.write():
+                yield
+            return
+        reads, writes = access
+        with ExitStack() as stack:
+            stack.enter_context(self.catalog.read())
+            for name in sorted(reads | writes, key=repr):
+                lock = self.lock(name)
+                stack.enter_context(lock.write() if name in writes else lock.read())
+            yield
+
+
+def merge_access(first, second):
+    """
+    Union of two statement accesses; None (run alone) absorbs the other.
+    """
+    if first is None or second is None:
+        return None
+    return first[0] | second[0], first[1] | second[1]
+
+
+class BatchSink:
+    """
+    Buffer registered with ThreadOutput by the thread running a request. The
+    lines it prints are handed to the event loop in batches of BATCH_LINES.
+    At most PENDING_BATCHES batches wait to be sent, then printing blocks
+    until the client reads, so a large result never piles up in memory.
+    Attributes:
+        queue (asyncio.Queue): Batches to send, read on the event loop.
+        closed (bool): Set when the client went away; later output is dropped.
+    """
+    def __init__(self, loop, queue, batchLines=BATCH_LINES, pending=PENDING_BATCHES):
+        self.loop = loop
+        self.queue = queue
+        self.batchLines = batchLines
+        self.pending = threading.Semaphore(pending)
+        self.parts = []
+        self.lines = 0
+        self.closed = False
+
+    def append(self, text):
+        self.parts.append(text)
+        self.lines += text.count("\n")
+        if self.lines >= self.batchLines:
+            self.flush()
+
+    def flush(self):
+        if not self.parts:
+            return
+        text = "".join(self.parts)
+        self.parts = []
+        self.lines = 0
+        while not self.closed:
+            if self.pending.acquire(timeout=1):
+                self.loop.call_soon_threadsafe(self.queue.put_nowait, text)
+                return
+
+    def sent(self):
+        self.pending.release()
+
+
+class CQLServer:
+    """
+    Serves one interpreter, and the tables it holds, to many clients over
+    TCP or a Unix socket. Each connection is a session sending requests and
+    reading their output; requests run on a thread pool, so sessions touching
+    different tables run at the same time, guarded by TableLocks. Clients
+    can only export to files under the interpreter's export directory.
+    Every message is a line of JSON. A request is {"query": "CQL text"}; the
+    server answers with {"output": text} messages as the output is printed,
+    then {"done": true, "seconds": s}, or {"done": true, "error": message}.
+    Attributes:
+        interpreter (Interpreter): Interpreter shared by every session.
+        locks (TableLocks): Locks on its tables and files.
+        workers (int): Number of requests run at the same time.
+        batchLines (int): Lines of output per message.
+        sessions (int): Open connections.
+        requests (int): Requests served.
+    """
+    def __init__(self, interpreter, workers=SERVER_WORKERS, batchLines=BATCH_LINES):
+        self.interpreter = interpreter
+        self.locks = TableLocks()
+        self.workers = workers
+        self.batchLines = batchLines
+        self.executor = None
+        self.output = None
+        self.server = None
+        self.sessions = 0
+        self.requests = 0
+
+    async def start(self, host=SERVER_HOST, port=SERVER_PORT, path=None):
+        """
+        Start listening on host and port, or on the Unix socket path.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        self.output = sys.stdout if isinstance(sys.stdout, ThreadOutput) else ThreadOutput(sys.stdout)
+        sys.stdout = self.output
+        # Worker processes must not be forked while other sessions run, and
+        # clients may only write files under the export directory.
+        self.interpreter.concurrent = True
+        self.interpreter.confineExports = True
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.session, path=path)
+        else:
+            self.server = await asyncio.start_server(self.session, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        if sys.stdout is self.output:
+            sys.stdout = self.output.stream
+        self.interpreter.concurrent = False
+        self.interpreter.confineExports = False
+
+    async def session(self, reader, writer):
+        """
+        Serve the requests of one connection until the client closes it.
+        """
+        self.sessions += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    query = request["query"]
+                except (ValueError, KeyError, TypeError):
+                    await self.send(writer, {"done": True, "error": "Malformed request."})
+                    continue
+                await self.answer(query, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    async def answer(self, query, writer):
+        """
+        Run a request and stream its output to the client.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        sink = BatchSink(loop, queue, self.batchLines)
+        start = time.perf_counter()
+        future = loop.run_in_executor(self.executor, self.run_request, query, sink)
+        future.add_done_callback(lambda f: queue.put_nowait(None))
+        try:
+            while True:
+                text = await queue.get()
+                if text is None:
+                    break
+                await self.send(writer, {"output": text})
+                sink.sent()
+        except ConnectionError:
+            sink.closed = True
+            raise
+        self.requests += 1
+        error = future.exception()
+        if error is not None:
+            await self.send(writer, {"done": True, "error": str(error)})
+        else:
+            await self.send(writer, {"done": True, "seconds": time.perf_counter() - start})
+
+    async def send(self, writer, message):
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+
+    def command_access(self, command):
+        """
+        Names a command reads and writes, with the base tables of the views
+        it reads, or None if it must run alone.
+        """
+        # Refreshing materialized tables may write any of them.
+        if self.interpreter.views:
+            return None
+        return self.interpreter.statement_access(command)
+
+    def run_request(self, query, sink):
+        """
+        Parse and run a block of CQL commands on a worker thread, each
+        command holding the locks of the tables and files it touches.
+        What the commands print goes to sink.
+        """
+        self.output.local.buffer = sink
+        try:
+            commands = self.interpreter.parser.parse(query)
+            if commands is None:
+                print("No result from parser")
+                return
+            for command in commands:
+                access = self.command_access(command)
+                while True:
+                    with self.locks.hold(access):
+                        # Another session may have made a table a view of
+                        # one this command did not lock; the tables behind
+                        # it are then locked too before running.
+                        held = access
+                        access = merge_access(held, self.command_access(command))
+                        if access == held:
+                            self.interpreter.execute(command, False)
+                            break
+        finally:
+            sink.flush()
+            self.output.local.buffer = None
+
+
+def serve(interpreter, address):
+    """
+    Run a CQL server until interrupted.
+    Args:
+        interpreter (Interpreter): Interpreter to serve.
+        address (str): 'host:port', a port, or the path of a Unix socket.
+    """
+    host, port, path = parse_address(address)
+    server = CQLServer(interpreter)
+
+    async def main():
+        await server.start(host, port, path)
+        print(f"CQL server listening on {path or f'{host}:{port}'}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+
+def parse_address(address):
+    """
+    Split an address into host, port and Unix socket path. A value with a
+    '/' is a socket path; otherwise it is 'host:port' or a port.
+    Returns:
+        tuple: (host, port, path), with path None for TCP.
+    """
+    if address is None:
+        return SERVER_HOST, SERVER_PORT, None
+    if "/" in address:
+        return None, None, address
+    host, _, port = address.rpartition(":")
+    return host or SERVER_HOST, int(port), None
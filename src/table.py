@@ -0,0 +1,1051 @@
+import math
+from abc import ABC, abstractmethod
+from array import array
+from datetime import datetime, timedelta
+from itertools import count, islice
+
+EPOCH = datetime(1970, 1, 1)
+TIMESTAMP_FORMATS = {
+    10: "%Y-%m-%d",
+    16: "%Y-%m-%dT%H:%M",
+    19: "%Y-%m-%dT%H:%M:%S",
+}
+INT_MIN = -(2 ** 63)
+INT_MAX = 2 ** 63 - 1
+FLOAT_EXACT = 2 ** 53
+TIMESTAMP_CACHE_SIZE = 65536
+LINEAGES = count()
+
+
+def parse_int(text):
+    """
+    Parse a text cell as an integer that prints back to the same text.
+    Args:
+        text (str): Raw cell text.
+    Returns:
+        int: The value, or None if the text is not a canonical integer.
+    """
+    try:
+        value = int(text)
+    except ValueError:
+        return None
+    if str(value) != text or value < INT_MIN or value > INT_MAX:
+        return None
+    return value
+
+
+def parse_float(text):
+    """
+    Parse a text cell as a float that prints back to the same text.
+    Args:
+        text (str): Raw cell text.
+    Returns:
+        float: The value, or None if the text is not a canonical float.
+    """
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    if not math.isfinite(value) or repr(value) != text:
+        return None
+    return value
+
+
+def parse_timestamp(text, fmt):
+    """
+    Parse a text cell as a timestamp in the given format.
+    Args:
+        text (str): Raw cell text.
+        fmt (str): strftime format the text must round-trip through.
+    Returns:
+        int: Seconds since the epoch, or None if the text does not match.
+    """
+    if len(text) != len(text.strip()) or TIMESTAMP_FORMATS.get(len(text)) != fmt:
+        return None
+    try:
+        moment = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if moment.tzinfo is not None or moment.strftime(fmt) != text:
+        return None
+    return (moment - EPOCH) // timedelta(seconds=1)
+
+
+def format_timestamp(seconds, fmt):
+    """
+    Format seconds since the epoch back to timestamp text.
+    """
+    return (EPOCH + timedelta(seconds=seconds)).strftime(fmt)
+
+
+def format_number(value):
+    """
+    Render a query literal the way it would appear in a CSV cell.
+    """
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class Column(ABC):
+    """
+    Base class of the typed column buffers that make up a Table.
+    Attributes:
+        kind (str): One of 'int', 'float', 'timestamp' or 'string'.
+    """
+    kind = None
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, i):
+        return self.values[i]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def text(self, i):
+        """
+        Return the CSV text of the cell at row i.
+        """
+        return str(self.values[i])
+
+    def encode(self, value):
+        """
+        Convert a query literal to the column's value domain.
+        Args:
+            value (str | float): Literal from the parser.
+        Returns:
+            The literal as a comparable column value, or None if it cannot be represented.
+        """
+        return value
+
+    @abstractmethod
+    def take(self, indices):
+        """
+        Gather the given rows into a new column of the same kind.
+        Args:
+            indices (iterable of int): Row positions to copy, in output order.
+        Returns:
+            Column: A new column.
+        """
+
+    @abstractmethod
+    def nbytes(self):
+        """
+        Approximate memory footprint of the column buffers in bytes.
+        """
+
+
+def buffer_nbytes(buffer):
+    """
+    Heap size of a column buffer in bytes. Buffers mapped from a file count
+    as 0: the OS loads and drops their pages as they are read.
+    """
+    if isinstance(buffer, memoryview):
+        return 0
+    return buffer.itemsize * len(buffer)
+
+
+class IntColumn(Column):
+    kind = "int"
+
+    def __init__(self, values=None):
+        self.values = values if values is not None else array("q")
+
+    def encode(self, value):
+        if isinstance(value, str):
+            parsed = parse_int(value)
+            if parsed is None:
+                parsed = parse_float(value)
+            return parsed
+        return value
+
+    def take(self, indices):
+        values = self.values
+        return IntColumn(array("q", [values[i] for i in indices]))
+
+    def nbytes(self):
+        return buffer_nbytes(self.values)
+
+
+class FloatColumn(Column):
+    """
+    Floating point column. Cells written as integers ('100' next to '2.5')
+    are flagged in intMask so they print back exactly as they were read.
+    """
+    kind = "float"
+
+    def __init__(self, values=None, intMask=None):
+        self.values = values if values is not None else array("d")
+        self.intMask = intMask
+
+    def __getitem__(self, i):
+        value = self.values[i]
+        if self.intMask is not None and self.intMask[i]:
+            return int(value)
+        return value
+
+    def __iter__(self):
+        if self.intMask is None:
+            return iter(self.values)
+        return (int(v) if m else v for v, m in zip(self.values, self.intMask))
+
+    def text(self, i):
+        if self.intMask is not None and self.intMask[i]:
+            return str(int(self.values[i]))
+        return repr(self.values[i])
+
+    def encode(self, value):
+        if isinstance(value, str):
+            parsed = parse_int(value)
+            if parsed is None:
+                parsed = parse_float(value)
+            return parsed
+        return value
+
+    def take(self, indices):
+        values = self.values
+        if not isinstance(indices, (list, range, array)):
+            indices = list(indices)
+        mask = None
+        if self.intMask is not None:
+            mask = bytearray(self.intMask[i] for i in indices)
+        return FloatColumn(array("d", [values[i] for i in indices]), mask)
+
+    def nbytes(self):
+        size = buffer_nbytes(self.values)
+        if self.intMask is not None and not isinstance(self.intMask, memoryview):
+            size += len(self.intMask)
+        return size
+
+
+class TimestampColumn(Column):
+    """
+    Timestamp column stored as integer seconds since the epoch.
+    """
+    kind = "timestamp"
+
+    def __init__(self, fmt, values=None):
+        self.fmt = fmt
+        self.values = values if values is not None else array("q")
+
+    def __getitem__(self, i):
+        return format_timestamp(self.values[i], self.fmt)
+
+    def __iter__(self):
+        fmt = self.fmt
+        return (format_timestamp(v, fmt) for v in self.values)
+
+    def text(self, i):
+        return self[i]
+
+    def encode(self, value):
+        if isinstance(value, str):
+            for fmt in TIMESTAMP_FORMATS.values():
+                parsed = parse_timestamp(value, fmt)
+                if parsed is not None:
+                    return parsed
+        return None
+
+    def take(self, indices):
+        values = self.values
+        return TimestampColumn(self.fmt, array("q", [values[i] for i in indices]))
+
+    def nbytes(self):
+        return buffer_nbytes(self.values)
+
+
+class StringColumn(Column):
+    """
+    Dictionary encoded string column: each distinct string is stored once in
+    pool and rows hold an index into it.
+    """
+    kind = "string"
+
+    def __init__(self, pool=None, codes=None, lookup=None):
+        self.pool = pool if pool is not None else []
+        self.lookup = lookup if lookup is not None else {s: i for i, s in enumerate(self.pool)}
+        self.codes = codes if codes is not None else array("I")
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getstate__(self):
+        return {"pool": self.pool, "codes": self.codes}
+
+    def __setstate__(self, state):
+        self.__init__(state["pool"], state["codes"])
+
+    def __getitem__(self, i):
+        return self.pool[self.codes[i]]
+
+    def __iter__(self):
+        pool = self.pool
+        return (pool[c] for c in self.codes)
+
+    @property
+    def values(self):
+        return list(self)
+
+    def text(self, i):
+        return self.pool[self.codes[i]]
+
+    def append(self, text):
+        code = self.lookup.get(text)
+        if code is None:
+            code = len(self.pool)
+            self.pool.append(text)
+            self.lookup[text] = code
+        self.codes.append(code)
+
+    def intern(self, texts):
+        """
+        Add the strings not yet pooled to the pool.
+        """
+        lookup = self.lookup
+        for text in dict.fromkeys(texts):
+            if text not in lookup:
+                lookup[text] = len(self.pool)
+                self.pool.append(text)
+
+    def extend(self, texts):
+        """
+        Append many cells, adding only the strings not yet pooled one by one.
+        """
+        self.intern(texts)
+        self.codes.extend(map(self.lookup.__getitem__, texts))
+
+    def encode(self, value):
+        if isinstance(value, str):
+            return value
+        return format_number(value)
+
+    def take(self, indices):
+        codes = self.codes
+        return StringColumn(self.pool, array("I", [codes[i] for i in indices]), self.lookup)
+
+    def nbytes(self):
+        return buffer_nbytes(self.codes) + sum(len(s) + 49 for s in self.pool)
+
+
+class ColumnBuilder:
+    """
+    Builds a typed column from CSV text cells, inferring the narrowest type
+    that reproduces every cell exactly: int, then float, then timestamp,
+    falling back to string.
+    """
+    def __init__(self):
+        self.kind = None
+        self.values = None
+        self.intMask = None
+        self.fmt = None
+        self.count = 0
+        self.timestamps = {}
+
+    def extend(self, texts):
+        """
+        Add a batch of cells. Each batch is converted column-at-a-time and
+        checked to print back to the same text; a batch that does not fit the
+        current type goes through append one cell at a time.
+        Args:
+            texts (list of str): Raw cell texts.
+        """
+        texts = list(texts)
+        if self.kind is None:
+            if not texts:
+                return
+            self._start(texts[0])
+            texts = texts[1:]
+        kind = self.kind
+        try:
+            if kind == "string":
+                self.values.extend(texts)
+                self.count += len(texts)
+                return
+            if kind == "int":
+                values = array("q", map(int, texts))
+                exact = list(map(str, values)) == texts
+            elif kind == "float":
+                values = array("d", map(float, texts))
+                exact = list(map(repr, values)) == texts and all(map(math.isfinite, values))
+            else:
+                values = self._timestamp_values(texts)
+                exact = values is not None
+        except (ValueError, OverflowError):
+            exact = False
+        if not exact:
+            for text in texts:
+                self.append(text)
+            return
+        self.values.extend(values)
+        if self.intMask is not None:
+            self.intMask.extend(bytes(len(texts)))
+        self.count += len(texts)
+
+    def _timestamp_values(self, texts):
+        cache = self.timestamps
+        values = array("q")
+        for text in texts:
+            value = cache.get(text)
+            if value is None:
+                value = parse_timestamp(text, self.fmt)
+                if value is None:
+                    return None
+                if len(cache) >= TIMESTAMP_CACHE_SIZE:
+                    cache.clear()
+                cache[text] = value
+            values.append(value)
+        return values
+
+    def append(self, text):
+        """
+        Add one cell, widening the column type if the cell does not fit.
+        Args:
+            text (str): Raw cell text.
+        """
+        kind = self.kind
+        if kind == "int":
+            value = parse_int(text)
+            if value is not None:
+                self.values.append(value)
+                self.count += 1
+                return
+            self._widen(text)
+            return
+        elif kind == "float":
+            value = parse_float(text)
+            if value is not None:
+                self.values.append(value)
+                if self.intMask is not None:
+                    self.intMask.append(0)
+                self.count += 1
+                return
+            value = parse_int(text)
+            if value is not None and abs(value) <= FLOAT_EXACT:
+                if self.intMask is None:
+                    self.intMask = bytearray(self.count)
+                self.values.append(value)
+                self.intMask.append(1)
+                self.count += 1
+                return
+            self._to_string()
+        elif kind == "timestamp":
+            value = parse_timestamp(text, self.fmt)
+            if value is not None:
+                self.values.append(value)
+                self.count += 1
+                return
+            self._to_string()
+        elif kind is None:
+            self._start(text)
+            return
+        self.values.append(text)
+        self.count += 1
+
+    def _start(self, text):
+        value = parse_int(text)
+        fmt = TIMESTAMP_FORMATS.get(len(text))
+        if value is not None:
+            self.kind, self.values = "int", array("q", [value])
+        elif parse_float(text) is not None:
+            self.kind, self.values = "float", array("d", [float(text)])
+        elif fmt and parse_timestamp(text, fmt) is not None:
+            self.kind, self.fmt = "timestamp", fmt
+            self.values = array("q", [parse_timestamp(text, fmt)])
+        else:
+            self.kind, self.values = "string", StringColumn()
+            self.values.append(text)
+        self.count = 1
+
+    def _widen(self, text):
+        value = parse_float(text)
+        if value is not None and all(abs(v) <= FLOAT_EXACT for v in self.values):
+            self.kind = "float"
+            self.intMask = bytearray(b"\x01") * self.count
+            self.values = array("d", self.values)
+            self.values.append(value)
+            self.intMask.append(0)
+            self.count += 1
+            return
+        self._to_string()
+        self.values.append(text)
+        self.count += 1
+
+    def _to_string(self):
+        self.timestamps = {}
+        column = self.build()
+        strings = StringColumn()
+        for i in range(len(column)):
+            strings.append(column.text(i))
+        self.kind, self.values, self.intMask = "string", strings, None
+
+    def build(self):
+        """
+        Return the finished column.
+        """
+        if self.kind == "int":
+            return IntColumn(self.values)
+        if self.kind == "float":
+            return FloatColumn(self.values, self.intMask)
+        if self.kind == "timestamp":
+            return TimestampColumn(self.fmt, self.values)
+        if self.kind == "string":
+            return self.values
+        return StringColumn()
+
+
+def concat_columns(columns):
+    """
+    Concatenate columns built from consecutive parts of the same data.
+    Columns of one kind are joined buffer to buffer (string codes are
+    remapped into a merged pool); mixed kinds are re-inferred from text.
+    Args:
+        columns (list of Column): The parts, in row order.
+    Returns:
+        Column: The concatenated column.
+    """
+    kinds = {c.kind for c in columns}
+    fmts = {getattr(c, "fmt", None) for c in columns}
+    if len(columns) == 1:
+        return columns[0]
+    if kinds == {"int"}:
+        values = array("q")
+        for c in columns:
+            values.extend(c.values)
+        return IntColumn(values)
+    if kinds == {"float"}:
+        values = array("d")
+        mask = None
+        if any(c.intMask is not None for c in columns):
+            mask = bytearray()
+        for c in columns:
+            values.extend(c.values)
+            if mask is not None:
+                mask.extend(c.intMask if c.intMask is not None else bytes(len(c)))
+        return FloatColumn(values, mask)
+    if kinds == {"timestamp"} and len(fmts) == 1:
+        values = array("q")
+        for c in columns:
+            values.extend(c.values)
+        return TimestampColumn(columns[0].fmt, values)
+    if kinds == {"string"}:
+        merged = StringColumn()
+        for c in columns:
+            merged.intern(c.pool)
+            mapping = list(map(merged.lookup.__getitem__, c.pool))
+            merged.codes.extend(map(mapping.__getitem__, c.codes))
+        return merged
+    builder = ColumnBuilder()
+    for c in columns:
+        builder.extend([c.text(i) for i in range(len(c))])
+    return builder.build()
+
+
+
+def copy_buffer(values, typecode):
+    """
+    Copy a numeric buffer (an array or a memoryview) into a new array.
+    """
+    copy = array(typecode)
+    copy.frombytes(memoryview(values).cast("B"))
+    return copy
+
+
+def append_column(column, new):
+    """
+    Return a new column holding the rows of column followed by those of new.
+    The existing buffers are copied whole and only the new rows are
+    converted, so the source column is never modified.
+    Args:
+        column (Column): Existing column.
+        new (Column): Column parsed from the appended rows.
+    Returns:
+        Column: The combined column.
+    """
+    if len(new) == 0:
+        return column
+    if column.kind == "int" and new.kind == "float" and all(abs(v) <= FLOAT_EXACT for v in column.values):
+        column = FloatColumn(array("d", column.values), bytearray(b"\x01") * len(column))
+    elif column.kind == "float" and new.kind == "int" and all(abs(v) <= FLOAT_EXACT for v in new.values):
+        new = FloatColumn(array("d", new.values), bytearray(b"\x01") * len(new))
+
+    if column.kind != new.kind or getattr(column, "fmt", None) != getattr(new, "fmt", None):
+        return concat_columns([column, new])
+    if column.kind == "int":
+        values = copy_buffer(column.values, "q")
+        values.extend(new.values)
+        return IntColumn(values)
+    if column.kind == "timestamp":
+        values = copy_buffer(column.values, "q")
+        values.extend(new.values)
+        return TimestampColumn(column.fmt, values)
+    if column.kind == "float":
+        values = copy_buffer(column.values, "d")
+        values.extend(new.values)
+        mask = None
+        if column.intMask is not None or new.intMask is not None:
+            mask = bytearray(column.intMask) if column.intMask is not None else bytearray(len(column))
+            mask.extend(new.intMask if new.intMask is not None else bytes(len(new)))
+        return FloatColumn(values, mask)
+    merged = StringColumn(list(column.pool), copy_buffer(column.codes, "I"), dict(column.lookup))
+    merged.intern(new.pool)
+    mapping = list(map(merged.lookup.__getitem__, new.pool))
+    merged.codes.extend(map(mapping.__getitem__, new.codes))
+    return merged
+
+class ZoneMap:
+    """
+    Minimum and maximum of every column over fixed-size groups of rows, used
+    to skip row groups that cannot match a WHERE condition.
+    Attributes:
+        rowGroupSize (int): Number of rows per group.
+        columns (list): For each column, a [min, max] pair per row group, in
+            the domain compiled predicates compare in (decoded strings for
+            string columns, raw buffer values otherwise).
+    """
+    def __init__(self, rowGroupSize, columns):
+        self.rowGroupSize = rowGroupSize
+        self.columns = columns
+
+    @classmethod
+    def build(cls, table, rowGroupSize):
+        """
+        Compute the zone map of a table.
+        """
+        length = len(table)
+        starts = range(0, length, rowGroupSize)
+        columns = []
+        for column in table.columns:
+            zones = []
+            for start in starts:
+                if column.kind == "string":
+                    pool = column.pool
+                    values = [pool[c] for c in set(column.codes[start:start + rowGroupSize])]
+                else:
+                    values = column.values[start:start + rowGroupSize]
+                zones.append([min(values), max(values)])
+            columns.append(zones)
+        return cls(rowGroupSize, columns)
+
+    def ranges(self, predicate, length):
+        """
+        Return the row ranges whose groups may hold rows matching every
+        term of a compiled predicate.
+        Args:
+            predicate (Predicate): Compiled WHERE conditions.
+            length (int): Number of rows in the table.
+        Returns:
+            list of range: Ranges of consecutive candidate groups.
+        """
+        terms = [t for t in predicate.terms if t.indexable]
+        ranges = []
+        for group in range((length + self.rowGroupSize - 1) // self.rowGroupSize):
+            if all(zone_may_match(self.columns[t.position][group], t.symbol, t.literal) for t in terms):
+                start = group * self.rowGroupSize
+                stop = min(start + self.rowGroupSize, length)
+                if ranges and ranges[-1].stop == start:
+                    ranges[-1] = range(ranges[-1].start, stop)
+                else:
+                    ranges.append(range(start, stop))
+        return ranges
+
+
+def zone_may_match(zone, symbol, literal):
+    """
+    Return False if no value between zone's min and max compares true against literal.
+    """
+    low, high = zone
+    if symbol == "=":
+        return low <= literal <= high
+    if symbol == "<":
+        return low < literal
+    if symbol == "<=":
+        return low <= literal
+    if symbol == ">":
+        return high > literal
+    if symbol == ">=":
+        return high >= literal
+    return not (low == high == literal)
+
+
+class Table:
+    """
+    In-memory columnar table.
+    Attributes:
+        header (list): Column names.
+        columns (list of Column): One typed buffer per column.
+        zones (ZoneMap): Per row group min/max of each column, or None.
+        lineage (int): Shared by a table and the tables built by appending rows
+            to it, so a table with the same lineage and more rows extends it.
+    """
+    def __init__(self, header, columns, zones=None, lineage=None):
+        self.header = header
+        self.columns = columns
+        self.zones = zones
+        self.lineage = next(LINEAGES) if lineage is None else lineage
+
+    @classmethod
+    def from_rows(cls, header, rows):
+        """
+        Build a table from rows of CSV text, inferring a type per column.
+        Args:
+            header (list): Column names.
+            rows (iterable of list): Rows of text cells.
+        Returns:
+            Table: The new table.
+        """
+        builders = [ColumnBuilder() for _ in header]
+        for row in rows:
+            for builder, cell in zip(builders, row):
+                builder.append(cell)
+        return cls(header, [b.build() for b in builders])
+
+    def __len__(self):
+        if not self.columns:
+            return 0
+        return len(self.columns[0])
+
+    def column_index(self, name):
+        """
+        Return the position of a column, or -1 if it does not exist.
+        """
+        try:
+            return self.header.index(name)
+        except ValueError:
+            return -1
+
+    def column(self, name):
+        return self.columns[self.header.index(name)]
+
+    def types(self):
+        """
+        Return the inferred type of each column.
+        """
+        return [c.kind for c in self.columns]
+
+    def row(self, i):
+        """
+        Return row i as a list of typed values.
+        """
+        return [c[i] for c in self.columns]
+
+    def rows(self, limit=0):
+        """
+        Iterate over rows as lists of typed values.
+        Args:
+            limit (int): Maximum number of rows to yield. If 0, yield all rows.
+        """
+        iterators = [iter(c) for c in self.columns]
+        count = len(self) if not limit else min(int(limit), len(self))
+        for _ in range(count):
+            yield [next(it) for it in iterators]
+
+    def text_rows(self):
+        """
+        Iterate over rows as lists of CSV text cells.
+        """
+        columns = self.columns
+        for i in range(len(self)):
+            yield [c.text(i) for c in columns]
+
+    def select(self, columns=None, indices=None, limit=0):
+        """
+        Build a new table from a projection and/or a subset of the rows.
+        Args:
+            columns (list, optional): Column names to keep, in output order.
+            indices (iterable of int, optional): Row positions to keep.
+            limit (int): Maximum number of rows to keep. If 0, keep all.
+        Returns:
+            Table: The new table.
+        """
+        header = self.header if columns is None else list(columns)
+        source = self.columns if columns is None else [self.column(c) for c in columns]
+        if indices is None:
+            indices = range(len(self))
+        if limit:
+            indices = list(indices)[:int(limit)]
+        elif not isinstance(indices, (list, range)):
+            indices = list(indices)
+        return Table(header, [c.take(indices) for c in source])
+
+    def view(self, columns=None, indices=None):
+        """
+        Build a table over a projection and/or a subset of the rows that
+        reads its cells from this table instead of copying them.
+        Args:
+            columns (list, optional): Column names to keep, in output order.
+            indices (iterable of int, optional): Row positions to keep.
+        Returns:
+            TableView: The new table.
+        """
+        if indices is None:
+            indices = range(len(self))
+        elif not isinstance(indices, (array, range)):
+            indices = array("q", indices)
+        return TableView(self, indices, None if columns is None else [self.column_index(c) for c in columns])
+
+    def nbytes(self):
+        """
+        Approximate memory footprint of the table in bytes.
+        """
+        return sum(c.nbytes() for c in self.columns)
+
+
+def infer_cell(text):
+    """
+    Type a single cell on its own: an int or float if the text prints back
+    the same, the text otherwise.
+    """
+    value = parse_int(text)
+    if value is None:
+        value = parse_float(text)
+    return text if value is None else value
+
+
+class LazyColumn:
+    """
+    Column of a LazyTable that has not been decoded yet. Reading one cell
+    decodes only that row, with the cell typed on its own; any other use
+    decodes the whole column first.
+    """
+    def __init__(self, table, position):
+        self.table = table
+        self.position = position
+
+    def __len__(self):
+        return len(self.table)
+
+    def __getitem__(self, i):
+        return infer_cell(self.table.record(i)[self.position])
+
+    def __iter__(self):
+        return iter(self.table.load_column(self.position))
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.table.load_column(self.position), name)
+
+
+class LazyTable(Table):
+    """
+    Table over a memory-mapped CSV file of which only the byte offset of
+    each record is known. Records are decoded when a query reads them, and
+    a column is parsed and typed the first time a query needs all of it
+    (a WHERE condition, an index, an export).
+    Attributes:
+        filename (str): Path of the CSV file.
+        mapped (mmap): The mapped file.
+        offsets (array): Byte offset of every record, followed by the end of the data.
+        reader (FilesCSV): Reader used to split records and parse columns.
+    """
+    def __init__(self, header, filename, mapped, offsets, reader):
+        Table.__init__(self, header, [LazyColumn(self, i) for i in range(len(header))])
+        self.filename = filename
+        self.mapped = mapped
+        self.offsets = offsets
+        self.reader = reader
+        self.lastRecord = (None, None)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def record(self, i):
+        """
+        Return the fields of record i, decoded from the mapped file.
+        """
+        if self.lastRecord[0] == i:
+            return self.lastRecord[1]
+        if i < 0:
+            i += len(self)
+        text = self.mapped[self.offsets[i]:self.offsets[i + 1]].decode(self.reader.encoding)
+        rows, leftover = self.reader.split_block(text if text.endswith("\n") else text + "\n")
+        fields = rows[0] if rows else self.reader.split_block(leftover + '"\n')[0][0]
+        if len(fields) != len(self.header):
+            raise ValueError(f"Row length mismatch: {len(fields)} != {len(self.header)}")
+        self.lastRecord = (i, fields)
+        return fields
+
+    def load_column(self, position):
+        """
+        Parse and type a whole column, replacing its lazy placeholder. Only
+        the records indexed at import are read, even if the file grew since.
+        Returns:
+            Column: The decoded column.
+        """
+        column = self.columns[position]
+        if not isinstance(column, LazyColumn):
+            return column
+        builder = ColumnBuilder()
+        width = len(self.header)
+        for rows in self.reader.read_records(self.filename, self.offsets[0], self.offsets[-1]):
+            widths = set(map(len, rows))
+            if widths != {width}:
+                raise ValueError(f"Row length mismatch: {min(widths - {width})} != {width}")
+            builder.extend([row[position] for row in rows])
+        column = builder.build()
+        self.columns[position] = column
+        return column
+
+    def nbytes(self):
+        size = self.offsets.itemsize * len(self.offsets)
+        return size + sum(c.nbytes() for c in self.columns if not isinstance(c, LazyColumn))
+
+
+class ViewColumn:
+    """
+    Column of a TableView that still reads its cells from the base table.
+    Reading cells or taking rows goes through the view's row positions;
+    any use needing the whole buffer copies the column from the base first.
+    A query may still hold the placeholder when another statement copies
+    the view's columns; it then reads the copied column.
+    """
+    def __init__(self, table, position):
+        self.table = table
+        self.position = position
+
+    def resolve(self):
+        """
+        Return the column cells are read from and the base position of each
+        row, or the copied column and None once the view was materialized.
+        """
+        table = self.table
+        # materialize clears base before positions, so both being set means
+        # they still belong together.
+        base = table.base
+        positions = table.positions
+        if base is None or positions is None:
+            return table.columns[self.position], None
+        return base.columns[table.mapping[self.position]], positions
+
+    @property
+    def kind(self):
+        return self.resolve()[0].kind
+
+    def __len__(self):
+        return len(self.table)
+
+    def __getitem__(self, i):
+        column, positions = self.resolve()
+        return column[i if positions is None else positions[i]]
+
+    def text(self, i):
+        column, positions = self.resolve()
+        return column.text(i if positions is None else positions[i])
+
+    def encode(self, value):
+        return self.resolve()[0].encode(value)
+
+    def take(self, indices):
+        column, positions = self.resolve()
+        if positions is None:
+            return column.take(indices)
+        return column.take([positions[i] for i in indices])
+
+    def nbytes(self):
+        return 0
+
+    def __iter__(self):
+        return iter(self.table.load_column(self.position))
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.table.load_column(self.position), name)
+
+
+class TableView(Table):
+    """
+    Table made of some rows and columns of a base table, holding only the
+    base position of each row and of each column. A column is copied from
+    the base the first time an operation needs all of it (a WHERE
+    condition, an index, a join), and every column is copied when the base
+    table is discarded or replaced, so the base can be freed.
+    Attributes:
+        base (Table): Table the cells are read from, or None once every column was copied.
+        positions (array): Base row position of each row, or None once every column was copied.
+        mapping (list): Base column position of each column.
+    """
+    def __init__(self, base, positions, mapping=None):
+        mapping = list(range(len(base.header))) if mapping is None else list(mapping)
+        Table.__init__(self, [base.header[j] for j in mapping], [ViewColumn(self, i) for i in range(len(mapping))])
+        self.base = base
+        self.positions = positions
+        self.mapping = mapping
+        self.length = len(positions)
+
+    def __len__(self):
+        return self.length
+
+    def source(self, position):
+        """
+        Return the base column a column of the view reads from.
+        """
+        return self.base.columns[self.mapping[position]]
+
+    def load_column(self, position):
+        """
+        Copy the rows of a column from the base, replacing its placeholder.
+        Returns:
+            Column: The copied column.
+        """
+        column = self.columns[position]
+        if not isinstance(column, ViewColumn):
+            return column
+        column = self.source(position).take(self.positions)
+        self.columns[position] = column
+        if not any(isinstance(c, ViewColumn) for c in self.columns):
+            self.base = None
+            self.positions = None
+        return column
+
+    def materialize(self):
+        """
+        Copy every column still read from the base table.
+        """
+        for position in range(len(self.columns)):
+            self.load_column(position)
+
+    def cells(self, method):
+        """
+        Iterate over rows built by calling method(column, position) for each
+        column, reading the base table where a column was not copied.
+        """
+        base = self.base
+        positions = self.positions
+        if base is None or positions is None:
+            sources = [(c, False) for c in self.columns]
+        else:
+            sources = [
+                (base.columns[self.mapping[j]], True) if isinstance(c, ViewColumn) else (c, False)
+                for j, c in enumerate(self.columns)
+            ]
+        for i in range(self.length):
+            yield [method(c, positions[i] if view else i) for c, view in sources]
+
+    def rows(self, limit=0):
+        if self.base is None:
+            return Table.rows(self, limit)
+        rows = self.cells(lambda c, i: c[i])
+        return islice(rows, int(limit)) if limit else rows
+
+    def text_rows(self):
+        if self.base is None:
+            return Table.text_rows(self)
+        return self.cells(lambda c, i: c.text(i))
+
+    def view(self, columns=None, indices=None):
+        if self.base is None:
+            return Table.view(self, columns, indices)
+        positions = self.positions
+        if indices is not None:
+            positions = array("q", [positions[i] for i in indices])
+        mapping = self.mapping if columns is None else [self.mapping[self.column_index(c)] for c in columns]
+        return TableView(self.base, positions, mapping)
+
+    def nbytes(self):
+        size = sum(c.nbytes() for c in self.columns)
+        if isinstance(self.positions, array):
+            size += self.positions.itemsize * len(self.positions)
+        return size
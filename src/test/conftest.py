@@ -0,0 +1,3 @@
+# test_interpreter, test_parser and test_lexer are scripts that run their
+# statements when imported; run them with python from a directory holding data/.
+collect_ignore = ["test_interpreter.py", "test_parser.py", "test_lexer.py"]
@@ -0,0 +1,86 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from interpreter import Interpreter
+from table import Table
+
+
+def csv_text(header, rows):
+    """
+    Build the text of a CSV file from a header and rows of cells.
+    """
+    return "\n".join(",".join(map(str, row)) for row in [header] + list(rows)) + "\n"
+
+
+def table(header, rows):
+    """
+    Build a table in memory from rows of cells, typed as an import types them.
+    """
+    return Table.from_rows(header, ([str(c) for c in row] for row in rows))
+
+
+class InterpreterTest(unittest.TestCase):
+    """
+    Base of the tests running CQL on an Interpreter whose data and export
+    directories are a fresh temporary directory.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dataPath = os.path.join(self.directory.name, "data")
+        self.exportPath = os.path.join(self.directory.name, "output")
+        os.mkdir(self.dataPath)
+        os.mkdir(self.exportPath)
+        self.interpreter = Interpreter()
+        self.interpreter.filePath = self.dataPath + os.sep
+        self.interpreter.exportPath = self.exportPath + os.sep
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, text, mode="w"):
+        with open(os.path.join(self.dataPath, name), mode) as file:
+            file.write(text)
+
+    def load(self, name, header, rows, mode=""):
+        """
+        Write rows to a CSV file named after a table and import the table.
+        Args:
+            name (str): Table name; the file is name + '.csv'.
+            header (list): Column names.
+            rows (iterable of list): Rows of cells.
+            mode (str): '', 'LAZY', 'PARALLEL' or 'APPEND'.
+        Returns:
+            str: Name of the CSV file.
+        """
+        filename = f"{name}.csv"
+        self.write(filename, csv_text(header, rows))
+        if mode == "APPEND":
+            output = self.run_cql(f'IMPORT TABLE {name} FROM "{filename}" APPEND;')
+        else:
+            output = self.run_cql(f'IMPORT {mode} TABLE {name} FROM "{filename}";')
+        self.assertIn(name, self.interpreter.tablesData, output)
+        return filename
+
+    def run_cql(self, text):
+        """
+        Run CQL commands as the REPL does.
+        Returns:
+            str: Everything printed, including the status of each command.
+        """
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.interpreter.run(text, False)
+        return output.getvalue()
+
+    def rows(self, text):
+        """
+        Run a query with Interpreter.query and return its rows.
+        """
+        result = self.interpreter.query(text)[-1]
+        self.assertIsNotNone(result.table, result.message)
+        return list(result)
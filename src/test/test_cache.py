@@ -0,0 +1,42 @@
+import unittest
+from support import InterpreterTest
+from pipeline import Project
+
+
+class ResultCacheTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.load("numbers", ["Id", "Val"], ([f"N{i}", i] for i in range(50)))
+
+    def test_repeated_query_is_served_from_cache(self):
+        first = self.run_cql('SELECT * FROM numbers WHERE Val > 40;')
+        second = self.run_cql('SELECT * FROM numbers WHERE Val > 40;')
+        self.assertEqual(first, second)
+        self.assertEqual(self.interpreter.resultCache.hits, 1)
+
+    def test_cache_is_invalidated_by_import(self):
+        self.run_cql('SELECT * FROM numbers LIMIT 3;')
+        self.write("numbers.csv", "Id,Val\nX,1\n")
+        self.run_cql('IMPORT TABLE numbers FROM "numbers.csv";')
+        self.assertIn("['X', 1]", self.run_cql('SELECT * FROM numbers LIMIT 3;'))
+
+    def test_rows_are_streamed_before_being_cached(self):
+        interpreter = self.interpreter
+        header, rows, _ = interpreter.cached_query(
+            ("SELECT", "numbers", 0), "numbers",
+            lambda: Project(interpreter.scan_table("numbers", None, 0), interpreter.tablesData["numbers"]))
+        self.assertNotIsInstance(rows, list)
+        self.assertEqual(len(self.interpreter.resultCache), 0)
+        self.assertEqual(len(list(rows)), 50)
+        self.assertEqual(len(self.interpreter.resultCache), 1)
+
+    def test_result_larger_than_budget_is_printed_but_not_cached(self):
+        self.interpreter.resultCache.budget = 1000
+        output = self.run_cql('SELECT * FROM numbers;')
+        self.assertEqual(output.count("['N"), 50)
+        self.assertEqual(len(self.interpreter.resultCache), 0)
+        self.assertEqual(self.interpreter.resultCache.nbytes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
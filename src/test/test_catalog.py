@@ -0,0 +1,61 @@
+import os
+import unittest
+from support import InterpreterTest, csv_text
+
+
+def table_csv(prefix, count):
+    return csv_text(["Id", "Val"], ([f"{prefix}{i:06d}", i] for i in range(count)))
+
+
+class CatalogTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.write("a.csv", table_csv("A", 3000))
+        self.write("b.csv", table_csv("B", 3000))
+        self.write("c.csv", table_csv("C", 3))
+
+    def test_view_keeps_reading_base_held_by_import_cache(self):
+        catalog = self.interpreter.tablesData
+        self.run_cql('IMPORT TABLE a FROM "a.csv"; CREATE TABLE v SELECT * FROM a; DISCARD TABLE a;')
+        self.assertEqual(catalog.state("v"), "view")
+        self.interpreter.importCache.clear()
+        self.run_cql('IMPORT TABLE c FROM "c.csv";')
+        self.assertEqual(catalog.state("v"), "memory")
+        self.assertEqual(self.rows('SELECT * FROM v WHERE Val = 2999;'), [["A002999", 2999]])
+
+    def test_materialized_view_is_spilled_before_newer_tables(self):
+        catalog = self.interpreter.tablesData
+        self.interpreter.importCache.capacity = 0
+        self.run_cql('IMPORT TABLE a FROM "a.csv"; CREATE TABLE v SELECT * FROM a; IMPORT TABLE b FROM "b.csv";')
+        catalog.budget = catalog.sizes["b"] * 3 // 2
+        self.run_cql('DISCARD TABLE a; IMPORT TABLE c FROM "c.csv";')
+        self.assertEqual(catalog.state("v"), "spilled")
+        self.assertEqual(catalog.state("b"), "memory")
+        self.assertEqual(self.rows('SELECT * FROM v WHERE Val = 7;'), [["A000007", 7]])
+
+    def test_sizes_follow_stores_and_lazy_decoding(self):
+        catalog = self.interpreter.tablesData
+        self.run_cql('IMPORT TABLE a FROM "a.csv"; IMPORT LAZY TABLE lz FROM "b.csv"; RENAME TABLE a "r";')
+        lazy = catalog.sizes["lz"]
+        self.run_cql('CREATE INDEX idx_val ON lz(Val); IMPORT TABLE c FROM "c.csv"; DISCARD TABLE c;')
+        self.assertGreater(catalog.sizes["lz"], lazy)
+        self.assertEqual(catalog.sizes["r"], catalog["r"].nbytes())
+        self.assertEqual(catalog.nbytes(), sum(catalog.sizes.values()))
+
+    def test_caches_are_emptied_before_tables_are_spilled(self):
+        catalog = self.interpreter.tablesData
+        self.run_cql('IMPORT TABLE a FROM "a.csv"; IMPORT TABLE b FROM "b.csv"; DISCARD TABLE b;')
+        for i in range(5):
+            self.run_cql(f'SELECT * FROM a WHERE Val > {i};')
+        self.assertGreater(self.interpreter.resultCache.nbytes, 0)
+        self.assertEqual(catalog.cache_bytes(), self.interpreter.resultCache.nbytes + self.interpreter.importCache.nbytes - catalog.sizes["a"])
+        catalog.budget = catalog.nbytes() + 4096
+        self.run_cql('IMPORT TABLE c FROM "c.csv";')
+        self.assertEqual(catalog.spills, 0)
+        self.assertEqual(catalog.state("a"), "memory")
+        self.assertLessEqual(catalog.nbytes() + catalog.cache_bytes(), catalog.budget)
+        self.assertEqual([os.path.basename(path) for path, lazy in self.interpreter.importCache.entries], ["a.csv", "c.csv"])
+
+
+if __name__ == "__main__":
+    unittest.main()
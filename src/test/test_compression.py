@@ -0,0 +1,46 @@
+import bz2
+import gzip
+import lzma
+import os
+import unittest
+from support import InterpreterTest, csv_text
+
+CODECS = {"gz": gzip, "bz2": bz2, "xz": lzma}
+
+
+class CompressionTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.towns = [[f"T{i}", "São Brás", i] for i in range(100)]
+        self.load("towns", ["Id", "Town", "Val"], self.towns)
+
+    def exported(self, name):
+        with open(os.path.join(self.exportPath, name), "rb") as file:
+            return file.read()
+
+    def test_every_level_round_trips_with_every_codec(self):
+        for level in (0, 1, 9):
+            for suffix, codec in CODECS.items():
+                name = f"towns{level}.csv.{suffix}"
+                output = self.run_cql(f'SET COMPRESS_LEVEL {level}; EXPORT TABLE towns AS "{name}";')
+                self.assertNotIn("rror", output)
+                data = self.exported(name)
+                self.assertEqual(codec.decompress(data).decode("utf-8").splitlines(), csv_text(["Id", "Town", "Val"], self.towns).splitlines())
+                self.write(name, data, "wb")
+                self.run_cql(f'IMPORT TABLE back FROM "{name}";')
+                self.assertEqual(self.rows('SELECT * FROM back WHERE Val > 97;'), [["T98", "São Brás", 98], ["T99", "São Brás", 99]])
+
+    def test_export_uses_the_file_encoding(self):
+        self.interpreter.filesCSV.encoding = "latin-1"
+        self.run_cql('EXPORT TABLE towns AS "towns.csv"; EXPORT TABLE towns AS "towns.csv.gz";')
+        self.assertIn("São Brás".encode("latin-1"), self.exported("towns.csv"))
+        self.assertIn("São Brás".encode("latin-1"), gzip.decompress(self.exported("towns.csv.gz")))
+
+    def test_level_must_be_a_whole_number_from_0_to_9(self):
+        for value in ("2.5", "10"):
+            self.assertIn("must be a whole number", self.run_cql(f'SET COMPRESS_LEVEL {value};'))
+        self.assertIsNone(self.interpreter.filesCSV.compressLevel)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from support import InterpreterTest, table
+from filesCQLC import FilesCQLC
+from predicate import compile_conditions
+
+ROWS = [[f"S{i % 4}", i, "2.5" if i % 3 else i, f"2024-03-{1 + i % 28:02d}T10:00"] for i in range(95)]
+
+
+class CQLCFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "t.cqlc")
+        self.files = FilesCQLC(rowGroupSize=10)
+        self.table = table(["Station", "Seq", "Val", "At"], ROWS)
+
+    def test_round_trip_is_mapped_not_copied(self):
+        self.assertTrue(self.files.write_cqlc(self.path, self.table))
+        mapped = self.files.read_cqlc(self.path)
+        self.assertEqual(mapped.nbytes(), 0)
+        self.assertEqual((mapped.header, mapped.types()), (self.table.header, self.table.types()))
+        self.assertEqual(list(mapped.rows()), list(self.table.rows()))
+        self.assertEqual(list(mapped.text_rows()), list(self.table.text_rows()))
+        # Only the string pool is decoded into memory.
+        self.assertEqual(mapped.nbytes(), mapped.columns[0].nbytes())
+        self.assertEqual(self.files.lastReadStats["rows"], 95)
+
+    def test_zone_map_skips_row_groups(self):
+        self.files.write_cqlc(self.path, self.table)
+        mapped = self.files.read_cqlc(self.path)
+        predicate = compile_conditions(mapped, [("CONDITION", "Seq", ">=", 42), ("CONDITION", "Seq", "<", 57)])
+        self.assertEqual(mapped.zones.ranges(predicate, len(mapped)), [range(40, 60)])
+        predicate = compile_conditions(mapped, [("CONDITION", "Station", "=", "S9")])
+        self.assertEqual(mapped.zones.ranges(predicate, len(mapped)), [])
+        predicate = compile_conditions(mapped, [("CONDITION", "Seq", ">", 90)])
+        self.assertEqual(mapped.zones.ranges(predicate, len(mapped)), [range(90, 95)])
+
+    def test_other_files_are_rejected(self):
+        with open(self.path, "wb") as file:
+            file.write(b"Id,Val\n1,2\n")
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            self.assertIsNone(self.files.read_cqlc(self.path))
+        self.assertIn("not a CQLC file", printed.getvalue())
+
+
+class CQLCQueryTest(InterpreterTest):
+    def test_export_and_import_give_the_same_answers(self):
+        self.load("readings", ["Station", "Seq", "Val", "At"], ROWS)
+        self.interpreter.filesCQLC.rowGroupSize = 10
+        self.assertIn("exported", self.run_cql('EXPORT TABLE readings AS "readings.cqlc";'))
+        shutil.copy(os.path.join(self.exportPath, "readings.cqlc"), self.dataPath)
+        self.run_cql('IMPORT TABLE mapped FROM "readings.cqlc";')
+        self.assertIsNotNone(self.interpreter.tablesData["mapped"].zones)
+        for where in ('Seq > 80', 'Station = "S2" AND Seq < 30', 'At >= "2024-03-20T10:00"', 'Val = 2.5'):
+            self.assertEqual(
+                self.rows(f'SELECT * FROM mapped WHERE {where};'),
+                self.rows(f'SELECT * FROM readings WHERE {where};'), where)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from support import csv_text
+from filesCSV import FilesCSV, split_brackets, tokenize
+
+
+class TokenizeTest(unittest.TestCase):
+    def test_quoted_fields(self):
+        self.assertEqual(tokenize('a,"b, c","say ""hi"""'), ["a", "b, c", 'say "hi"'])
+        self.assertEqual(tokenize('a,"open'), None)
+        self.assertEqual(tokenize('x"y,z'), ['x"y', "z"])
+
+    def test_brackets_keep_their_commas(self):
+        self.assertEqual(split_brackets("E1,[-43.2,-22.9],Rio"), ["E1", "[-43.2,-22.9]", "Rio"])
+        self.assertEqual(tokenize('"E1",[-43.2,-22.9],Rio'), ["E1", "[-43.2,-22.9]", "Rio"])
+
+
+class ReadCSVTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        # Small blocks, so records and quoted fields cross block boundaries.
+        self.files = FilesCSV(chunkSize=64)
+
+    def read(self, text, newline="\n"):
+        path = os.path.join(self.directory.name, "data.csv")
+        with open(path, "w", newline="") as file:
+            file.write(text.replace("\n", newline))
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            data = self.files.read_csv(path)
+        return data, printed.getvalue()
+
+    def test_comments_blank_lines_and_line_endings(self):
+        text = '# generated\n\nId,Place,Where\n# stations\nE1,"Rio, RJ",[-43.2,-22.9]\n\n  # indented\nE2,Niteroi,[-43.1,-22.8]\n"#E3",hidden,[0,0]\n'
+        for newline in ("\n", "\r\n"):
+            data, printed = self.read(text, newline)
+            self.assertEqual(printed, "")
+            self.assertEqual(data.header, ["Id", "Place", "Where"])
+            self.assertEqual(list(data.rows()), [["E1", "Rio, RJ", "[-43.2,-22.9]"], ["E2", "Niteroi", "[-43.1,-22.8]"]])
+
+    def test_quoted_newlines_across_blocks(self):
+        rows = [[f"R{i}", f'"line {i}\nnext ""{i}"""', i * 1.5] for i in range(40)]
+        data, printed = self.read(csv_text(["Id", "Note", "Val"], rows))
+        self.assertEqual(len(data), 40)
+        self.assertEqual(data.row(17), ["R17", 'line 17\nnext "17"', 25.5])
+        self.assertEqual(data.types(), ["string", "string", "float"])
+
+    def test_stats_and_errors(self):
+        data, printed = self.read(csv_text(["A", "B"], ([i, i] for i in range(100))))
+        stats = self.files.lastReadStats
+        self.assertEqual((stats["rows"], stats["workers"]), (100, 1))
+        self.assertGreater(stats["rowsPerSecond"], 0)
+        data, printed = self.read("A,B\n1,2\n3\n")
+        self.assertIsNone(data)
+        self.assertIn("Row length mismatch", printed)
+        data, printed = self.read("# only a comment\n")
+        self.assertEqual((data.header, len(data)), ([], 0))
+
+    def test_written_file_reads_back(self):
+        source, printed = self.read('Id,Note,When\nA,"x, ""y""",2024-01-05\nB,plain,2024-02-05\n')
+        path = os.path.join(self.directory.name, "copy.csv")
+        self.assertTrue(self.files.write_csv(path, source))
+        copy = self.files.read_csv(path)
+        self.assertEqual((copy.header, list(copy.rows()), copy.types()), (source.header, list(source.rows()), source.types()))
+
+
+if __name__ == "__main__":
+    unittest.main()
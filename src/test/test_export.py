@@ -0,0 +1,50 @@
+import os
+import unittest
+from unittest import mock
+from support import InterpreterTest
+from filesCSV import FilesCSV
+
+
+class ExportQueryTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.load("obs", ["Id", "Place", "Temp"], ([f"O{i}", f'"Rio, {i % 3}"', 15 + i % 15] for i in range(300)))
+        self.interpreter.batchSize = 32
+
+    def exported(self, name):
+        with open(os.path.join(self.exportPath, name), newline="") as file:
+            return file.read().splitlines()
+
+    def test_rows_match_the_query(self):
+        self.assertIn("10 rows of table obs exported", self.run_cql('EXPORT (SELECT * FROM obs WHERE Temp > 25 LIMIT 10) AS "hot.csv";'))
+        lines = self.exported("hot.csv")
+        self.assertEqual(lines[0], "Id,Place,Temp")
+        self.assertEqual(lines[1:3], ['O11,"Rio, 2",26', 'O12,"Rio, 0",27'])
+        self.run_cql('EXPORT (SELECT Temp, Id FROM obs LIMIT 2) AS "some.csv";')
+        self.assertEqual(self.exported("some.csv"), ["Temp,Id", "15,O0", "16,O1"])
+        self.assertEqual(set(self.interpreter.tablesData), {"obs"})
+
+    def test_rows_are_written_a_batch_at_a_time(self):
+        write_rows = FilesCSV.write_rows
+        sizes = []
+
+        def spy(files, filename, header, batches):
+            self.assertNotIsInstance(batches, list)
+            return write_rows(files, filename, header, (sizes.append(len(b)) or b for b in batches))
+        with mock.patch.object(FilesCSV, "write_rows", autospec=True, side_effect=spy):
+            self.run_cql('EXPORT (SELECT * FROM obs WHERE Temp >= 15) AS "all.csv";')
+        self.assertEqual(sum(sizes), 300)
+        self.assertLessEqual(max(sizes), 32)
+        self.assertEqual(len(self.exported("all.csv")), 301)
+
+    def test_cqlc_export_and_errors(self):
+        self.assertIn("20 rows", self.run_cql('EXPORT (SELECT * FROM obs WHERE Temp = 20) AS "twenty.cqlc";'))
+        table = self.interpreter.filesCQLC.read_cqlc(os.path.join(self.exportPath, "twenty.cqlc"))
+        self.assertEqual({row[2] for row in table.rows()}, {20})
+        self.assertIn("does not exist", self.run_cql('EXPORT (SELECT Missing FROM obs) AS "x.csv";'))
+        self.assertIn("does not exist", self.run_cql('EXPORT (SELECT * FROM nothing) AS "x.csv";'))
+        self.assertFalse(os.path.exists(os.path.join(self.exportPath, "x.csv")))
+
+
+if __name__ == "__main__":
+    unittest.main()
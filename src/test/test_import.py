@@ -0,0 +1,69 @@
+import unittest
+from support import InterpreterTest, csv_text
+
+
+def people(count):
+    return csv_text(["Id", "Name", "Age", "Score"], (
+        [f"P{i}", f'"Doe, J{i}"' if i % 7 == 0 else f"Name{i % 13}", i % 90, f"{i * 0.25}"]
+        for i in range(count)
+    ))
+
+
+def notes(count):
+    lines = ["Id,Note,Size", '# the "Note" field holds two lines, so it"s quoted']
+    lines += [f'N{i},"first {i}\nsecond",{i % 50}' for i in range(count)]
+    return "\n".join(lines) + "\n"
+
+
+class ParallelImportTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.write("people.csv", people(3000))
+        self.interpreter.importWorkers = 3
+        self.interpreter.importCache.capacity = 0
+        self.interpreter.filesCSV.parallelMinBytes = 1
+
+    def test_parallel_import_matches_serial(self):
+        self.run_cql('IMPORT PARALLEL TABLE forked FROM "people.csv";')
+        self.assertEqual(self.interpreter.filesCSV.lastReadStats["workers"], 3)
+        self.run_cql('IMPORT TABLE serial FROM "people.csv";')
+        self.assertEqual(self.rows('SELECT * FROM forked;'), self.rows('SELECT * FROM serial;'))
+        self.assertEqual(self.interpreter.tablesData["forked"].types(), self.interpreter.tablesData["serial"].types())
+
+    def test_odd_quotes_in_a_comment_do_not_move_the_cuts(self):
+        self.write("notes.csv", notes(3000))
+        self.interpreter.filesCSV.chunkSize = 4096
+        self.run_cql('IMPORT PARALLEL TABLE forked FROM "notes.csv";')
+        self.assertEqual(self.interpreter.filesCSV.lastReadStats["workers"], 3)
+        rows = self.rows('SELECT * FROM forked;')
+        self.assertEqual(len(rows), 3000)
+        self.assertEqual(rows[1234], ["N1234", "first 1234\nsecond", 34])
+
+    def test_import_is_serial_while_threads_run(self):
+        self.interpreter.concurrent = True
+        self.run_cql('IMPORT PARALLEL TABLE forked FROM "people.csv";')
+        self.assertEqual(self.interpreter.filesCSV.lastReadStats["workers"], 1)
+        self.assertEqual(len(self.interpreter.tablesData["forked"]), 3000)
+
+
+class AppendImportTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.load("log", ["Id", "Note"], [["L0", "start"]], "APPEND")
+
+    def append(self, text):
+        self.write("log.csv", text, "a")
+        self.run_cql('IMPORT TABLE log FROM "log.csv" APPEND;')
+        return self.rows('SELECT * FROM log;')
+
+    def test_odd_quotes_in_a_comment_do_not_hold_back_records(self):
+        rows = self.append('# it"s a comment\nL1,"two\nlines"\nL2,plain\n')
+        self.assertEqual(rows, [["L0", "start"], ["L1", "two\nlines"], ["L2", "plain"]])
+
+    def test_open_quoted_field_waits_for_the_next_read(self):
+        self.assertEqual(len(self.append('L1,plain\nL2,"still\n')), 2)
+        self.assertEqual(self.append('open"\n')[-1], ["L2", "still\nopen"])
+
+
+if __name__ == "__main__":
+    unittest.main()
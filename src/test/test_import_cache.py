@@ -0,0 +1,73 @@
+import os
+import unittest
+from support import InterpreterTest
+from cache import LRUCache
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertEqual((sorted(cache.entries), cache.hits, cache.misses), (["a", "c"], 1, 0))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.misses, 1)
+
+    def test_budget_bounds_the_bytes_held(self):
+        cache = LRUCache(10, budget=100)
+        cache.put("big", 0, 101)
+        self.assertNotIn("big", cache)
+        for key in "abc":
+            cache.put(key, key, 40)
+        self.assertEqual((sorted(cache.entries), cache.nbytes), (["b", "c"], 80))
+        self.assertIsNone(cache.get("b", lambda value: value == "x"))
+        self.assertEqual((len(cache), cache.nbytes), (1, 40))
+
+    def test_capacity_zero_disables_the_cache(self):
+        cache = LRUCache(0)
+        cache.put("a", 1)
+        self.assertEqual(len(cache), 0)
+
+
+class ImportCacheTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.load("places", ["Id", "Name"], ([f"P{i}", f"N{i}"] for i in range(30)))
+
+    def test_unchanged_file_is_not_parsed_again(self):
+        first = self.interpreter.tablesData["places"]
+        self.run_cql('IMPORT TABLE again FROM "places.csv";')
+        self.assertIs(self.interpreter.tablesData["again"], first)
+        self.assertTrue(self.interpreter.importStats["again"]["cached"])
+        self.assertEqual((self.interpreter.importCache.hits, self.interpreter.importCache.misses), (1, 1))
+
+    def test_changed_file_is_parsed_again(self):
+        path = os.path.join(self.dataPath, "places.csv")
+        self.write("places.csv", "P30,N30\n", "a")
+        self.run_cql('IMPORT TABLE places FROM "places.csv";')
+        self.assertEqual(len(self.interpreter.tablesData["places"]), 31)
+        self.assertFalse(self.interpreter.importStats["places"]["cached"])
+        # Same size and modification time, other contents: only the hash tells.
+        info = os.stat(path)
+        with open(path, "r+") as file:
+            file.seek(info.st_size - 4)
+            file.write("X30\n")
+        os.utime(path, ns=(info.st_atime_ns, info.st_mtime_ns))
+        self.run_cql('IMPORT TABLE places FROM "places.csv";')
+        self.assertEqual(self.rows('SELECT * FROM places WHERE Id = "P30";'), [["P30", "N30"]])
+        self.interpreter.importCacheHash = True
+        self.run_cql('IMPORT TABLE places FROM "places.csv";')
+        self.run_cql('IMPORT TABLE places FROM "places.csv";')
+        self.assertEqual(self.rows('SELECT * FROM places WHERE Id = "P30";'), [["P30", "X30"]])
+        self.assertTrue(self.interpreter.importStats["places"]["cached"])
+
+    def test_eager_and_lazy_imports_are_cached_apart(self):
+        self.run_cql('IMPORT LAZY TABLE deferred FROM "places.csv";')
+        self.assertIsNot(self.interpreter.tablesData["deferred"], self.interpreter.tablesData["places"])
+        self.assertFalse(self.interpreter.importStats["deferred"]["cached"])
+
+
+if __name__ == "__main__":
+    unittest.main()
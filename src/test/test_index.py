@@ -0,0 +1,84 @@
+import unittest
+from support import InterpreterTest, table
+from index import HashIndex, Index, SortedIndex, create_index
+
+ROWS = [[f"K{i % 9}", (i * 7) % 40, f"2024-01-{1 + i % 28:02d}"] for i in range(200)]
+SYMBOLS = {
+    "=": lambda a, b: a == b, "<": lambda a, b: a < b, "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b, ">=": lambda a, b: a >= b,
+}
+
+
+class IndexLookupTest(unittest.TestCase):
+    def setUp(self):
+        self.table = table(["Key", "Qty", "Day"], ROWS)
+
+    def test_default_kind_follows_the_column_type(self):
+        self.assertIsInstance(create_index("i", "t", "Key", None, self.table), HashIndex)
+        self.assertIsInstance(create_index("i", "t", "Qty", None, self.table), SortedIndex)
+        self.assertIsInstance(create_index("i", "t", "Key", "SORTED", self.table), SortedIndex)
+
+    def test_hash_lookup_returns_rows_with_the_key(self):
+        index = create_index("i", "t", "Key", None, self.table)
+        self.assertEqual(list(index.lookup("=", "K4")), [i for i, r in enumerate(ROWS) if r[0] == "K4"])
+        self.assertEqual(list(index.lookup("=", "missing")), [])
+        self.assertFalse(index.supports("<"))
+
+    def test_sorted_lookup_matches_a_scan(self):
+        for column, j, literal in (("Qty", 1, 17), ("Key", 0, "K3")):
+            index = create_index("i", "t", column, "SORTED", self.table)
+            for symbol, test in SYMBOLS.items():
+                expected = [i for i, r in enumerate(ROWS) if test(r[j], literal)]
+                self.assertEqual(list(index.lookup(symbol, literal)), expected, (column, symbol))
+        index = create_index("i", "t", "Day", None, self.table)
+        literal = self.table.column("Day").encode("2024-01-20")
+        self.assertEqual(list(index.lookup(">", literal)), [i for i, r in enumerate(ROWS) if r[2] > "2024-01-20"])
+
+    def test_index_kinds_must_build_and_look_up(self):
+        class Partial(Index):
+            def build(self, data):
+                self.source = data
+        with self.assertRaises(TypeError):
+            Index("i", "t", "Key")
+        with self.assertRaises(TypeError):
+            Partial("i", "t", "Key")
+
+
+class IndexMaintenanceTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.load("items", ["Key", "Qty"], ([r[0], r[1]] for r in ROWS))
+        self.load("keys", ["Key", "Label"], ([f"K{i}", f"L{i}"] for i in range(9)))
+        self.run_cql('CREATE INDEX by_key ON items(Key);')
+
+    def test_import_rebuilds_and_discard_drops(self):
+        self.load("items", ["Key", "Qty"], [["K4", 1], ["K5", 2]])
+        self.assertEqual(self.rows('SELECT * FROM items WHERE Key = "K4";'), [["K4", 1]])
+        self.assertEqual(self.interpreter.lastIndexUsed, "by_key")
+        self.load("items", ["Other", "Qty"], [["K4", 1]])
+        self.assertNotIn("by_key", self.interpreter.indexes)
+        self.run_cql('CREATE INDEX by_qty ON items(Qty); DISCARD TABLE items;')
+        self.assertEqual(self.interpreter.indexes, {})
+
+    def test_rename_moves_the_index(self):
+        self.run_cql('RENAME TABLE items "stock";')
+        self.assertEqual(self.interpreter.indexes["by_key"].table, "stock")
+        self.assertEqual(len(self.rows('SELECT * FROM stock WHERE Key = "K2";')), len([r for r in ROWS if r[0] == "K2"]))
+        self.assertEqual(self.interpreter.lastIndexUsed, "by_key")
+
+    def test_join_probes_the_index(self):
+        self.run_cql('CREATE TABLE labelled FROM keys JOIN items USING ("Key");')
+        self.assertEqual(self.interpreter.indexes["by_key"].uses, 1)
+        self.assertEqual(len(self.rows('SELECT * FROM labelled;')), len(ROWS))
+
+    def test_drop_and_errors(self):
+        self.assertIn("already exists", self.run_cql('CREATE INDEX by_key ON items(Qty);'))
+        self.assertIn("does not exist", self.run_cql('CREATE INDEX bad ON items(Missing);'))
+        self.assertIn("not supported", self.run_cql('CREATE INDEX bad ON items(Qty) USING BTREE;'))
+        self.assertIn("was dropped", self.run_cql('DROP INDEX by_key;'))
+        self.rows('SELECT * FROM items WHERE Key = "K1";')
+        self.assertIsNone(self.interpreter.lastIndexUsed)
+
+
+if __name__ == "__main__":
+    unittest.main()
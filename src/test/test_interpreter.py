@@ -8,17 +8,46 @@ interpreter = Interpreter()
 
 commands = [
     'IMPORT TABLE cidades FROM "cidades.csv";',
+    'IMPORT PARALLEL TABLE cidades FROM "cidades.csv";',
+    'IMPORT LAZY TABLE cidades FROM "cidades.csv";',
+    'IMPORT TABLE cidades FROM "cidades.csv" APPEND;',
+    'IMPORT TABLE cidades FROM "cidades.csv" APPEND;',
     'EXPORT TABLE cidades AS "cidades.csv";',
+    'EXPORT TABLE cidades AS "cidades.cqlc";',
     'RENAME TABLE cidades "kazzio";',
     'PRINT TABLE kazzio;',
     'SELECT * FROM kazzio;',
     'SELECT Freguesias FROM kazzio;',
+    'SET OUTPUT ALIGNED;',
+    'SELECT * FROM kazzio LIMIT 2;',
+    'SET OUTPUT TSV;',
+    'PRINT TABLE kazzio;',
+    'SET OUTPUT LIST;',
+    'EXPORT (SELECT * FROM kazzio WHERE Pessoas > 50) AS "crowded.csv";',
+    'EXPORT (SELECT Id, Cidade FROM kazzio LIMIT 2) AS "ids.cqlc";',
+    'SET COMPRESS_LEVEL 9;',
+    'EXPORT TABLE kazzio AS "kazzio.csv.gz";',
     'SELECT * FROM kazzio WHERE Pessoas > "10";',
+    'CREATE INDEX idx_pessoas ON kazzio(Pessoas);',
+    'CREATE INDEX idx_id ON kazzio(Id) USING HASH;',
+    'SELECT * FROM kazzio WHERE Pessoas > 50 AND Id = "E4";',
+    'SELECT * FROM kazzio WHERE Id = "E4" AND Pessoas > 50;',
+    'SHOW INDEXES;',
+    'DROP INDEX idx_pessoas;',
+    'PREPARE crowded AS SELECT * FROM kazzio WHERE Pessoas > ? AND Id <> ? LIMIT 5;',
+    'EXECUTE crowded(50, "E4");',
+    'EXECUTE crowded(10, "E1");',
+    'SHOW CACHE;',
     'CREATE TABLE kazzio2 SELECT * FROM kazzio;',
     'CREATE TABLE kazzio3 SELECT * FROM kazzio WHERE Pessoas > "10";',
+    'CREATE MATERIALIZED TABLE kazzio4 SELECT * FROM kazzio WHERE Pessoas > 10;',
+    'SHOW VIEWS;',
+    'SHOW MEMORY;',
     'DISCARD TABLE kazzio;',
     'PROCEDURE procedureTest DO IMPORT TABLE cidades FROM "cidades.csv"; END',
-    'CALL procedureTest;'
+    'CALL procedureTest;',
+    'PROCEDURE importBoth DO IMPORT TABLE observacoes FROM "observacoes.csv"; IMPORT TABLE estacoes FROM "estacoes.csv"; CREATE TABLE completo FROM estacoes JOIN observacoes USING ("Id"); END',
+    'CALL importBoth;'
 ]
 
 for command in commands:
@@ -26,4 +55,10 @@ for command in commands:
     output = interpreter.run(command, True)
     if output:
         print(output)
-    print("-------------------------------------")
\ No newline at end of file
+    print("-------------------------------------")
+for result in interpreter.query('SELECT * FROM cidades WHERE Pessoas > 50; SHOW IMPORTS;'):
+    print("Query:", result.message)
+    print(result.columns, result.types)
+    for row in result:
+        print(row)
+    print("-------------------------------------")
@@ -0,0 +1,51 @@
+import os
+import unittest
+from support import InterpreterTest
+from table import TableView
+
+
+class JoinTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.load("j1", ["Id", "Name"], [[1, "one"], [2, "two"]])
+        self.load("j2", ["Id", "Score"], [[1, 10], ["Z3", 30], [2, 20]])
+        self.load("j3", ["Id", "Weight"], [[1.0, 0.5], [2.5, 1.5], [2, 2.5]])
+        self.load("j4", ["Id", "Name"], [[1, "uno"], [2, "dos"]])
+
+    def test_same_kind_keys(self):
+        self.run_cql('CREATE TABLE self FROM j1 JOIN j1 USING ("Id");')
+        self.assertEqual(sorted(self.rows('SELECT * FROM self;')), [[1, "one", "one"], [2, "two", "two"]])
+
+    def test_int_keys_against_string_keys_compare_as_text(self):
+        self.assertEqual(self.interpreter.tablesData["j1"].types()[0], "int")
+        self.assertEqual(self.interpreter.tablesData["j2"].types()[0], "string")
+        self.run_cql('CREATE TABLE mixed FROM j1 JOIN j2 USING ("Id");')
+        self.assertEqual(sorted(self.rows('SELECT * FROM mixed;')), [[1, "one", 10], [2, "two", 20]])
+
+    def test_int_keys_against_float_keys_compare_as_numbers(self):
+        self.run_cql('CREATE TABLE numeric FROM j1 JOIN j3 USING ("Id");')
+        self.assertEqual(sorted(self.rows('SELECT Name, Weight FROM numeric;')), [["one", 0.5], ["two", 2.5]])
+
+    def test_columns_with_the_same_name_keep_their_own_cells(self):
+        self.run_cql('CREATE TABLE named FROM j1 JOIN j4 USING ("Id");')
+        output = self.run_cql('SELECT * FROM named; SELECT * FROM named WHERE Id = 2;')
+        self.assertIn("['Id', 'Name', 'Name']", output)
+        self.assertEqual(output.count("[1, 'one', 'uno']"), 1)
+        self.assertEqual(output.count("[2, 'two', 'dos']"), 2)
+        self.run_cql('EXPORT (SELECT * FROM named WHERE Id = 2) AS "named.csv";')
+        with open(os.path.join(self.exportPath, "named.csv")) as file:
+            self.assertEqual(file.read().splitlines(), ["Id,Name,Name", "2,two,dos"])
+
+    def test_view_of_a_view_keeps_columns_with_the_same_name(self):
+        self.run_cql('CREATE TABLE named FROM j1 JOIN j4 USING ("Id");')
+        self.run_cql('CREATE TABLE first SELECT * FROM named;')
+        self.run_cql('CREATE TABLE second SELECT * FROM first LIMIT 2;')
+        second = self.interpreter.tablesData["second"]
+        self.assertIsInstance(second, TableView)
+        self.assertIs(second.base, self.interpreter.tablesData["named"])
+        self.assertEqual(second.mapping, [0, 1, 2])
+        self.assertEqual(sorted(self.rows('SELECT * FROM second;')), [[1, "one", "uno"], [2, "two", "dos"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
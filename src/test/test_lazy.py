@@ -0,0 +1,30 @@
+import unittest
+from support import InterpreterTest
+
+
+class LazyImportTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.load("lz", ["Id", "Val"], ([f"R{i}", i] for i in range(10)), "LAZY")
+
+    def test_rows_match_eager_import(self):
+        self.run_cql('IMPORT TABLE eager FROM "lz.csv";')
+        self.assertEqual(self.rows('SELECT * FROM lz WHERE Val > 4;'), self.rows('SELECT * FROM eager WHERE Val > 4;'))
+
+    def test_rows_appended_after_import_are_not_decoded(self):
+        self.write("lz.csv", "".join(f"A{i},{10 + i}\n" for i in range(5)), "a")
+        self.run_cql('CREATE INDEX idx_val ON lz(Val);')
+        table = self.interpreter.tablesData["lz"]
+        self.assertEqual([len(c) for c in table.columns], [10, 10])
+        self.assertEqual(self.rows('SELECT * FROM lz WHERE Val > 7;'), [["R8", 8], ["R9", 9]])
+        self.assertEqual(self.rows('SELECT * FROM lz WHERE Val > 12;'), [])
+
+    def test_odd_quotes_in_a_comment_do_not_join_records(self):
+        self.write("notes.csv", 'Id,Note\n# it"s a comment\nN1,"two\nlines"\n  # another"\nN2,plain\n"N3","x"\n')
+        self.run_cql('IMPORT LAZY TABLE notes FROM "notes.csv";')
+        self.assertEqual(len(self.interpreter.tablesData["notes"]), 3)
+        self.assertEqual(self.rows('SELECT * FROM notes;'), [["N1", "two\nlines"], ["N2", "plain"], ["N3", "x"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
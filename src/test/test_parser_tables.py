@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import support  # puts the sources on sys.path
+import parser
+from parser import Parser, grammar_signature
+
+
+class ParserTableTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        path = self.directory.name
+        # Tables are imported as modules, so those of the sources must not be found.
+        searched = [path] + [p for p in sys.path if os.path.abspath(p) != parser.TABLE_DIR]
+        modules = {n: m for n, m in sys.modules.items() if not n.startswith(("cql_lextab_", "cql_parsetab_"))}
+        patches = (
+            mock.patch.object(parser, "TABLE_DIR", path),
+            mock.patch.object(sys, "path", searched),
+            mock.patch.dict(sys.modules, modules, clear=True),
+        )
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tables(self):
+        return sorted(n for n in os.listdir(self.directory.name) if n.endswith(".py"))
+
+    def test_tables_are_named_after_the_grammar_and_reused(self):
+        signature = grammar_signature()
+        Parser()
+        self.assertEqual(self.tables(), [f"cql_lextab_{signature}.py", f"cql_parsetab_{signature}.py"])
+        written = [os.stat(os.path.join(self.directory.name, n)).st_mtime_ns for n in self.tables()]
+        self.assertEqual(Parser().parse('SELECT * FROM t;'), [("SELECT_NO_LIMIT", "t")])
+        self.assertEqual([os.stat(os.path.join(self.directory.name, n)).st_mtime_ns for n in self.tables()], written)
+
+    def test_tables_of_another_grammar_are_replaced(self):
+        stale = os.path.join(self.directory.name, "cql_parsetab_00000000.py")
+        with open(stale, "w") as file:
+            file.write("_tabversion = '0'\n")
+        Parser()
+        self.assertFalse(os.path.exists(stale))
+
+    def test_editing_a_rule_changes_the_signature(self):
+        signature = grammar_signature()
+
+        def p_value(self, p):
+            """value : STRING"""
+            p[0] = p[1]
+        with mock.patch.object(Parser, "p_value", p_value):
+            self.assertNotEqual(grammar_signature(), signature)
+        self.assertEqual(grammar_signature(), signature)
+
+
+if __name__ == "__main__":
+    unittest.main()
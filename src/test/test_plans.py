@@ -0,0 +1,79 @@
+import unittest
+from support import InterpreterTest
+from plan import Plan
+from predicate import ConditionList
+
+STATEMENTS = [
+    'IMPORT TABLE t FROM "t.csv";',
+    'IMPORT PARALLEL TABLE t FROM "t.csv";',
+    'IMPORT LAZY TABLE t FROM "t.csv";',
+    'IMPORT TABLE t FROM "t.csv" APPEND;',
+    'EXPORT TABLE t AS "t.csv";',
+    'EXPORT (SELECT * FROM t) AS "t.csv";',
+    'RENAME TABLE t "u";',
+    'PRINT TABLE t;',
+    'DISCARD TABLE t;',
+    'SELECT * FROM t;',
+    'SELECT * FROM t LIMIT 2;',
+    'SELECT A FROM t;',
+    'SELECT A FROM t LIMIT 2;',
+    'SELECT * FROM t WHERE A > 1;',
+    'SELECT * FROM t WHERE A > 1 LIMIT 2;',
+    'CREATE TABLE u SELECT * FROM t;',
+    'CREATE TABLE u SELECT * FROM t LIMIT 2;',
+    'CREATE TABLE u SELECT * FROM t WHERE A > 1;',
+    'CREATE TABLE u SELECT * FROM t WHERE A > 1 LIMIT 2;',
+    'CREATE TABLE u FROM t JOIN v USING ("A");',
+    'CREATE MATERIALIZED TABLE u SELECT * FROM t WHERE A > 1;',
+    'CREATE MATERIALIZED TABLE u FROM t JOIN v USING ("A");',
+    'PROCEDURE p DO SELECT * FROM t; END',
+    'CALL p;',
+    'CREATE INDEX i ON t(A);',
+    'DROP INDEX i;',
+    'SHOW TABLES;',
+    'SET pageSize 10;',
+    'PREPARE s AS SELECT * FROM t WHERE A > ?;',
+    'EXECUTE s(1);',
+]
+
+
+class PlanTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.load("t", ["Id", "A"], ([f"T{i}", i] for i in range(20)))
+
+    def test_every_command_type_has_a_handler(self):
+        commands = [self.interpreter.parser.parse(s)[0] for s in STATEMENTS]
+        self.assertEqual({c[0] for c in commands}, set(self.interpreter.commands))
+        for command in commands:
+            plan = self.interpreter.compile(command)
+            self.assertIsInstance(plan, Plan)
+            self.assertIs(plan.command, command)
+
+    def test_unknown_command_is_not_run(self):
+        self.assertIsNone(self.interpreter.compile(("NOPE", "t")))
+        self.assertIsNone(self.interpreter.execute(("NOPE", "t"), True))
+
+    def test_procedure_plans_keep_their_compiled_predicate(self):
+        self.run_cql('PROCEDURE p DO SELECT * FROM t WHERE A > 17; END')
+        plan, = self.interpreter.procedures["p"]
+        conditions = plan.args[1]
+        self.assertIsInstance(conditions, ConditionList)
+        self.interpreter.resultCache.capacity = 0
+        self.assertIn("['T19', 19]", self.run_cql('CALL p;'))
+        predicate = conditions.predicate
+        self.run_cql('CALL p;')
+        self.assertIs(conditions.predicate, predicate)
+        self.load("t", ["Id", "A"], [["X", 30]])
+        self.assertIn("['X', 30]", self.run_cql('CALL p;'))
+        self.assertIsNot(conditions.predicate, predicate)
+
+    def test_statement_without_parameters_is_compiled_when_prepared(self):
+        self.run_cql('PREPARE top AS SELECT * FROM t LIMIT 1; PREPARE above AS SELECT * FROM t WHERE A > ?;')
+        self.assertIsInstance(self.interpreter.prepared["top"][2], Plan)
+        self.assertIsNone(self.interpreter.prepared["above"][2])
+        self.assertIn("['T0', 0]", self.run_cql('EXECUTE top;'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from support import InterpreterTest, table
+from predicate import ConditionList, compile_conditions
+
+ROWS = [[f"I{i}", f"Name{i % 7}", i % 25, (i % 9) * 1.5, f"2024-01-{1 + i % 28:02d}"] for i in range(300)]
+
+
+def where(column, symbol, literal):
+    return ("CONDITION", column, symbol, literal)
+
+
+class PredicateTest(unittest.TestCase):
+    def setUp(self):
+        self.table = table(["Id", "Name", "Qty", "Price", "Day"], ROWS)
+
+    def matching(self, *conditions):
+        predicate = compile_conditions(self.table, list(conditions))
+        return [ROWS[i][0] for i in predicate.evaluate()]
+
+    def expected(self, test):
+        return [row[0] for row in ROWS if test(row)]
+
+    def test_numeric_literals_compare_as_numbers(self):
+        self.assertEqual(self.matching(where("Qty", ">", "9")), self.expected(lambda r: r[2] > 9))
+        self.assertEqual(self.matching(where("Qty", "<=", 3)), self.expected(lambda r: r[2] <= 3))
+        self.assertEqual(self.matching(where("Price", ">=", 6)), self.expected(lambda r: r[3] >= 6))
+
+    def test_strings_and_timestamps_compare_in_their_own_domain(self):
+        self.assertEqual(self.matching(where("Name", "<", "Name3")), self.expected(lambda r: r[1] < "Name3"))
+        self.assertEqual(self.matching(where("Day", ">", "2024-01-20")), self.expected(lambda r: r[4] > "2024-01-20"))
+
+    def test_literal_outside_the_column_domain_compares_as_text(self):
+        predicate = compile_conditions(self.table, [where("Qty", "=", "abc")])
+        self.assertFalse(predicate.terms[0].indexable)
+        self.assertEqual(list(predicate.evaluate()), [])
+        self.assertEqual(self.matching(where("Qty", "<>", "abc")), self.expected(lambda r: True))
+
+    def test_every_and_term_is_applied(self):
+        conditions = [where("Qty", ">", 4), where("Name", "!=", "Name2"), where("Price", "<", 9), where("Day", "<=", "2024-01-15")]
+        self.assertEqual(
+            self.matching(*conditions),
+            self.expected(lambda r: r[2] > 4 and r[1] != "Name2" and r[3] < 9 and r[4] <= "2024-01-15"),
+        )
+
+    def test_unknown_column_or_operator_is_not_compiled(self):
+        self.assertIsNone(compile_conditions(self.table, [where("Missing", "=", 1)]))
+        self.assertIsNone(compile_conditions(self.table, [where("Qty", "~", 1)]))
+
+    def test_condition_list_compiles_again_when_buffers_change(self):
+        conditions = ConditionList([where("Qty", "=", 3)])
+        first = compile_conditions(self.table, conditions)
+        self.assertIs(compile_conditions(self.table, conditions), first)
+        self.table.columns = list(self.table.columns)
+        self.assertIsNot(compile_conditions(self.table, conditions), first)
+
+
+class IndexedWhereTest(InterpreterTest):
+    def test_index_scan_matches_full_scan(self):
+        self.load("items", ["Id", "Name", "Qty", "Price", "Day"], ROWS)
+        query = 'SELECT * FROM items WHERE Qty = 7 AND Price > 3;'
+        scanned = self.rows(query)
+        self.run_cql('CREATE INDEX idx_qty ON items(Qty);')
+        self.assertEqual(self.rows(query), scanned)
+        self.assertEqual(self.interpreter.lastIndexUsed, "idx_qty")
+        self.assertEqual([r[0] for r in scanned], [r[0] for r in ROWS if r[2] == 7 and r[3] > 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
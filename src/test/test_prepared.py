@@ -0,0 +1,37 @@
+import unittest
+from support import InterpreterTest
+
+
+class PreparedStatementTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.load("points", ["Id", "X"], ([f"P{i}", i] for i in range(10)))
+
+    def test_parameters_are_bound_on_execute(self):
+        self.assertIn("prepared with 1 parameters", self.run_cql('PREPARE above AS SELECT * FROM points WHERE X > ?;'))
+        self.assertEqual(self.rows('EXECUTE above(7);'), [["P8", 8], ["P9", 9]])
+        self.assertIn("expects 1 parameters, got 0", self.run_cql('EXECUTE above;'))
+
+    def test_parameter_outside_prepare_is_rejected(self):
+        for query in ('SELECT * FROM points WHERE X > ?;', 'CREATE TABLE big SELECT * FROM points WHERE X > ?;'):
+            self.assertIn("only allowed in PREPARE", self.run_cql(query))
+            self.assertEqual(self.interpreter.query(query)[-1].message, "Parameters '?' are only allowed in PREPARE statements.")
+        self.assertNotIn("big", self.interpreter.tablesData)
+
+    def test_parameter_as_execute_value_is_rejected(self):
+        self.run_cql('PREPARE above AS SELECT * FROM points WHERE X > ?;')
+        self.assertIn("only allowed in PREPARE", self.run_cql('EXECUTE above(?);'))
+        result = self.interpreter.query('EXECUTE above(?);')[-1]
+        self.assertIsNone(result.table)
+        self.assertIn("only allowed in PREPARE", result.message)
+
+    def test_procedure_may_prepare_but_not_hold_parameters(self):
+        self.assertIn("only allowed in PREPARE", self.run_cql('PROCEDURE bad DO SELECT * FROM points WHERE X > ?; END'))
+        self.assertIn("does not exist", self.run_cql('CALL bad;'))
+        self.run_cql('PROCEDURE good DO PREPARE above AS SELECT * FROM points WHERE X > ?; END')
+        self.assertIn("prepared with 1 parameters", self.run_cql('CALL good;'))
+        self.assertEqual(self.rows('EXECUTE above(8);'), [["P9", 9]])
+
+
+if __name__ == "__main__":
+    unittest.main()
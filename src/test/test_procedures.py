@@ -0,0 +1,56 @@
+import unittest
+from support import InterpreterTest
+from scheduler import build_dependencies
+
+
+class ConcurrentProcedureTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.interpreter.procedureWorkers = 4
+        self.interpreter.importCache.capacity = 0
+        self.load("x", ["Id", "Val"], ([f"X{i}", i] for i in range(2000)))
+        self.load("y", ["Id", "Val"], ([f"Y{i}", i] for i in range(10)))
+
+    def dependencies(self, text):
+        commands = self.interpreter.parser.parse(text)
+        return build_dependencies([self.interpreter.statement_access(c) for c in commands])
+
+    def test_independent_statements_do_not_wait(self):
+        self.assertEqual(self.dependencies('SELECT * FROM x; SELECT * FROM y; DISCARD TABLE y;'), [[], [], [1]])
+
+    def test_discarding_the_base_of_a_view_waits_for_its_readers(self):
+        self.run_cql('CREATE TABLE v SELECT * FROM x;')
+        self.assertEqual(self.dependencies('SELECT * FROM v; DISCARD TABLE x;'), [[], [0]])
+        self.assertEqual(self.dependencies('SELECT * FROM v; IMPORT TABLE x FROM "y.csv";'), [[], [0]])
+
+    def test_view_read_while_its_base_is_discarded(self):
+        self.run_cql('CREATE TABLE v SELECT * FROM x;')
+        view = self.interpreter.tablesData["v"]
+        rows = view.rows()
+        column = view.columns[1]
+        next(rows)
+        self.run_cql('DISCARD TABLE x;')
+        self.assertIsNone(view.base)
+        self.assertEqual(len(list(rows)), 1999)
+        self.assertEqual((column[5], column.text(6), list(column.take([7, 8]))), (5, "6", [7, 8]))
+
+    def test_rows_of_a_view_materialized_before_they_are_read(self):
+        self.run_cql('CREATE TABLE v SELECT * FROM x;')
+        view = self.interpreter.tablesData["v"]
+        rows, texts = view.rows(), view.text_rows()
+        self.run_cql('DISCARD TABLE x;')
+        self.assertEqual(next(rows), ["X0", 0])
+        self.assertEqual(list(texts)[-1], ["X1999", "1999"])
+
+    def test_call_returns_the_rows_of_a_serial_run(self):
+        self.run_cql('CREATE TABLE v SELECT * FROM x;')
+        self.run_cql('PROCEDURE p DO SELECT * FROM v WHERE Val > 1990; DISCARD TABLE x; SELECT * FROM y LIMIT 2; END')
+        output = self.run_cql('CALL p;')
+        self.assertNotIn("rror", output)
+        self.assertEqual(output.count("['X199"), 9)
+        self.assertNotIn("x", self.interpreter.tablesData)
+        self.assertEqual(self.rows('SELECT * FROM v WHERE Val = 1999;'), [["X1999", 1999]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import contextlib
+import io
+import unittest
+from support import InterpreterTest
+
+
+class QueryTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.load("points", ["Id", "X", "Y"], ([f"P{i}", i, i * 0.5] for i in range(10)))
+
+    def query(self, text):
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            results = self.interpreter.query(text)
+        self.assertEqual(printed.getvalue(), "")
+        return results
+
+    def test_rows_and_types_are_returned(self):
+        result = self.query('SELECT * FROM points WHERE X >= 8;')[-1]
+        self.assertIsNone(result.error)
+        self.assertEqual(result.columns, ["Id", "X", "Y"])
+        self.assertEqual(result.types, ["string", "int", "float"])
+        self.assertEqual(list(result), [["P8", 8, 4.0], ["P9", 9, 4.5]])
+        self.assertEqual(list(result.column("X")), [8, 9])
+
+    def test_syntax_error_is_returned_and_nothing_runs(self):
+        results = self.query('DISCARD TABLE points; SELECT FROM;')
+        self.assertEqual(len(results), 1)
+        self.assertIn("Syntax error", results[0].error)
+        self.assertIsNone(results[0].table)
+        self.assertIn("points", self.interpreter.tablesData)
+
+    def test_illegal_character_is_returned(self):
+        results = self.query('SELECT * FROM points WHERE X > 1 $;')
+        self.assertEqual(len(results), 1)
+        self.assertIn("Illegal character '$'", results[0].error)
+
+    def test_command_errors_are_kept_in_output(self):
+        result = self.query('SELECT * FROM missing;')[-1]
+        self.assertIsNone(result.error)
+        self.assertIsNone(result.table)
+        self.assertIn("missing", result.message + result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import contextlib
+import io
+import threading
+import unittest
+from unittest import mock
+from support import InterpreterTest
+from render import Renderer
+from scheduler import captured_output
+
+ROWS = [[f"R{i}", i] for i in range(5)]
+
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+class PagingTest(unittest.TestCase):
+    def render(self):
+        Renderer("CSV", interactive=True, pageRows=2).render(["Id", "Val"], ROWS, len(ROWS))
+
+    def test_terminal_output_is_paged(self):
+        terminal = Terminal()
+        with contextlib.redirect_stdout(terminal), mock.patch("builtins.input", return_value="q") as ask:
+            self.render()
+        ask.assert_called_once()
+        self.assertEqual(terminal.getvalue(), "Id,Val\nR0,0\nR1,1\n(3 more rows not shown)\n")
+
+    def test_worker_thread_is_not_paged(self):
+        terminal = Terminal()
+        with contextlib.redirect_stdout(terminal), mock.patch("builtins.input", side_effect=AssertionError) as ask:
+            worker = threading.Thread(target=self.render)
+            worker.start()
+            worker.join()
+        ask.assert_not_called()
+        self.assertEqual(len(terminal.getvalue().splitlines()), len(ROWS) + 1)
+
+    def test_captured_output_is_not_paged(self):
+        terminal = Terminal()
+        with contextlib.redirect_stdout(terminal), mock.patch("builtins.input", side_effect=AssertionError) as ask:
+            with captured_output() as buffer:
+                self.render()
+        ask.assert_not_called()
+        self.assertEqual(len("".join(buffer).splitlines()), len(ROWS) + 1)
+        self.assertEqual(terminal.getvalue(), "")
+
+
+class PageOptionTest(InterpreterTest):
+    def test_page_size_must_be_a_whole_number(self):
+        self.assertIn("whole number", self.run_cql('SET PAGE 2.5;'))
+        self.assertIn("set to 3 rows", self.run_cql('SET PAGE 3;'))
+        self.assertEqual(self.interpreter.renderer.pageRows, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from unittest import mock
+from support import InterpreterTest
+from pipeline import ParallelFilter
+
+QUERIES = [
+    'SELECT * FROM readings WHERE Val > 1234;',
+    'SELECT * FROM readings WHERE Station = "S3";',
+    'SELECT * FROM readings WHERE Temp < 2.5 AND Station <> "S0";',
+    'SELECT * FROM readings WHERE Val >= 0;',
+    'SELECT * FROM readings WHERE Val < 0;',
+]
+
+
+class ParallelScanTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.load("readings", ["Id", "Station", "Val", "Temp"], (
+            [f"R{i}", f"S{i % 5}", (i * 37) % 5000, f"{(i % 40) / 4}"] for i in range(20000)
+        ))
+
+    def test_parallel_filter_matches_serial_scan(self):
+        self.interpreter.scanWorkers = 1
+        serial = [self.rows(query) for query in QUERIES]
+        self.interpreter.scanWorkers = 3
+        self.interpreter.parallelMinRows = 1
+        scan = ParallelFilter.__iter__
+        with mock.patch.object(ParallelFilter, "__iter__", autospec=True, side_effect=scan) as parallel:
+            for query, rows in zip(QUERIES, serial):
+                self.assertEqual(self.rows(query), rows, query)
+        self.assertEqual(parallel.call_count, len(QUERIES))
+
+
+if __name__ == "__main__":
+    unittest.main()
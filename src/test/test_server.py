@@ -0,0 +1,83 @@
+import asyncio
+import os
+import unittest
+from unittest import mock
+from support import InterpreterTest
+from client import CQLClient
+from server import CQLServer
+
+
+class ServerTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.load("lt", ["Id", "Val"], ([f"L{i}", i] for i in range(20)))
+        self.load("rt", ["Id", "Val"], ([f"R{i}", i] for i in range(20)))
+
+    def serve(self, test):
+        async def main():
+            server = CQLServer(self.interpreter, workers=4)
+            await server.start(port=0)
+            address = str(server.server.sockets[0].getsockname()[1])
+            first = await CQLClient.connect(address)
+            second = await CQLClient.connect(address)
+            try:
+                await test(server, first, second)
+            finally:
+                await first.close()
+                await second.close()
+                await server.close()
+        asyncio.run(main())
+
+    def test_sessions_wait_only_for_the_tables_they_use(self):
+        async def test(server, first, second):
+            lock = server.locks.lock("lt")
+            lock.acquire_write()
+            blocked = asyncio.ensure_future(first.query('SELECT * FROM lt WHERE Val > 17;'))
+            output, seconds = await asyncio.wait_for(second.query('SELECT * FROM rt WHERE Val > 17;'), 10)
+            self.assertIn("['R18', 18]", output)
+            await asyncio.sleep(0.1)
+            self.assertFalse(blocked.done())
+            lock.release_write()
+            output, seconds = await asyncio.wait_for(blocked, 10)
+            self.assertIn("['L19', 19]", output)
+            self.assertEqual(server.requests, 2)
+        self.serve(test)
+
+    def test_views_wait_for_the_tables_behind_them(self):
+        self.run_cql('CREATE TABLE v SELECT * FROM lt;')
+        statement_access = self.interpreter.statement_access
+        # The first access is computed before v existed, as if another session
+        # created it while this one was waiting.
+        stale = iter([({"v"}, set())])
+        def access(command):
+            return next(stale, None) or statement_access(command)
+        async def test(server, first, second):
+            lock = server.locks.lock("lt")
+            lock.acquire_write()
+            with mock.patch.object(self.interpreter, "statement_access", side_effect=access):
+                blocked = asyncio.ensure_future(first.query('SELECT * FROM v WHERE Val > 17;'))
+                await asyncio.sleep(0.2)
+                self.assertFalse(blocked.done())
+                output, seconds = await asyncio.wait_for(second.query('SELECT * FROM rt WHERE Val > 17;'), 10)
+                self.assertIn("['R18', 18]", output)
+                lock.release_write()
+                output, seconds = await asyncio.wait_for(blocked, 10)
+            self.assertIn("['L19', 19]", output)
+            output, seconds = await first.query('DISCARD TABLE lt; SELECT * FROM v WHERE Val = 3;')
+            self.assertIn("['L3', 3]", output)
+        self.serve(test)
+
+    def test_exports_stay_in_the_export_directory(self):
+        async def test(server, first, second):
+            output, seconds = await first.query('EXPORT TABLE lt AS "../escaped.csv"; EXPORT (SELECT * FROM lt) AS "../escaped.csv";')
+            self.assertEqual(output.count("Cannot export"), 2)
+            self.assertFalse(os.path.exists(os.path.join(self.directory.name, "escaped.csv")))
+            output, seconds = await second.query('EXPORT TABLE lt AS "inside.csv";')
+            self.assertIn("exported successfully", output)
+            self.assertTrue(os.path.exists(os.path.join(self.exportPath, "inside.csv")))
+        self.serve(test)
+        self.assertFalse(self.interpreter.confineExports)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from array import array
+from support import table
+from table import Column, FloatColumn, IntColumn, StringColumn, TimestampColumn
+
+
+class ColumnTypeTest(unittest.TestCase):
+    def column(self, cells):
+        return table(["C"], [[c] for c in cells]).columns[0]
+
+    def test_type_is_the_narrowest_that_prints_back(self):
+        self.assertIsInstance(self.column(["1", "-20", "300"]), IntColumn)
+        self.assertIsInstance(self.column(["1.5", "2.25"]), FloatColumn)
+        self.assertIsInstance(self.column(["2024-01-05", "2023-12-31"]), TimestampColumn)
+        self.assertIsInstance(self.column(["2024-01-05T10:30:00"]), TimestampColumn)
+        self.assertIsInstance(self.column(["007", "8"]), StringColumn)
+        self.assertIsInstance(self.column(["1.50"]), StringColumn)
+        self.assertIsInstance(self.column(["2024-02-30"]), StringColumn)
+
+    def test_mixed_cells_widen_and_keep_their_text(self):
+        cells = ["100", "2.5", "-3"]
+        column = self.column(cells)
+        self.assertIsInstance(column, FloatColumn)
+        self.assertEqual(list(column), [100, 2.5, -3])
+        self.assertEqual([column.text(i) for i in range(3)], cells)
+        cells = ["1", "2024-01-05", "x"]
+        column = self.column(cells)
+        self.assertIsInstance(column, StringColumn)
+        self.assertEqual([column.text(i) for i in range(3)], cells)
+
+    def test_values_live_in_typed_buffers(self):
+        self.assertIsInstance(self.column(["1", "2"]).values, array)
+        self.assertEqual(self.column(["2024-01-02", "2024-01-01"]).values.tolist(), [1704153600, 1704067200])
+        strings = self.column(["a", "b", "a", "a"])
+        self.assertEqual((strings.pool, strings.codes.tolist()), (["a", "b"], [0, 1, 0, 0]))
+
+    def test_literals_are_encoded_in_the_column_domain(self):
+        self.assertEqual(self.column(["1"]).encode("22"), 22)
+        self.assertEqual(self.column(["1.5"]).encode(22.0), 22.0)
+        self.assertEqual(self.column(["2024-01-01"]).encode("2024-01-02"), 1704153600)
+        self.assertIsNone(self.column(["2024-01-01"]).encode(3.0))
+        self.assertEqual(self.column(["a"]).encode(22.0), "22")
+
+    def test_take_gathers_rows_of_the_same_kind(self):
+        for cells in (["1", "2", "3"], ["1.5", "4", "2.5"], ["2024-01-01", "2024-01-02", "2024-01-03"], ["a", "b", "c"]):
+            column = self.column(cells)
+            taken = column.take([2, 0])
+            self.assertIs(type(taken), type(column))
+            self.assertEqual([taken.text(0), taken.text(1)], [cells[2], cells[0]])
+
+    def test_nbytes_counts_the_buffers(self):
+        self.assertEqual(self.column([str(i) for i in range(100)]).nbytes(), 800)
+        repeated = self.column(["same"] * 100)
+        self.assertLess(repeated.nbytes(), self.column([f"s{i}" for i in range(100)]).nbytes())
+        rows = table(["A", "B"], [[i, i * 0.5] for i in range(100)])
+        self.assertEqual(rows.nbytes(), sum(c.nbytes() for c in rows.columns))
+
+    def test_column_kinds_must_take_and_measure(self):
+        class Partial(Column):
+            kind = "int"
+
+            def take(self, indices):
+                return self
+        with self.assertRaises(TypeError):
+            Column()
+        with self.assertRaises(TypeError):
+            Partial()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from support import InterpreterTest
+from views import MaterializedSelect, MaterializedTable
+
+
+class MaterializedTableTest(InterpreterTest):
+    def setUp(self):
+        InterpreterTest.setUp(self)
+        self.load("readings", ["Id", "Temp"], ([f"R{i}", 15 + i % 12] for i in range(40)), "APPEND")
+        self.load("stations", ["Id", "Place"], ([f"R{i}", f"P{i % 3}"] for i in range(40)))
+
+    def test_appended_rows_are_added_without_rebuild(self):
+        self.run_cql('CREATE MATERIALIZED TABLE hot SELECT * FROM readings WHERE Temp > 22;')
+        self.write("readings.csv", "R40,30\nR41,10\n", "a")
+        self.run_cql('IMPORT TABLE readings FROM "readings.csv" APPEND;')
+        self.assertEqual(self.rows('SELECT * FROM hot;'), self.rows('SELECT * FROM readings WHERE Temp > 22;'))
+        view = self.interpreter.views["hot"]
+        self.assertEqual((view.rebuilds, view.increments), (1, 1))
+
+    def test_join_follows_its_sources(self):
+        self.run_cql('CREATE MATERIALIZED TABLE placed FROM stations JOIN readings USING ("Id");')
+        self.write("readings.csv", "R1,99\n", "a")
+        self.run_cql('IMPORT TABLE readings FROM "readings.csv" APPEND;')
+        self.assertEqual(len(self.rows('SELECT * FROM placed;')), 41)
+
+    def test_each_call_builds_its_own_definition(self):
+        self.run_cql('PROCEDURE warm DO CREATE MATERIALIZED TABLE hot SELECT * FROM readings WHERE Temp > 22; END')
+        self.run_cql('CALL warm;')
+        first = self.interpreter.views["hot"]
+        self.run_cql('IMPORT TABLE readings FROM "readings.csv"; DISCARD TABLE hot; CALL warm;')
+        second = self.interpreter.views["hot"]
+        self.assertIsNot(second, first)
+        self.assertEqual((second.rebuilds, second.increments), (1, 0))
+        self.assertEqual(self.rows('SELECT * FROM hot;'), self.rows('SELECT * FROM readings WHERE Temp > 22;'))
+
+
+class DefinitionTest(unittest.TestCase):
+    def test_definitions_must_build_and_extend(self):
+        class Partial(MaterializedTable):
+            def build(self, tables):
+                return None
+        with self.assertRaises(TypeError):
+            MaterializedTable("t", [])
+        with self.assertRaises(TypeError):
+            Partial("t", [])
+        self.assertEqual(MaterializedSelect("t", "readings", None, 0).sources, ["readings"])
+
+
+if __name__ == "__main__":
+    unittest.main()
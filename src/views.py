@@ -0,0 +1,170 @@
+from abc import ABC, abstractmethod
+from array import array
+from join import join_keys, join_tables
+from predicate import compile_conditions
+from table import Table, append_column
+
+
+class MaterializedTable(ABC):
+    """
+    Table created with CREATE MATERIALIZED TABLE. It keeps its definition and
+    the lineage and length of every source table it was last computed from.
+    When a source only had rows appended, only those rows are filtered or
+    joined and added to the table; it is rebuilt from scratch when a source
+    was replaced by other data.
+    Attributes:
+        name (str): Name of the materialized table.
+        sources (list): Names of the source tables.
+        table (Table): Data last produced for the materialized table.
+        versions (dict): Lineage and length of each source table, keyed by name.
+        rebuilds (int): Number of times the table was computed from scratch.
+        increments (int): Number of times appended source rows were added.
+    """
+    def __init__(self, name, sources):
+        self.name = name
+        self.sources = sources
+        self.table = None
+        self.versions = {}
+        self.rebuilds = 0
+        self.increments = 0
+
+    def refresh(self, tables):
+        """
+        Bring the table up to date with its sources.
+        Args:
+            tables (dict): Tables keyed by name.
+        Returns:
+            Table: The new data, or None if it did not change or a source is missing.
+        """
+        delta = False
+        for source in self.sources:
+            data = tables.get(source)
+            if data is None:
+                return None
+            lineage, length = self.versions.get(source, (None, 0))
+            if data.lineage != lineage or len(data) < length:
+                return self.rebuild(tables)
+            if len(data) > length:
+                delta = True
+        if not delta:
+            return None
+        data = self.extend(tables)
+        if data is None:
+            return None
+        if len(data) == 0:
+            self.store(tables, self.table)
+            return None
+        self.increments += 1
+        return self.store(tables, Table(data.header, [append_column(c, n) for c, n in zip(self.table.columns, data.columns)], lineage=self.table.lineage))
+
+    def rebuild(self, tables):
+        """
+        Compute the table from the whole source tables.
+        Returns:
+            Table: The new data, or None if the definition no longer applies to the sources.
+        """
+        data = self.build(tables)
+        if data is None:
+            return None
+        self.rebuilds += 1
+        return self.store(tables, data)
+
+    def store(self, tables, data):
+        self.table = data
+        self.versions = {s: (tables[s].lineage, len(tables[s])) for s in self.sources}
+        return data
+
+    @abstractmethod
+    def build(self, tables):
+        """
+        Compute the rows of the table from the whole source tables.
+        Returns:
+            Table: The rows, or None if the definition does not apply to the sources.
+        """
+
+    @abstractmethod
+    def extend(self, tables):
+        """
+        Compute the rows to add for the rows appended to the sources since
+        the table was last stored.
+        Returns:
+            Table: The rows to add, or None if none can be added.
+        """
+
+
+class MaterializedSelect(MaterializedTable):
+    """
+    Materialized SELECT * FROM source [WHERE conditions] [LIMIT n].
+    """
+    def __init__(self, name, source, condition, limit):
+        MaterializedTable.__init__(self, name, [source])
+        self.condition = condition
+        self.limit = int(limit)
+
+    def build(self, tables):
+        return self.select(tables[self.sources[0]], 0, self.limit)
+
+    def extend(self, tables):
+        limit = 0
+        if self.limit:
+            limit = self.limit - len(self.table)
+            if limit <= 0:
+                return None
+        return self.select(tables[self.sources[0]], self.versions[self.sources[0]][1], limit)
+
+    def select(self, data, start, limit):
+        """
+        Return the rows of data from position start matching the conditions.
+        """
+        if self.condition is None:
+            return data.select(indices=range(start, len(data)), limit=limit)
+        predicate = compile_conditions(data, self.condition)
+        if predicate is None:
+            print(f"Materialized table {self.name}: the condition {self.condition} does not apply to {self.sources[0]}.")
+            return None
+        return data.select(indices=predicate.evaluate(start), limit=limit)
+
+
+class MaterializedJoin(MaterializedTable):
+    """
+    Materialized FROM left JOIN right USING (column). Rows added by an
+    increment come after the existing rows, so the order can differ from a
+    full rebuild.
+    """
+    def __init__(self, name, left, right, column, hashJoin):
+        MaterializedTable.__init__(self, name, [left, right])
+        self.column = column
+        self.hashJoin = hashJoin
+
+    def keys(self, tables):
+        left, right = tables[self.sources[0]], tables[self.sources[1]]
+        if self.column not in left.header or self.column not in right.header:
+            print(f"Materialized table {self.name}: column {self.column} does not exist in one of the tables.")
+            return None
+        return join_keys(left.column(self.column), right.column(self.column))
+
+    def build(self, tables):
+        keys = self.keys(tables)
+        if keys is None:
+            return None
+        indices1, indices2 = self.hashJoin.join(*keys)
+        return join_tables(tables[self.sources[0]], tables[self.sources[1]], self.column, indices1, indices2)
+
+    def extend(self, tables):
+        """
+        Join the appended left rows with every right row, and the old left
+        rows with the appended right rows.
+        """
+        keys = self.keys(tables)
+        if keys is None:
+            return None
+        keys1, keys2 = keys
+        length1 = self.versions[self.sources[0]][1]
+        length2 = self.versions[self.sources[1]][1]
+        new1, all2 = self.hashJoin.join(keys1[length1:], keys2)
+        old1, new2 = self.hashJoin.join(keys1[:length1], keys2[length2:])
+        indices1 = array("q", (i + length1 for i in new1))
+        indices1.extend(old1)
+        indices2 = array("q", all2)
+        indices2.extend(i + length2 for i in new2)
+        return join_tables(tables[self.sources[0]], tables[self.sources[1]], self.column, indices1, indices2)